@@ -1,3 +1,5 @@
+import asyncio
+import logging
 import streamlit as st
 import os
 import pathlib
@@ -9,6 +11,20 @@ from app.ui.pages.alerts import render_alerts
 from app.ui.pages.settings import render_settings
 from app.ui.async_bridge import AsyncBridge
 
+# Configure logging for the application and its services
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+# Run the services on uvloop when it is installed; event loops created by the
+# async bridge follow the policy
+try:
+    import uvloop
+except ImportError:
+    pass
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 # Ensure assets directory exists
 if not os.path.exists("assets"):
     os.makedirs("assets")
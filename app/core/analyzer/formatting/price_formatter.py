@@ -4,10 +4,14 @@ Price data formatting utilities.
 Provides implementations for formatting price data into readable strings
 for analysis purposes.
 """
+import re
 from typing import Any, Dict, List
 
 from app.core.analyzer.interfaces import PriceFormatter as PriceFormatterInterface
 
+# Everything but digits and the decimal point in a price string such as "$1,299.00"
+_NON_PRICE_CHARS_RE = re.compile(r"[^\d.]")
+
 
 class PriceFormatter(PriceFormatterInterface):
     """Format price data for analysis."""
@@ -35,7 +39,7 @@ class PriceFormatter(PriceFormatterInterface):
             # Try to convert price to float if it's a string
             if isinstance(price, str):
                 try:
-                    price = float("".join(c for c in price if c.isdigit() or c == "."))
+                    price = float(_NON_PRICE_CHARS_RE.sub("", price))
                 except (ValueError, TypeError):
                     continue
 
@@ -98,7 +102,7 @@ class BasicPriceFormatter:
         if not price_data:
             return "No price data available."
 
-        result = "Price data for analysis:\n"
+        lines = ["Price data for analysis:\n"]
         for idx, entry in enumerate(price_data, 1):
             price = entry.get("price", "N/A")
             currency = entry.get("currency", "USD")
@@ -106,6 +110,7 @@ class BasicPriceFormatter:
             date = entry.get("timestamp", "Unknown date")
             model = entry.get("model", "Unknown model")
 
-            result += f"{idx}. {model} - {store}: {price} {currency} ({date})\n"
+            lines.append(f"{idx}. {model} - {store}: {price} {currency} ({date})\n")
 
-        return result
+        # Joining once avoids re-copying the growing string for every entry
+        return "".join(lines)
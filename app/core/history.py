@@ -7,13 +7,13 @@ operations for improved performance and scalability.
 """
 import asyncio
 import logging
-import statistics
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
+from math import fsum
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; handlers and levels are left to the application entry point
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +34,21 @@ class PriceHistoryRepository(ABC):
         """
         pass
 
+    async def store_price_entries(self, price_entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store several price entries in the repository asynchronously.
+
+        Repositories that can write in bulk override this; by default the entries
+        are stored one at a time.
+
+        Args:
+            price_entries: Price entries, each as accepted by store_price_entry.
+
+        Returns:
+            Unique identifiers for the stored entries, in the same order.
+        """
+        return [await self.store_price_entry(price_entry) for price_entry in price_entries]
+
     @abstractmethod
     async def get_history_for_model(
         self, model: str, country: str, days: int = 30, cursor: Optional[str] = None, limit: int = 100,
@@ -126,6 +141,11 @@ class SQLitePriceHistoryRepository(PriceHistoryRepository):
                 self.local.conn = self.sqlite3.connect(self.db_path)
                 # Enable foreign keys
                 self.local.conn.execute('PRAGMA foreign_keys = ON')
+                # WAL lets executor threads read while another thread writes
+                self.local.conn.execute('PRAGMA journal_mode = WAL')
+                self.local.conn.execute('PRAGMA synchronous = NORMAL')
+                self.local.conn.execute('PRAGMA temp_store = MEMORY')
+                self.local.conn.execute('PRAGMA cache_size = -65536')
 
             try:
                 yield self.local.conn
@@ -181,11 +201,7 @@ class SQLitePriceHistoryRepository(PriceHistoryRepository):
         Returns:
             Unique identifier for the stored entry.
         """
-        # Validate required fields
-        required_fields = ["model", "price", "timestamp"]
-        for field in required_fields:
-            if field not in price_entry:
-                raise ValueError(f"Missing required field: {field}")
+        self._validate_price_entry(price_entry)
 
         # Run database operations in a thread pool
         loop = asyncio.get_event_loop()
@@ -193,45 +209,80 @@ class SQLitePriceHistoryRepository(PriceHistoryRepository):
             None, self._store_price_entry_sync, price_entry
         )
 
-    def _store_price_entry_sync(self, price_entry: Dict[str, Any]) -> str:
-        """Synchronous implementation of store_price_entry for thread pool execution."""
-        import uuid
+    async def store_price_entries(self, price_entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store several price entries in the SQLite database in one transaction.
 
-        # Generate a unique ID for the entry
-        entry_id = str(uuid.uuid4())
+        This method runs SQLite operations in a thread pool to avoid blocking.
 
-        # Extract fields with defaults for optional values
-        model = price_entry["model"]
-        price = price_entry["price"]
-        currency = price_entry.get("currency", "USD")
-        source = price_entry.get("source", "unknown")
-        country = price_entry.get("country", "global")
-        url = price_entry.get("url", "")
-        timestamp = price_entry["timestamp"]
+        Args:
+            price_entries: List of dictionaries containing price data.
+
+        Returns:
+            Unique identifiers for the stored entries, in the same order.
+        """
+        for price_entry in price_entries:
+            self._validate_price_entry(price_entry)
+
+        # Run database operations in a thread pool
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, self._store_price_entries_sync, price_entries
+        )
+
+    @staticmethod
+    def _validate_price_entry(price_entry: Dict[str, Any]) -> None:
+        """Raise ValueError if a price entry lacks a field the table requires."""
+        required_fields = ["model", "price", "timestamp"]
+        for field in required_fields:
+            if field not in price_entry:
+                raise ValueError(f"Missing required field: {field}")
+
+    @staticmethod
+    def _price_entry_row(price_entry: Dict[str, Any]) -> Tuple:
+        """Build the price_history row for an entry under a newly generated ID."""
+        import uuid
 
         # Normalize timestamp if it's a datetime object
+        timestamp = price_entry["timestamp"]
         if isinstance(timestamp, datetime):
             timestamp = timestamp.isoformat()
 
-        # Insert into database using thread-local connection
+        # Extract fields with defaults for optional values
+        return (
+            str(uuid.uuid4()),
+            price_entry["model"],
+            price_entry["price"],
+            price_entry.get("currency", "USD"),
+            price_entry.get("source", "unknown"),
+            price_entry.get("country", "global"),
+            price_entry.get("url", ""),
+            timestamp,
+        )
+
+    def _store_price_entry_sync(self, price_entry: Dict[str, Any]) -> str:
+        """Synchronous implementation of store_price_entry for thread pool execution."""
+        return self._store_price_entries_sync([price_entry])[0]
+
+    def _store_price_entries_sync(self, price_entries: List[Dict[str, Any]]) -> List[str]:
+        """Synchronous implementation of store_price_entries for thread pool execution."""
+        rows = [self._price_entry_row(price_entry) for price_entry in price_entries]
+
+        # Insert all rows in a single transaction using thread-local connection
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
+            cursor.executemany(
                 """
                 INSERT INTO price_history (id, model, price, currency, source, country, url, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (entry_id, model, price, currency, source, country, url, timestamp),
+                rows,
             )
             conn.commit()
             cursor.close()
-            
-            return entry_id
 
-        logger.info(
-            f"Stored price entry for {model} in {country}: {currency} {price} (ID: {entry_id})"
-        )
-        return entry_id
+        logger.debug("Stored %d price entries", len(rows))
+        return [row[0] for row in rows]
 
     async def get_history_for_model(
         self, model: str, country: str, days: int = 30, cursor: Optional[str] = None, limit: int = 100,
@@ -535,12 +586,41 @@ class WebhookAlertNotifier(AlertNotifier):
         Args:
             webhook_url: URL of the webhook to send alerts to.
         """
-        import aiohttp
-
         self.webhook_url = webhook_url
-        self.session = aiohttp.ClientSession()
+        # aiohttp sessions are bound to the loop that created them, so keep one per loop
+        self._sessions: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._sessions_lock = threading.Lock()
         logger.info(f"Initialized webhook notifier with URL: {webhook_url}")
 
+    async def _get_session(self):
+        """
+        Get the HTTP session for the running event loop, creating it on first use.
+
+        Sessions left behind by loops that have since been closed are closed and dropped.
+
+        Returns:
+            The aiohttp client session bound to the running loop.
+        """
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        with self._sessions_lock:
+            stale = [
+                self._sessions.pop(session_loop)
+                for session_loop in list(self._sessions)
+                if session_loop.is_closed()
+            ]
+            session = self._sessions.get(loop)
+            if session is None:
+                session = self._sessions[loop] = aiohttp.ClientSession()
+
+        for stale_session in stale:
+            try:
+                await stale_session.close()
+            except Exception as e:
+                logger.debug(f"Error closing stale webhook session: {str(e)}")
+        return session
+
     async def check_alert_rules(
         self, 
         model: str, 
@@ -623,44 +703,60 @@ class WebhookAlertNotifier(AlertNotifier):
         Returns:
             True if all alerts were sent successfully, False otherwise.
         """
-        import json
-        
-        try:
-            # Send each alert to the webhook
-            for alert in alerts:
-                model = alert.get("model", "Unknown model")
-                price = alert.get("price", 0)
-                compared_to = alert.get("compared_to", "unknown")
-                percent_diff = alert.get("percent_diff", 0)
-                
-                # Prepare the webhook payload
-                payload = {
-                    "type": "price_alert",
-                    "model": model,
-                    "price": price,
-                    "compared_to": compared_to,
-                    "percent_diff": percent_diff,
-                    "direction": "lower" if percent_diff > 0 else "higher",
-                    "timestamp": datetime.now().isoformat(),
-                    "details": alert
-                }
-                
-                # Post to the webhook asynchronously
-                async with self.session.post(
-                    self.webhook_url, 
-                    json=payload, 
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status >= 400:
-                        logger.warning(
-                            f"Webhook alert failed with status {response.status}: {await response.text()}"
-                        )
-                        return False
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error sending webhook alerts: {str(e)}")
-            return False
+        # Post the alerts concurrently; one failed post doesn't stop the others
+        results = await asyncio.gather(
+            *(self._post_alert(alert) for alert in alerts), return_exceptions=True
+        )
+
+        sent = True
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error sending webhook alerts: {str(result)}")
+                sent = False
+            elif not result:
+                sent = False
+        return sent
+
+    async def _post_alert(self, alert: Dict[str, Any]) -> bool:
+        """
+        Post a single price alert to the webhook.
+
+        Args:
+            alert: Triggered alert with details.
+
+        Returns:
+            True if the webhook accepted the alert, False otherwise.
+        """
+        model = alert.get("model", "Unknown model")
+        price = alert.get("price", 0)
+        compared_to = alert.get("compared_to", "unknown")
+        percent_diff = alert.get("percent_diff", 0)
+
+        # Prepare the webhook payload
+        payload = {
+            "type": "price_alert",
+            "model": model,
+            "price": price,
+            "compared_to": compared_to,
+            "percent_diff": percent_diff,
+            "direction": "lower" if percent_diff > 0 else "higher",
+            "timestamp": datetime.now().isoformat(),
+            "details": alert
+        }
+
+        # Post to the webhook asynchronously
+        session = await self._get_session()
+        async with session.post(
+            self.webhook_url,
+            json=payload,
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status >= 400:
+                logger.warning(
+                    f"Webhook alert failed with status {response.status}: {await response.text()}"
+                )
+                return False
+        return True
 
 
 class PriceHistoryAnalyzer:
@@ -716,15 +812,33 @@ class PriceHistoryAnalyzer:
                 "trend": "unknown",
             }
 
-        # Extract prices and sort entries by timestamp
+        # Rolling average cutoffs (last 7 and 30 days)
+        now = datetime.now()
+        days7_cutoff = (now - timedelta(days=7)).isoformat()
+        days30_cutoff = (now - timedelta(days=30)).isoformat()
+
+        # Gather prices, rolling windows and the newest and oldest entries in one pass
+        prices = []
+        prices_7d = []
+        prices_30d = []
+        newest = oldest = None
         try:
-            prices = [entry["price"] for entry in price_entries if "price" in entry]
-            # Sort entries by timestamp (newest first)
-            sorted_entries = sorted(
-                [e for e in price_entries if "timestamp" in e],
-                key=lambda x: x["timestamp"],
-                reverse=True,
-            )
+            for entry in price_entries:
+                if "price" in entry:
+                    prices.append(entry["price"])
+                if "timestamp" not in entry:
+                    continue
+
+                timestamp = entry["timestamp"]
+                # Ties resolve as a stable newest-first sort would: first newest, last oldest
+                if newest is None or timestamp > newest["timestamp"]:
+                    newest = entry
+                if oldest is None or timestamp <= oldest["timestamp"]:
+                    oldest = entry
+                if timestamp >= days30_cutoff:
+                    prices_30d.append(entry["price"])
+                    if timestamp >= days7_cutoff:
+                        prices_7d.append(entry["price"])
         except (KeyError, TypeError) as e:
             logger.error(f"Error processing price entries: {str(e)}")
             return {
@@ -736,32 +850,16 @@ class PriceHistoryAnalyzer:
         # Compute basic statistics
         min_price = min(prices) if prices else None
         max_price = max(prices) if prices else None
-        avg_price = statistics.mean(prices) if prices else None
-
-        # Compute rolling averages (last 7 and 30 days)
-        now = datetime.now()
-        days7_cutoff = (now - timedelta(days=7)).isoformat()
-        days30_cutoff = (now - timedelta(days=30)).isoformat()
-
-        prices_7d = [
-            entry["price"]
-            for entry in price_entries
-            if "timestamp" in entry and entry["timestamp"] >= days7_cutoff
-        ]
-        prices_30d = [
-            entry["price"]
-            for entry in price_entries
-            if "timestamp" in entry and entry["timestamp"] >= days30_cutoff
-        ]
+        avg_price = fsum(prices) / len(prices) if prices else None
 
-        rolling_7d_avg = statistics.mean(prices_7d) if prices_7d else None
-        rolling_30d_avg = statistics.mean(prices_30d) if prices_30d else None
+        rolling_7d_avg = fsum(prices_7d) / len(prices_7d) if prices_7d else None
+        rolling_30d_avg = fsum(prices_30d) / len(prices_30d) if prices_30d else None
 
         # Determine price trend
         trend = "stable"
-        if len(sorted_entries) >= 2:
-            newest_price = sorted_entries[0]["price"]
-            oldest_price = sorted_entries[-1]["price"]
+        if newest is not None and newest is not oldest:
+            newest_price = newest["price"]
+            oldest_price = oldest["price"]
             change_pct = ((newest_price - oldest_price) / oldest_price) * 100
 
             if change_pct < -5:
@@ -11,8 +11,10 @@ from datetime import datetime
 import logging
 import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Union
 
+import aiohttp
 from dotenv import load_dotenv
 
 from app.core.scraping.interfaces import PriceScraper
@@ -27,8 +29,21 @@ load_dotenv()
 class BrightDataPriceScraper(PriceScraper):
     """Implementation of PriceScraper using Bright Data."""
 
-    def __init__(self):
-        """Initialize the BrightDataPriceScraper."""
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Initialize the BrightDataPriceScraper.
+
+        Args:
+            session: Optional aiohttp ClientSession to share; by default the scraper
+                     opens its own long-lived session on first use
+        """
+        # HTTP sessions reused across scrapes so proxy connections stay alive. Sessions
+        # cannot cross event loops, so an owned session is kept per loop
+        self._session = session
+        self._owns_session = session is None
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._sessions_lock = threading.Lock()
+
         # Initialize Bright Data settings from environment
         self.username = os.getenv("BRIGHT_DATA_USERNAME")
         self.password = os.getenv("BRIGHT_DATA_PASSWORD")
@@ -64,6 +79,73 @@ class BrightDataPriceScraper(PriceScraper):
                 self.host, self.port
             )
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the HTTP session for the running event loop, opening it on first use.
+
+        Owned sessions left behind by event loops that have been closed are closed
+        and dropped here, since their connections can never be reused.
+
+        Returns:
+            aiohttp ClientSession with a keep-alive connection pool
+        """
+        if not self._owns_session:
+            return self._session
+
+        loop = asyncio.get_running_loop()
+        with self._sessions_lock:
+            stale = [
+                self._sessions.pop(session_loop)
+                for session_loop in list(self._sessions)
+                if session_loop.is_closed()
+            ]
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self._sessions[loop] = self._open_session()
+
+        # A closed loop has already dropped its connections; this only marks the session closed
+        for stale_session in stale:
+            await stale_session.close()
+        return session
+
+    def _open_session(self) -> aiohttp.ClientSession:
+        """Open an HTTP session with a keep-alive connection pool on the running loop."""
+        connector_options = {"limit": 100, "ttl_dns_cache": 300, "keepalive_timeout": 60}
+        if not self.verify_ssl:
+            connector_options["ssl"] = self.ssl_context
+        logger.debug(
+            "Opening HTTP session with SSL verification %s",
+            "enabled" if self.verify_ssl else "disabled",
+        )
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(**connector_options))
+
+    async def close(self) -> None:
+        """
+        Close the HTTP sessions opened by this scraper, if any.
+
+        Sessions of other running loops are closed on their own loop. A session whose
+        loop is idle but not closed stays registered, so it is reused when that loop
+        runs again or dropped once the loop is closed.
+        """
+        if not self._owns_session:
+            return
+
+        with self._sessions_lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+
+        loop = asyncio.get_running_loop()
+        for session_loop, session in sessions:
+            if session_loop is loop or session_loop.is_closed():
+                await session.close()
+            elif session_loop.is_running():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+                )
+            else:
+                with self._sessions_lock:
+                    self._sessions.setdefault(session_loop, session)
+
     async def scrape(self, model: str, country: str, timeout: Optional[int] = 30) -> List[Dict[str, Any]]:
         """Alias for scrape_prices to maintain backward compatibility."""
         return await self.scrape_prices(model, country, timeout)
@@ -130,10 +212,6 @@ class BrightDataPriceScraper(PriceScraper):
         Raises:
             Exception: If scraping fails
         """
-        import aiohttp
-        from bs4 import BeautifulSoup
-        import re
-
         logger.info(f"Scraping URL: {url}")
 
         try:
@@ -232,12 +310,14 @@ class BrightDataPriceScraper(PriceScraper):
                 return match.group(1).split('.')[0].title()
             return "Unknown Store"
 
-    async def _parse_product_data(self, html_content: str, store_name: str, url: str) -> List[Dict[str, Any]]:
+    async def _parse_product_data(
+        self, html_content: Union[str, bytes], store_name: str, url: str
+    ) -> List[Dict[str, Any]]:
         """
         Parse HTML content to extract product data using site-specific parsers.
 
         Args:
-            html_content: HTML content to parse
+            html_content: HTML content to parse, as text or raw response bytes
             store_name: Name of the store
             url: Source URL
 
@@ -249,7 +329,7 @@ class BrightDataPriceScraper(PriceScraper):
             from app.core.scraping.parsers import ParserFactory
 
             # Get an appropriate parser for this URL
-            parser = await ParserFactory.create_parser(url)
+            parser = ParserFactory.create_parser(url)
 
             # Use the parser to extract product data
             results = await parser.parse(html_content, url)
@@ -446,7 +526,7 @@ class BrightDataPriceScraper(PriceScraper):
 
         return results
 
-    async def _fetch_html(self, session, url: str, proxy_url: str, timeout, headers=None) -> str:
+    async def _fetch_html(self, session, url: str, proxy_url: str, timeout, headers=None) -> bytes:
         """
         Fetch HTML content from a URL using the Bright Data proxy with retry capability.
 
@@ -458,12 +538,11 @@ class BrightDataPriceScraper(PriceScraper):
             headers: Optional HTTP headers to use (default: None)
 
         Returns:
-            HTML content as string
+            Raw HTML response body, left undecoded for the parser to detect its encoding
 
         Raises:
             Exception: If fetching fails after all retries
         """
-        import aiohttp
         from app.core.utils.retry import retry_with_backoff
 
         # Use default headers if none provided
@@ -474,14 +553,6 @@ class BrightDataPriceScraper(PriceScraper):
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
             }
 
-        # Create a connector with the appropriate SSL context
-        if not self.verify_ssl:
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            logger.debug(f"Using custom SSL context with verification disabled for {url}")
-        else:
-            connector = None
-            logger.debug(f"Using default SSL verification for {url}")
-
         async def _fetch_with_session():
             """Inner function to fetch HTML content that can be retried."""
             try:
@@ -489,40 +560,39 @@ class BrightDataPriceScraper(PriceScraper):
                 masked_proxy = proxy_url.replace(self.password, '******')
                 logger.debug(f"Using proxy: {masked_proxy}")
 
-                # Create a session with the appropriate connector if needed
-                async with aiohttp.ClientSession(connector=connector) as local_session:
-                    try:
-                        async with local_session.get(url, proxy=proxy_url, headers=headers, timeout=timeout) as response:
-                            if response.status == 407:
-                                logger.error(f"Authentication error (407) for Bright Data proxy. Check username format and credentials.")
-                                # Detailed error message to help diagnose auth issues
-                                response_text = await response.text()
-                                logger.error(f"Proxy response: {response_text[:200]}...")
-                                raise aiohttp.ClientResponseError(
-                                    request_info=None,
-                                    history=None,
-                                    status=407,
-                                    message=f"Authentication failed for Bright Data proxy",
-                                    headers=None
-                                )
-                            elif response.status == 503:
-                                logger.warning(f"Received service unavailable (503) for {url}, will retry")
-                                raise aiohttp.ClientResponseError(
-                                    request_info=None,
-                                    history=None,
-                                    status=503,
-                                    message=f"Service unavailable for {url}",
-                                    headers=None
-                                )
-                            elif response.status != 200:
-                                logger.warning(f"Received status code {response.status} for {url}")
-                                return ""
-
-                            # Get HTML content
-                            return await response.text()
-                    except aiohttp.ClientProxyConnectionError as proxy_err:
-                        logger.error(f"Failed to connect to Bright Data proxy: {str(proxy_err)}")
-                        raise
+                # Reuse the caller's session and its pooled connections
+                try:
+                    async with session.get(url, proxy=proxy_url, headers=headers, timeout=timeout) as response:
+                        if response.status == 407:
+                            logger.error(f"Authentication error (407) for Bright Data proxy. Check username format and credentials.")
+                            # Detailed error message to help diagnose auth issues
+                            response_text = await response.text()
+                            logger.error(f"Proxy response: {response_text[:200]}...")
+                            raise aiohttp.ClientResponseError(
+                                request_info=None,
+                                history=None,
+                                status=407,
+                                message=f"Authentication failed for Bright Data proxy",
+                                headers=None
+                            )
+                        elif response.status == 503:
+                            logger.warning(f"Received service unavailable (503) for {url}, will retry")
+                            raise aiohttp.ClientResponseError(
+                                request_info=None,
+                                history=None,
+                                status=503,
+                                message=f"Service unavailable for {url}",
+                                headers=None
+                            )
+                        elif response.status != 200:
+                            logger.warning(f"Received status code {response.status} for {url}")
+                            return b""
+
+                        # Get raw HTML content, the parser handles decoding
+                        return await response.read()
+                except aiohttp.ClientProxyConnectionError as proxy_err:
+                    logger.error(f"Failed to connect to Bright Data proxy: {str(proxy_err)}")
+                    raise
             except aiohttp.ClientSSLError as ssl_err:
                 logger.error(f"SSL certificate verification error for {url}: {str(ssl_err)}")
                 if self.verify_ssl:
@@ -541,10 +611,10 @@ class BrightDataPriceScraper(PriceScraper):
             )
         except aiohttp.ClientError as e:
             logger.error(f"Network error when fetching HTML from {url} after retries: {str(e)}")
-            return ""
+            return b""
         except Exception as e:
             logger.error(f"Error fetching HTML from {url} after retries: {str(e)}")
-            return ""
+            return b""
 
     def _fallback_price_extraction(self, html_content: str, store_name: str, url: str) -> List[Dict[str, Any]]:
         """
@@ -820,9 +890,6 @@ class BrightDataPriceScraper(PriceScraper):
         Returns:
             List of dictionaries containing scraped price data
         """
-        import aiohttp
-        import asyncio
-
         # If credentials are not set, return empty result
         if not self.username or not self.password:
             logger.error("Cannot scrape prices: Bright Data credentials are not configured")
@@ -857,35 +924,28 @@ class BrightDataPriceScraper(PriceScraper):
         # Limit concurrent scraping to avoid overwhelming resources
         semaphore = asyncio.Semaphore(3)  # Max 3 concurrent requests
 
-        # Create connector with appropriate SSL settings
-        if not self.verify_ssl:
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            logger.info(f"Created session with SSL verification disabled for {model} scraping")
-        else:
-            connector = aiohttp.TCPConnector()
-            logger.info(f"Created session with SSL verification enabled for {model} scraping")
-
-        # Create async tasks for each URL
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # Define inner function to scrape with semaphore control
-            async def scrape_with_semaphore(url):
-                async with semaphore:
-                    try:
-                        return await self._scrape_single_url(session, url, proxy_url, timeout)
-                    except aiohttp.ClientSSLError as ssl_err:
-                        logger.error(f"SSL error while scraping {url}: {str(ssl_err)}")
-                        if self.verify_ssl:
-                            logger.error("Consider setting VERIFY_SSL=false for development if this is a trusted site")
-                        return []
-                    except Exception as e:
-                        logger.error(f"Error scraping {url}: {str(e)}")
-                        return []
-
-            # Create tasks
-            tasks = [scrape_with_semaphore(url) for url in urls]
-
-            # Execute all tasks concurrently
-            results = await asyncio.gather(*tasks)
+        # Reuse the long-lived session rather than opening connections per scrape
+        session = await self._get_session()
+
+        # Define inner function to scrape with semaphore control
+        async def scrape_with_semaphore(url):
+            async with semaphore:
+                try:
+                    return await self._scrape_single_url(session, url, proxy_url, timeout)
+                except aiohttp.ClientSSLError as ssl_err:
+                    logger.error(f"SSL error while scraping {url}: {str(ssl_err)}")
+                    if self.verify_ssl:
+                        logger.error("Consider setting VERIFY_SSL=false for development if this is a trusted site")
+                    return []
+                except Exception as e:
+                    logger.error(f"Error scraping {url}: {str(e)}")
+                    return []
+
+        # Create tasks
+        tasks = [scrape_with_semaphore(url) for url in urls]
+
+        # Execute all tasks concurrently
+        results = await asyncio.gather(*tasks)
 
         # Process results
         all_products = []
@@ -8,25 +8,51 @@ the BaseEcommerceParser interface with Amazon-specific HTML parsing logic.
 import logging
 import re
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List, Union
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
 
 from .base_parser import BaseEcommerceParser
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# First decimal number in a rating text such as "4.5 out of 5 stars"
+_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Only search-result containers are kept when building the tree for listing pages
+_SEARCH_RESULT_STRAINER = SoupStrainer('div', attrs={'data-component-type': 's-search-result'})
+_SEARCH_RESULT_TOKENS = ('s-search-result',)
+
 
 class AmazonParser(BaseEcommerceParser):
     """Parser specialized for Amazon product pages."""
     
-    async def parse(self, html_content: str, url: str) -> List[Dict[str, Any]]:
+    # Class names of the product container fields, matched in a single walk
+    _class_aliases: Dict[str, FrozenSet[str]] = {
+        "rating": frozenset({'a-icon-star'}),
+        "availability": frozenset({'a-color-price'}),
+    }
+    
+    # CSS selectors compiled once per class, keyed by field so subclasses can override them
+    _selectors: Dict[str, sv.SoupSieve] = {
+        "search_results": sv.compile('div[data-component-type="s-search-result"]'),
+        "captcha": sv.compile('img[src*="captcha"]'),
+        "page_price": sv.compile('#priceblock_ourprice, .a-price'),
+        "title": sv.compile('h2 a span, .a-text-normal'),
+        "price": sv.compile('.a-price .a-offscreen, .a-price-whole'),
+        "link": sv.compile('h2 a, .a-link-normal'),
+        "page_offscreen_price": sv.compile('.a-price .a-offscreen'),
+    }
+    
+    def _parse_sync(self, html_content: Union[str, bytes], url: str) -> List[Dict[str, Any]]:
         """
         Parse Amazon HTML content and extract product data.
         
         Args:
-            html_content: HTML content to parse
+            html_content: HTML content to parse, as text or raw response bytes
             url: Source URL for reference
             
         Returns:
@@ -36,37 +62,50 @@ class AmazonParser(BaseEcommerceParser):
             logger.warning(f"Empty HTML content for Amazon URL: {url}")
             return []
             
+        strained_soup = soup = None
         try:
             results = []
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Check for captcha or robot check
-            if self._is_blocked(soup):
-                logger.warning(f"Access blocked by Amazon for URL: {url}")
-                return []
+            # Stamp every product from this page with the same date
+            today = datetime.now().strftime("%Y-%m-%d")
             
-            # Primary selector for search results
-            product_containers = soup.select('div[data-component-type="s-search-result"]')
+            # Listing pages: build a tree holding only the search-result containers,
+            # skipped when the page does not mention them at all
+            product_containers = []
+            if self._mentions(html_content, _SEARCH_RESULT_TOKENS):
+                strained_soup = BeautifulSoup(html_content, 'lxml', parse_only=_SEARCH_RESULT_STRAINER)
+                product_containers = self._selectors["search_results"].select(strained_soup)
             
             if not product_containers:
+                # Not a regular listing page, fall back to parsing the full document
+                soup = BeautifulSoup(html_content, 'lxml')
+                
+                # Check for captcha or robot check
+                if self._is_blocked(soup):
+                    logger.warning(f"Access blocked by Amazon for URL: {url}")
+                    return []
+                
                 # Try alternative selectors
-                product_containers = soup.select('.s-result-item')
+                product_containers = soup.find_all(class_='s-result-item')
                 
-            if not product_containers:
-                logger.warning(f"No product containers found for Amazon URL: {url}")
-                # Try to determine if it's a single product page
-                if self._is_product_page(soup):
-                    single_product = self._extract_single_product(soup, url)
-                    if single_product:
-                        results.append(single_product)
-                    return results
-                return []
+                if not product_containers:
+                    logger.warning(f"No product containers found for Amazon URL: {url}")
+                    # Try to determine if it's a single product page
+                    if self._is_product_page(soup):
+                        single_product = self._extract_single_product(soup, url, today)
+                        if single_product:
+                            results.append(single_product)
+                        return results
+                    return []
             
             logger.info(f"Found {len(product_containers)} product containers on Amazon")
             
+            # Relative product links are resolved against the page's origin
+            parsed_url = urlparse(url)
+            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            
             # Extract data from each container
             for container in product_containers:
-                product = self._extract_from_container(container, url)
+                product = self._extract_from_container(container, url, base_url, today)
                 if product:
                     results.append(product)
             
@@ -76,8 +115,13 @@ class AmazonParser(BaseEcommerceParser):
         except Exception as e:
             logger.error(f"Error parsing Amazon HTML content: {str(e)}")
             return []
+        finally:
+            # Free the trees right away instead of leaving their reference cycles to the GC
+            for tree in (strained_soup, soup):
+                if tree is not None:
+                    tree.decompose()
     
-    async def can_parse(self, url: str) -> bool:
+    def can_parse(self, url: str) -> bool:
         """
         Determine if this parser can handle the given URL.
         
@@ -105,7 +149,7 @@ class AmazonParser(BaseEcommerceParser):
                 return True
                 
         # Check for captcha image
-        captcha_img = soup.select_one('img[src*="captcha"]')
+        captcha_img = self._selectors["captcha"].select_one(soup)
         if captcha_img:
             return True
             
@@ -114,150 +158,114 @@ class AmazonParser(BaseEcommerceParser):
     def _is_product_page(self, soup: BeautifulSoup) -> bool:
         """Determine if the page is a single product page."""
         # Check for product page indicators
-        product_title = soup.select_one('#productTitle')
-        product_price = soup.select_one('#priceblock_ourprice, .a-price')
+        product_title = soup.find(id='productTitle')
+        product_price = self._selectors["page_price"].select_one(soup)
         
         return product_title is not None or product_price is not None
     
-    def _extract_from_container(self, container, url: str) -> Dict[str, Any]:
+    def _extract_from_container(self, container, url: str, base_url: str, today: str) -> Dict[str, Any]:
         """Extract product data from a search result container."""
-        try:
-            # Extract title
-            title_elem = container.select_one('h2 a span, .a-text-normal')
-            title = title_elem.get_text().strip() if title_elem else "Unknown Product"
-            
-            # Extract price
-            price_elem = container.select_one('.a-price .a-offscreen, .a-price-whole')
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Clean price text and extract numeric value
-            price = self._extract_price(price_text)
-            
-            # Determine currency based on domain
-            currency = self._extract_currency_from_url(url)
-            
-            # Extract product URL
-            link_elem = container.select_one('h2 a, .a-link-normal')
-            product_url = url
-            if link_elem and link_elem.get('href'):
-                href = link_elem.get('href')
-                if href.startswith('http'):
-                    product_url = href
-                elif href.startswith('/'):
-                    # Handle relative URLs
-                    from urllib.parse import urlparse
-                    parsed_url = urlparse(url)
-                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                    product_url = f"{base_url}{href}"
-            
-            # Extract rating
-            rating = None
-            rating_elem = container.select_one('.a-icon-star')
-            if rating_elem:
-                rating_text = rating_elem.get_text().strip()
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Check if in stock
-            in_stock = True
-            availability_elem = container.select_one('.a-color-price')
-            if availability_elem and 'unavailable' in availability_elem.get_text().lower():
-                in_stock = False
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": product_url,
-                "store": "Amazon",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": in_stock,
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting product data from Amazon container: {str(e)}")
-            return {}
+        # Look up all aliased fields in a single pass over the container
+        fields = self._find_fields(container)
+        
+        # Extract title
+        title_elem = self._selectors["title"].select_one(container)
+        title = title_elem.get_text().strip() if title_elem else "Unknown Product"
+        
+        # Extract price
+        price_elem = self._selectors["price"].select_one(container)
+        price_text = price_elem.get_text().strip() if price_elem else ""
+        
+        # Clean price text and extract numeric value
+        price = self._extract_price(price_text)
+        
+        # Determine currency based on domain
+        currency = self._extract_currency_from_url(url)
+        
+        # Extract product URL
+        link_elem = self._selectors["link"].select_one(container)
+        product_url = url
+        if link_elem and link_elem.get('href'):
+            href = link_elem.get('href')
+            if href.startswith('http'):
+                product_url = href
+            elif href.startswith('/'):
+                # Handle relative URLs
+                product_url = f"{base_url}{href}"
+        
+        # Extract rating
+        rating = None
+        rating_elem = fields.get("rating")
+        if rating_elem:
+            rating_text = rating_elem.get_text().strip()
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Check if in stock
+        in_stock = True
+        availability_elem = fields.get("availability")
+        if availability_elem and 'unavailable' in availability_elem.get_text().lower():
+            in_stock = False
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": product_url,
+            "store": "Amazon",
+            "date": today,
+            "in_stock": in_stock,
+            "rating": rating
+        }
     
-    def _extract_single_product(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    def _extract_single_product(self, soup: BeautifulSoup, url: str, today: str) -> Dict[str, Any]:
         """Extract data from a single product page."""
-        try:
-            # Extract title
-            title_elem = soup.select_one('#productTitle')
-            title = title_elem.get_text().strip() if title_elem else "Unknown Product"
-            
-            # Extract price (multiple possible selectors)
-            price_elem = (
-                soup.select_one('#priceblock_ourprice') or 
-                soup.select_one('.a-price .a-offscreen') or
-                soup.select_one('#price_inside_buybox')
-            )
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Clean price text and extract numeric value
-            price = self._extract_price(price_text)
-            
-            # Determine currency based on domain
-            currency = self._extract_currency_from_url(url)
-            
-            # Extract rating
-            rating = None
-            rating_elem = soup.select_one('#acrPopover')
-            if rating_elem:
-                rating_text = rating_elem.get('title', '')
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Check if in stock
-            in_stock = True
-            availability_elem = soup.select_one('#availability')
-            if availability_elem:
-                availability_text = availability_elem.get_text().lower()
-                if 'unavailable' in availability_text or 'out of stock' in availability_text:
-                    in_stock = False
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": url,
-                "store": "Amazon",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": in_stock,
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting data from Amazon product page: {str(e)}")
-            return {}
-    
-    def _extract_price(self, price_text: str) -> float:
-        """Extract numeric price value from text."""
-        if not price_text:
-            return None
-            
-        # Remove currency symbols and non-numeric characters except for . and ,
-        clean_text = re.sub(r'[^\d.,]', '', price_text)
+        # Extract title
+        title_elem = soup.find(id='productTitle')
+        title = title_elem.get_text().strip() if title_elem else "Unknown Product"
         
-        # Handle different number formats
-        if ',' in clean_text and '.' in clean_text:
-            # Amazon US format: 1,234.56
-            clean_text = clean_text.replace(',', '')
-        elif ',' in clean_text:
-            # Amazon EU format: 1.234,56
-            if len(clean_text.split(',')[1]) == 2:
-                # It's a decimal separator
-                clean_text = clean_text.replace(',', '.')
-            else:
-                # It's a thousand separator
-                clean_text = clean_text.replace(',', '')
+        # Extract price (multiple possible selectors)
+        price_elem = (
+            soup.find(id='priceblock_ourprice') or 
+            self._selectors["page_offscreen_price"].select_one(soup) or
+            soup.find(id='price_inside_buybox')
+        )
+        price_text = price_elem.get_text().strip() if price_elem else ""
         
-        try:
-            return float(clean_text)
-        except ValueError:
-            return None
+        # Clean price text and extract numeric value
+        price = self._extract_price(price_text)
+        
+        # Determine currency based on domain
+        currency = self._extract_currency_from_url(url)
+        
+        # Extract rating
+        rating = None
+        rating_elem = soup.find(id='acrPopover')
+        if rating_elem:
+            rating_text = rating_elem.get('title', '')
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Check if in stock
+        in_stock = True
+        availability_elem = soup.find(id='availability')
+        if availability_elem:
+            availability_text = availability_elem.get_text().lower()
+            if 'unavailable' in availability_text or 'out of stock' in availability_text:
+                in_stock = False
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": url,
+            "store": "Amazon",
+            "date": today,
+            "in_stock": in_stock,
+            "rating": rating
+        }
     
     def _extract_currency_from_url(self, url: str) -> str:
         """Determine currency based on Amazon domain."""
@@ -276,8 +284,9 @@ class AmazonParser(BaseEcommerceParser):
             "amazon.com.au": "AUD"
         }
         
+        url_lower = url.lower()
         for domain, currency in domain_currency_map.items():
-            if domain in url.lower():
+            if domain in url_lower:
                 return currency
                 
         return "USD"  # Default to USD
@@ -5,28 +5,144 @@ This module defines the base parser interface that all site-specific parsers
 must implement, following the Interface Segregation Principle from SOLID.
 """
 
+import asyncio
+import atexit
+import multiprocessing
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from bs4 import Tag
+
+# Anything that is not a digit or a separator (currency symbols, spaces, text)
+_NON_NUMERIC_RE = re.compile(r'[^\d.,]')
+
+# Deletes every ASCII character other than digits and separators in one C-level pass
+_ASCII_NON_NUMERIC_TABLE = dict.fromkeys(
+    code for code in range(128) if chr(code) not in '0123456789.,'
+)
+
+# Translation tables applied once the decimal separator has been identified
+_DECIMAL_DOT_TABLE = str.maketrans({',': None})
+_DECIMAL_COMMA_TABLE = str.maketrans({'.': None, ',': '.'})
+_NO_DECIMAL_TABLE = str.maketrans({'.': None, ',': None})
+
+# Pages at least this long (characters for text, bytes for raw responses) are parsed
+# in a worker process instead of a thread; below it, pickling the page and the results
+# costs more than the GIL contention
+_PROCESS_POOL_MIN_CHARS = 256 * 1024
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared parsing process pool, creating it on first use.
+
+    Workers are started with forkserver (spawn where it is unavailable) rather than
+    fork: the app already runs threads, and forking them can deadlock the children.
+    """
+    global _process_pool
+    if _process_pool is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _process_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(start_method))
+    return _process_pool
+
+
+def _shutdown_process_pool() -> None:
+    """Shut down the shared parsing process pool, if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown()
+        _process_pool = None
+
+
+atexit.register(_shutdown_process_pool)
+
+
+def _invert_aliases(aliases: Dict[str, FrozenSet[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Map each alias to the fields it identifies."""
+    fields_by_alias: Dict[str, Tuple[str, ...]] = {}
+    for field, names in aliases.items():
+        for name in names:
+            fields_by_alias[name] = fields_by_alias.get(name, ()) + (field,)
+    return fields_by_alias
 
 
 class BaseEcommerceParser(ABC):
     """Base parser with common functionality for all e-commerce sites."""
     
-    @abstractmethod
-    async def parse(self, html_content: str, url: str) -> List[Dict[str, Any]]:
+    # Class names identifying each product container field, e.g. {"price": frozenset({"priceCard"})}
+    _class_aliases: Dict[str, FrozenSet[str]] = {}
+    
+    # data-testid values identifying each product container field
+    _testid_aliases: Dict[str, FrozenSet[str]] = {}
+    
+    # Tag names identifying each product container field, optionally requiring an
+    # attribute to be present, e.g. {"link": frozenset({"a[href]"})}
+    _tag_aliases: Dict[str, FrozenSet[str]] = {}
+    
+    # Inverses of the alias maps, built for each subclass: alias -> fields it identifies
+    _fields_by_class: Dict[str, Tuple[str, ...]] = {}
+    _fields_by_testid: Dict[str, Tuple[str, ...]] = {}
+    _fields_by_tag: Dict[str, Tuple[Tuple[str, Optional[str]], ...]] = {}
+    _field_count = 0
+    
+    def __init_subclass__(cls, **kwargs):
+        """Index the subclass's container field aliases by class, testid and tag name."""
+        super().__init_subclass__(**kwargs)
+        cls._fields_by_class = _invert_aliases(cls._class_aliases)
+        cls._fields_by_testid = _invert_aliases(cls._testid_aliases)
+        
+        fields_by_tag: Dict[str, Tuple[Tuple[str, Optional[str]], ...]] = {}
+        for field, aliases in cls._tag_aliases.items():
+            for alias in aliases:
+                name, _, attribute = alias.rstrip(']').partition('[')
+                fields_by_tag[name] = fields_by_tag.get(name, ()) + ((field, attribute or None),)
+        cls._fields_by_tag = fields_by_tag
+        
+        cls._field_count = len(
+            set(cls._class_aliases) | set(cls._testid_aliases) | set(cls._tag_aliases)
+        )
+    
+    async def parse(self, html_content: Union[str, bytes], url: str) -> List[Dict[str, Any]]:
         """
         Parse HTML content and extract product data.
         
+        Parsing is CPU-bound, so it runs in a worker thread to keep the event loop
+        free for other scrapes in flight. Large listing pages go to a worker process
+        instead, so several of them can be parsed on separate cores.
+        
+        Args:
+            html_content: HTML content to parse, as text or raw response bytes
+            url: Source URL for reference
+            
+        Returns:
+            List of dictionaries containing product data
+        """
+        if len(html_content) >= _PROCESS_POOL_MIN_CHARS:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_process_pool(), self._parse_sync, html_content, url
+            )
+        return await asyncio.to_thread(self._parse_sync, html_content, url)
+    
+    @abstractmethod
+    def _parse_sync(self, html_content: Union[str, bytes], url: str) -> List[Dict[str, Any]]:
+        """
+        Parse HTML content and extract product data, blocking the calling thread.
+        
         Args:
-            html_content: HTML content to parse
+            html_content: HTML content to parse, as text or raw response bytes
             url: Source URL for reference
             
         Returns:
             List of dictionaries containing product data
         """
-        raise NotImplementedError("Subclasses must implement parse method")
+        raise NotImplementedError("Subclasses must implement _parse_sync method")
     
-    async def can_parse(self, url: str) -> bool:
+    def can_parse(self, url: str) -> bool:
         """
         Determine if this parser can handle the given URL.
         
@@ -37,3 +153,109 @@ class BaseEcommerceParser(ABC):
             True if this parser can handle the URL, False otherwise
         """
         return False
+    
+    @staticmethod
+    def _mentions(html_content: Union[str, bytes], tokens: Tuple[str, ...]) -> bool:
+        """
+        Check whether the raw HTML contains any of the given ASCII tokens.
+        
+        A substring search is far cheaper than building a tree, so parsers use it
+        to skip parsing passes that cannot match anything on the page.
+        
+        Args:
+            html_content: HTML content, as text or raw response bytes
+            tokens: Class names, attribute values or other markers to look for
+            
+        Returns:
+            True if at least one token occurs in the content
+        """
+        if isinstance(html_content, bytes):
+            return any(token.encode() in html_content for token in tokens)
+        return any(token in html_content for token in tokens)
+    
+    def _find_fields(self, container: Tag) -> Dict[str, Tag]:
+        """
+        Find the elements for all aliased fields in one walk over a container.
+        
+        Each field gets the first descendant, in document order, matching any of its
+        class, data-testid or tag aliases, which is what a select_one() over the
+        same aliases returns per field.
+        
+        Args:
+            container: Product container element
+            
+        Returns:
+            Dictionary mapping field names to the matching elements
+        """
+        fields_by_class = self._fields_by_class
+        fields_by_testid = self._fields_by_testid
+        fields_by_tag = self._fields_by_tag
+        found: Dict[str, Tag] = {}
+        remaining = self._field_count
+        
+        for tag in container.descendants:
+            if remaining == 0:
+                break
+            if not isinstance(tag, Tag):
+                continue
+            attrs = tag.attrs
+            
+            for class_name in attrs.get('class') or ():
+                for field in fields_by_class.get(class_name, ()):
+                    if field not in found:
+                        found[field] = tag
+                        remaining -= 1
+            
+            testid = attrs.get('data-testid')
+            if testid:
+                for field in fields_by_testid.get(testid, ()):
+                    if field not in found:
+                        found[field] = tag
+                        remaining -= 1
+            
+            for field, attribute in fields_by_tag.get(tag.name, ()):
+                if field not in found and (attribute is None or attribute in attrs):
+                    found[field] = tag
+                    remaining -= 1
+        
+        return found
+    
+    def _extract_price(self, price_text: str) -> Optional[float]:
+        """
+        Extract numeric price value from text.
+        
+        The rightmost of '.' and ',' is taken as the decimal separator, unless it is
+        the only kind of separator present and is followed by exactly three digits
+        (e.g. 1,234 or 1.234.567), in which case it is a thousands separator.
+        
+        Args:
+            price_text: Raw price text, possibly containing currency symbols
+            
+        Returns:
+            Price as float, or None if no price could be extracted
+        """
+        if not price_text:
+            return None
+            
+        # Remove currency symbols and non-numeric characters except for . and ,
+        clean_text = price_text.translate(_ASCII_NON_NUMERIC_TABLE)
+        if not clean_text.isascii():
+            # Non-ASCII leftovers such as €, £ or non-breaking spaces
+            clean_text = _NON_NUMERIC_RE.sub('', clean_text)
+        
+        last_dot = clean_text.rfind('.')
+        last_comma = clean_text.rfind(',')
+        separator = max(last_dot, last_comma)
+        
+        if separator != -1:
+            if min(last_dot, last_comma) == -1 and len(clean_text) - separator == 4:
+                clean_text = clean_text.translate(_NO_DECIMAL_TABLE)
+            elif separator == last_dot:
+                clean_text = clean_text.translate(_DECIMAL_DOT_TABLE)
+            else:
+                clean_text = clean_text.translate(_DECIMAL_COMMA_TABLE)
+        
+        try:
+            return float(clean_text)
+        except ValueError:
+            return None
@@ -8,7 +8,9 @@ from any e-commerce site using general patterns and heuristics.
 import logging
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Union
+from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 
@@ -17,16 +19,59 @@ from .base_parser import BaseEcommerceParser
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# First decimal number in a rating text such as "4.5 out of 5 stars"
+_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Currency symbols as they appear at either end of a price, e.g. "$ 10" or "10 €"
+_CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP"}
+
+# Fallback scan for prices with a code or a symbol in the middle, "R$" before "$"
+_CURRENCY_MARKERS = (
+    ("R$", "BRL"), ("$", "USD"), ("€", "EUR"), ("£", "GBP"),
+    ("USD", "USD"), ("EUR", "EUR"), ("GBP", "GBP"), ("BRL", "BRL"),
+)
+
+
+@lru_cache(maxsize=256)
+def _store_from_url(url: str) -> str:
+    """Derive a store name from a URL's domain, memoized since every product on a page shares it."""
+    parsed_url = urlparse(url)
+    domain = parsed_url.netloc.lower()
+    
+    # Remove www. prefix and get the domain name
+    if domain.startswith('www.'):
+        domain = domain[4:]
+        
+    # Extract the main domain part
+    domain_parts = domain.split('.')
+    if len(domain_parts) >= 2:
+        return domain_parts[-2].capitalize()  # Use the second-to-last part as store name
+    
+    return domain.capitalize()  # Fallback to full domain
+
 
 class GenericEcommerceParser(BaseEcommerceParser):
     """Generic parser for any e-commerce site."""
     
-    async def parse(self, html_content: str, url: str) -> List[Dict[str, Any]]:
+    # Product container field aliases, matched in a single walk
+    _class_aliases: Dict[str, FrozenSet[str]] = {
+        "title": frozenset({'product-title', 'name', 'title'}),
+        "price": frozenset({'price', 'product-price', 'current-price', 'sale-price'}),
+        "rating": frozenset({'rating', 'stars', 'product-rating'}),
+    }
+    _tag_aliases: Dict[str, FrozenSet[str]] = {
+        "title": frozenset({'h3', 'h2'}),
+        # Linked titles are only used when no other title element is found
+        "title_link": frozenset({'a[title]'}),
+        "link": frozenset({'a[href]'}),
+    }
+    
+    def _parse_sync(self, html_content: Union[str, bytes], url: str) -> List[Dict[str, Any]]:
         """
         Parse HTML content and extract product data using generic patterns.
         
         Args:
-            html_content: HTML content to parse
+            html_content: HTML content to parse, as text or raw response bytes
             url: Source URL for reference
             
         Returns:
@@ -36,25 +81,32 @@ class GenericEcommerceParser(BaseEcommerceParser):
             logger.warning(f"Empty HTML content for {url}")
             return []
             
+        soup = None
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, 'lxml')
             results = []
+            # Stamp every product from this page with the same date
+            today = datetime.now().strftime("%Y-%m-%d")
             
             # Try to find product containers using common class patterns
-            product_containers = soup.select('.product-item, .product-card, .product-container, .product')
+            product_containers = soup.find_all(class_=['product-item', 'product-card', 'product-container', 'product'])
             
             if product_containers:
                 logger.info(f"Found {len(product_containers)} product containers")
                 
+                # Relative product links are resolved against the page's origin
+                parsed_url = urlparse(url)
+                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+                
                 # Extract from containers
                 for container in product_containers:
-                    product = self._extract_from_container(container, url)
+                    product = self._extract_from_container(container, url, base_url, today)
                     if product:
                         results.append(product)
             else:
                 # Try fallback extraction if no containers found
                 logger.warning(f"No product containers found using generic selectors for {url}")
-                fallback_product = self._extract_single_product(soup, url)
+                fallback_product = self._extract_single_product(soup, url, today)
                 if fallback_product:
                     results.append(fallback_product)
             
@@ -64,8 +116,12 @@ class GenericEcommerceParser(BaseEcommerceParser):
         except Exception as e:
             logger.error(f"Error parsing HTML content: {str(e)}")
             return []
+        finally:
+            # Free the tree right away instead of leaving its reference cycles to the GC
+            if soup is not None:
+                soup.decompose()
     
-    async def can_parse(self, url: str) -> bool:
+    def can_parse(self, url: str) -> bool:
         """
         Determine if this parser can handle the given URL.
         
@@ -77,189 +133,134 @@ class GenericEcommerceParser(BaseEcommerceParser):
         """
         return True
     
-    def _extract_from_container(self, container, url: str) -> Optional[Dict[str, Any]]:
+    def _extract_from_container(self, container, url: str, base_url: str, today: str) -> Optional[Dict[str, Any]]:
         """Extract product data from a container element."""
-        try:
-            # Try to find title using common patterns
-            title_elem = (
-                container.select_one('.product-title, .name, .title, h3, h2') or
-                container.find('a', attrs={'title': True})
-            )
-            
-            if not title_elem:
-                return None
-                
-            title = title_elem.get_text().strip()
-            if not title:
-                return None
-            
-            # Try to find price using common patterns
-            price_elem = container.select_one('.price, .product-price, .current-price, .sale-price')
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Extract price and currency
-            price = self._extract_price(price_text)
-            currency = self._extract_currency(price_text)
-            
-            # Try to find URL
-            product_url = url
-            url_elem = container.find('a', href=True)
-            if url_elem and url_elem.get('href'):
-                href = url_elem.get('href')
-                if href.startswith('http'):
-                    product_url = href
-                elif href.startswith('/'):
-                    # Handle relative URLs
-                    from urllib.parse import urlparse
-                    parsed_url = urlparse(url)
-                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                    product_url = f"{base_url}{href}"
-            
-            # Try to find rating
-            rating = None
-            rating_elem = container.select_one('.rating, .stars, .product-rating')
-            if rating_elem:
-                rating_text = rating_elem.get_text().strip()
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Extract store name from URL
-            store = self._extract_store_name(url)
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": product_url,
-                "store": store,
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": True,  # Assume in stock if listed
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting product data from container: {str(e)}")
+        # Look up all aliased fields in a single pass over the container
+        fields = self._find_fields(container)
+        
+        # Try to find title using common patterns
+        title_elem = fields.get("title") or fields.get("title_link")
+        
+        if not title_elem:
             return None
-    
-    def _extract_single_product(self, soup, url: str) -> Optional[Dict[str, Any]]:
-        """Extract data from a single product page."""
-        try:
-            # Try to find product title in common header locations
-            title_elem = (
-                soup.select_one('h1.product-title, h1.title, h1.name, h1') or
-                soup.select_one('.product-title, .title, .name')
-            )
-            
-            if not title_elem:
-                return None
-                
-            title = title_elem.get_text().strip()
-            if not title:
-                return None
-            
-            # Try to find price using common patterns
-            price_elem = soup.select_one('.price, .product-price, .current-price, .sale-price')
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Extract price and currency
-            price = self._extract_price(price_text)
-            currency = self._extract_currency(price_text)
-            
-            # Try to find rating
-            rating = None
-            rating_elem = soup.select_one('.rating, .stars, .product-rating')
-            if rating_elem:
-                rating_text = rating_elem.get_text().strip()
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
             
-            # Extract store name from URL
-            store = self._extract_store_name(url)
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": url,
-                "store": store,
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": True,  # Assume in stock if on page
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting single product data: {str(e)}")
+        title = title_elem.get_text().strip()
+        if not title:
             return None
+        
+        # Try to find price using common patterns
+        price_elem = fields.get("price")
+        price_text = price_elem.get_text().strip() if price_elem else ""
+        
+        # Extract price and currency
+        price = self._extract_price(price_text)
+        currency = self._extract_currency(price_text)
+        
+        # Try to find URL
+        product_url = url
+        url_elem = fields.get("link")
+        if url_elem and url_elem.get('href'):
+            href = url_elem.get('href')
+            if href.startswith('http'):
+                product_url = href
+            elif href.startswith('/'):
+                # Handle relative URLs
+                product_url = f"{base_url}{href}"
+        
+        # Try to find rating
+        rating = None
+        rating_elem = fields.get("rating")
+        if rating_elem:
+            rating_text = rating_elem.get_text().strip()
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Extract store name from URL
+        store = self._extract_store_name(url)
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": product_url,
+            "store": store,
+            "date": today,
+            "in_stock": True,  # Assume in stock if listed
+            "rating": rating
+        }
     
-    def _extract_price(self, price_text: str) -> Optional[float]:
-        """Extract numeric price value from text."""
-        if not price_text:
+    def _extract_single_product(self, soup, url: str, today: str) -> Optional[Dict[str, Any]]:
+        """Extract data from a single product page."""
+        # Try to find product title in common header locations
+        # Any h1 matches, so the first one in the document wins regardless of its class
+        title_elem = (
+            soup.find('h1') or
+            soup.find(class_=['product-title', 'title', 'name'])
+        )
+        
+        if not title_elem:
             return None
             
-        # Remove currency symbols and non-numeric characters except for . and ,
-        clean_text = re.sub(r'[^\d.,]', '', price_text)
+        title = title_elem.get_text().strip()
+        if not title:
+            return None
         
-        # Handle different number formats
-        if ',' in clean_text and '.' in clean_text:
-            # Determine which is decimal separator based on position
-            if clean_text.rindex('.') > clean_text.rindex(','):
-                # Format: 1,234.56
-                clean_text = clean_text.replace(',', '')
-            else:
-                # Format: 1.234,56
-                clean_text = clean_text.replace('.', '').replace(',', '.')
-        elif ',' in clean_text:
-            # Could be either 1,234 or 1,23
-            if len(clean_text.split(',')[1]) == 2:
-                # Likely a decimal: 1,23
-                clean_text = clean_text.replace(',', '.')
-            else:
-                # Likely a thousand separator: 1,234
-                clean_text = clean_text.replace(',', '')
+        # Try to find price using common patterns
+        price_elem = soup.find(class_=['price', 'product-price', 'current-price', 'sale-price'])
+        price_text = price_elem.get_text().strip() if price_elem else ""
         
-        try:
-            return float(clean_text)
-        except ValueError:
-            return None
+        # Extract price and currency
+        price = self._extract_price(price_text)
+        currency = self._extract_currency(price_text)
+        
+        # Try to find rating
+        rating = None
+        rating_elem = soup.find(class_=['rating', 'stars', 'product-rating'])
+        if rating_elem:
+            rating_text = rating_elem.get_text().strip()
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Extract store name from URL
+        store = self._extract_store_name(url)
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": url,
+            "store": store,
+            "date": today,
+            "in_stock": True,  # Assume in stock if on page
+            "rating": rating
+        }
     
     def _extract_currency(self, price_text: str) -> str:
         """Extract currency from price text."""
         if not price_text:
             return "USD"  # Default
-            
-        currency_map = {
-            "$": "USD",
-            "USD": "USD",
-            "€": "EUR",
-            "EUR": "EUR",
-            "£": "GBP",
-            "GBP": "GBP",
-            "R$": "BRL",
-            "BRL": "BRL"
-        }
         
-        for symbol, code in currency_map.items():
-            if symbol in price_text:
+        text = price_text.strip()
+        if text.startswith("R$"):
+            return "BRL"
+        
+        # Symbols almost always lead or trail the amount
+        currency = _CURRENCY_SYMBOLS.get(text[:1]) or _CURRENCY_SYMBOLS.get(text[-1:])
+        if currency:
+            return currency
+        
+        # A bare amount has nothing else to look for
+        if text[:1].isdigit() and text[-1:].isdigit():
+            return "USD"
+        
+        for marker, code in _CURRENCY_MARKERS:
+            if marker in text:
                 return code
                 
         return "USD"  # Default to USD if no currency found
     
     def _extract_store_name(self, url: str) -> str:
         """Extract store name from URL."""
-        from urllib.parse import urlparse
-        
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
-        
-        # Remove www. prefix and get the domain name
-        if domain.startswith('www.'):
-            domain = domain[4:]
-            
-        # Extract the main domain part
-        domain_parts = domain.split('.')
-        if len(domain_parts) >= 2:
-            return domain_parts[-2].capitalize()  # Use the second-to-last part as store name
-        
-        return domain.capitalize()  # Fallback to full domain
+        return _store_from_url(url)
@@ -8,25 +8,50 @@ implementing the BaseEcommerceParser interface with site-specific HTML parsing l
 import logging
 import re
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, FrozenSet, List, Union
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
 
 from .base_parser import BaseEcommerceParser
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# First decimal number in a rating text such as "4.5 out of 5 stars"
+_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Only product cards are kept when building the tree for listing pages
+_PRODUCT_CARD_STRAINER = SoupStrainer(class_=['productCard', 'cardProduct'])
+_PRODUCT_CARD_TOKENS = ('productCard', 'cardProduct')
+
 
 class KabumParser(BaseEcommerceParser):
     """Parser specialized for Kabum product pages."""
     
-    async def parse(self, html_content: str, url: str) -> List[Dict[str, Any]]:
+    # Product container field aliases, matched in a single walk
+    _class_aliases: Dict[str, FrozenSet[str]] = {
+        "title": frozenset({'nameCard', 'productName', 'product-card__title'}),
+        "price": frozenset({'priceCard', 'finalPrice', 'price__value'}),
+        "rating": frozenset({'rating', 'stars'}),
+        "availability": frozenset({'unavailable', 'out-of-stock'}),
+    }
+    _tag_aliases: Dict[str, FrozenSet[str]] = {
+        "link": frozenset({'a[href]'}),
+    }
+    
+    # CSS selectors compiled once per class, keyed by field so subclasses can override them
+    _selectors: Dict[str, sv.SoupSieve] = {
+        "page_title": sv.compile('h1.product__title, .product-title'),
+    }
+    
+    def _parse_sync(self, html_content: Union[str, bytes], url: str) -> List[Dict[str, Any]]:
         """
         Parse Kabum HTML content and extract product data.
         
         Args:
-            html_content: HTML content to parse
+            html_content: HTML content to parse, as text or raw response bytes
             url: Source URL for reference
             
         Returns:
@@ -36,32 +61,45 @@ class KabumParser(BaseEcommerceParser):
             logger.warning(f"Empty HTML content for Kabum URL: {url}")
             return []
             
+        strained_soup = soup = None
         try:
             results = []
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Stamp every product from this page with the same date
+            today = datetime.now().strftime("%Y-%m-%d")
             
-            # Primary selector for search results
-            product_containers = soup.select('.productCard, .cardProduct')
+            # Primary selector for search results, on a tree holding only the product cards,
+            # skipped when the page does not mention them at all
+            product_containers = []
+            if self._mentions(html_content, _PRODUCT_CARD_TOKENS):
+                strained_soup = BeautifulSoup(html_content, 'lxml', parse_only=_PRODUCT_CARD_STRAINER)
+                product_containers = strained_soup.find_all(class_=['productCard', 'cardProduct'])
             
             if not product_containers:
+                # Not a regular listing page, fall back to parsing the full document
+                soup = BeautifulSoup(html_content, 'lxml')
+                
                 # Try alternative selectors
-                product_containers = soup.select('.product-list__item, .productItem')
+                product_containers = soup.find_all(class_=['product-list__item', 'productItem'])
                 
-            if not product_containers:
-                logger.warning(f"No product containers found for Kabum URL: {url}")
-                # Try to determine if it's a single product page
-                if self._is_product_page(soup):
-                    single_product = self._extract_single_product(soup, url)
-                    if single_product:
-                        results.append(single_product)
-                    return results
-                return []
+                if not product_containers:
+                    logger.warning(f"No product containers found for Kabum URL: {url}")
+                    # Try to determine if it's a single product page
+                    if self._is_product_page(soup):
+                        single_product = self._extract_single_product(soup, url, today)
+                        if single_product:
+                            results.append(single_product)
+                        return results
+                    return []
             
             logger.info(f"Found {len(product_containers)} product containers on Kabum")
             
+            # Relative product links are resolved against the page's origin
+            parsed_url = urlparse(url)
+            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            
             # Extract data from each container
             for container in product_containers:
-                product = self._extract_from_container(container, url)
+                product = self._extract_from_container(container, url, base_url, today)
                 if product:
                     results.append(product)
             
@@ -71,8 +109,13 @@ class KabumParser(BaseEcommerceParser):
         except Exception as e:
             logger.error(f"Error parsing Kabum HTML content: {str(e)}")
             return []
+        finally:
+            # Free the trees right away instead of leaving their reference cycles to the GC
+            for tree in (strained_soup, soup):
+                if tree is not None:
+                    tree.decompose()
     
-    async def can_parse(self, url: str) -> bool:
+    def can_parse(self, url: str) -> bool:
         """
         Determine if this parser can handle the given URL.
         
@@ -87,133 +130,105 @@ class KabumParser(BaseEcommerceParser):
     def _is_product_page(self, soup: BeautifulSoup) -> bool:
         """Determine if the page is a single product page."""
         # Check for product page indicators
-        product_title = soup.select_one('h1.product__title, .product-title')
-        product_price = soup.select_one('.finalPrice, .price__value')
+        product_title = self._selectors["page_title"].select_one(soup)
+        product_price = soup.find(class_=['finalPrice', 'price__value'])
         
         return product_title is not None or product_price is not None
     
-    def _extract_from_container(self, container, url: str) -> Dict[str, Any]:
+    def _extract_from_container(self, container, url: str, base_url: str, today: str) -> Dict[str, Any]:
         """Extract product data from a search result container."""
-        try:
-            # Extract title
-            title_elem = container.select_one('.nameCard, .productName, .product-card__title')
-            title = title_elem.get_text().strip() if title_elem else "Unknown Product"
-            
-            # Extract price
-            price_elem = container.select_one('.priceCard, .finalPrice, .price__value')
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Clean price text and extract numeric value
-            price = self._extract_price(price_text)
-            
-            # Brazilian site uses BRL
-            currency = "BRL"
-            
-            # Extract product URL
-            link_elem = container.select_one('a[href]')
-            product_url = url
-            if link_elem and link_elem.get('href'):
-                href = link_elem.get('href')
-                if href.startswith('http'):
-                    product_url = href
-                elif href.startswith('/'):
-                    # Handle relative URLs
-                    from urllib.parse import urlparse
-                    parsed_url = urlparse(url)
-                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                    product_url = f"{base_url}{href}"
-            
-            # Extract rating
-            rating = None
-            rating_elem = container.select_one('.rating, .stars')
-            if rating_elem:
-                rating_text = rating_elem.get_text().strip()
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Check if in stock
-            in_stock = True
-            availability_elem = container.select_one('.unavailable, .out-of-stock')
-            if availability_elem:
-                in_stock = False
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": product_url,
-                "store": "Kabum",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": in_stock,
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting product data from Kabum container: {str(e)}")
-            return {}
+        # Look up all aliased fields in a single pass over the container
+        fields = self._find_fields(container)
+        
+        # Extract title
+        title_elem = fields.get("title")
+        title = title_elem.get_text().strip() if title_elem else "Unknown Product"
+        
+        # Extract price
+        price_elem = fields.get("price")
+        price_text = price_elem.get_text().strip() if price_elem else ""
+        
+        # Clean price text and extract numeric value
+        price = self._extract_price(price_text)
+        
+        # Brazilian site uses BRL
+        currency = "BRL"
+        
+        # Extract product URL
+        link_elem = fields.get("link")
+        product_url = url
+        if link_elem and link_elem.get('href'):
+            href = link_elem.get('href')
+            if href.startswith('http'):
+                product_url = href
+            elif href.startswith('/'):
+                # Handle relative URLs
+                product_url = f"{base_url}{href}"
+        
+        # Extract rating
+        rating = None
+        rating_elem = fields.get("rating")
+        if rating_elem:
+            rating_text = rating_elem.get_text().strip()
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Check if in stock
+        in_stock = True
+        availability_elem = fields.get("availability")
+        if availability_elem:
+            in_stock = False
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": product_url,
+            "store": "Kabum",
+            "date": today,
+            "in_stock": in_stock,
+            "rating": rating
+        }
     
-    def _extract_single_product(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+    def _extract_single_product(self, soup: BeautifulSoup, url: str, today: str) -> Dict[str, Any]:
         """Extract data from a single product page."""
-        try:
-            # Extract title
-            title_elem = soup.select_one('h1.product__title, .product-title')
-            title = title_elem.get_text().strip() if title_elem else "Unknown Product"
-            
-            # Extract price
-            price_elem = soup.select_one('.finalPrice, .price__value')
-            price_text = price_elem.get_text().strip() if price_elem else ""
-            
-            # Clean price text and extract numeric value
-            price = self._extract_price(price_text)
-            
-            # Brazilian site uses BRL
-            currency = "BRL"
-            
-            # Extract rating
-            rating = None
-            rating_elem = soup.select_one('.rating, .stars')
-            if rating_elem:
-                rating_text = rating_elem.get_text().strip()
-                rating_match = re.search(r'(\d+(\.\d+)?)', rating_text)
-                if rating_match:
-                    rating = float(rating_match.group(1))
-            
-            # Check if in stock
-            in_stock = True
-            availability_elem = soup.select_one('.unavailable, .out-of-stock')
-            if availability_elem:
-                in_stock = False
-            
-            return {
-                "title": title,
-                "price": price,
-                "currency": currency,
-                "url": url,
-                "store": "Kabum",
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "in_stock": in_stock,
-                "rating": rating
-            }
-            
-        except Exception as e:
-            logger.error(f"Error extracting data from Kabum product page: {str(e)}")
-            return {}
-    
-    def _extract_price(self, price_text: str) -> float:
-        """Extract numeric price value from text."""
-        if not price_text:
-            return None
-            
-        # Remove currency symbols and non-numeric characters except for . and ,
-        clean_text = re.sub(r'[^\d.,]', '', price_text)
+        # Extract title
+        title_elem = self._selectors["page_title"].select_one(soup)
+        title = title_elem.get_text().strip() if title_elem else "Unknown Product"
         
-        # Brazilian format: 1.234,56
-        if ',' in clean_text:
-            # Replace decimal comma with dot
-            clean_text = clean_text.replace('.', '').replace(',', '.')
+        # Extract price
+        price_elem = soup.find(class_=['finalPrice', 'price__value'])
+        price_text = price_elem.get_text().strip() if price_elem else ""
         
-        try:
-            return float(clean_text)
-        except ValueError:
-            return None
+        # Clean price text and extract numeric value
+        price = self._extract_price(price_text)
+        
+        # Brazilian site uses BRL
+        currency = "BRL"
+        
+        # Extract rating
+        rating = None
+        rating_elem = soup.find(class_=['rating', 'stars'])
+        if rating_elem:
+            rating_text = rating_elem.get_text().strip()
+            rating_match = _RATING_RE.search(rating_text)
+            if rating_match:
+                rating = float(rating_match.group(1))
+        
+        # Check if in stock
+        in_stock = True
+        availability_elem = soup.find(class_=['unavailable', 'out-of-stock'])
+        if availability_elem:
+            in_stock = False
+        
+        return {
+            "title": title,
+            "price": price,
+            "currency": currency,
+            "url": url,
+            "store": "Kabum",
+            "date": today,
+            "in_stock": in_stock,
+            "rating": rating
+        }
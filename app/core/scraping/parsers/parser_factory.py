@@ -6,9 +6,13 @@ based on the URL, following the Factory pattern and Dependency Inversion Princip
 """
 
 import logging
-from typing import Dict, Type
+import re
+from functools import lru_cache
+from typing import Dict, List, Pattern, Tuple, Type, Union
+from urllib.parse import urlparse
 
 from .base_parser import BaseEcommerceParser
+from .generic_parser import GenericEcommerceParser
 
 # Import site-specific parsers
 from .amazon_parser import AmazonParser
@@ -21,20 +25,28 @@ from .submarino_parser import SubmarinoParser
 logger = logging.getLogger(__name__)
 
 
+def _domain_pattern(domain: str) -> Pattern:
+    """Compile a pattern matching hosts with the domain as a whole label, e.g. www.kabum.com.br."""
+    return re.compile(rf'(?:^|\.){re.escape(domain.lower())}\.')
+
+
 class ParserFactory:
     """Factory for creating appropriate parsers based on the URL."""
     
-    # Registry of parsers
-    _parsers: Dict[str, Type[BaseEcommerceParser]] = {
-        "amazon": AmazonParser,
-        "magazineluiza": MagazineLuizaParser,
-        "americanas": AmericanasParser,
-        "kabum": KabumParser,
-        "submarino": SubmarinoParser,
-    }
+    # Registry of parsers as (host pattern, parser class), scanned in order
+    _parsers: List[Tuple[Pattern, Type[BaseEcommerceParser]]] = [
+        (_domain_pattern("amazon"), AmazonParser),
+        (_domain_pattern("magazineluiza"), MagazineLuizaParser),
+        (_domain_pattern("americanas"), AmericanasParser),
+        (_domain_pattern("kabum"), KabumParser),
+        (_domain_pattern("submarino"), SubmarinoParser),
+    ]
+    
+    # Parsers hold no per-request state, so one instance per class is shared
+    _instances: Dict[Type[BaseEcommerceParser], BaseEcommerceParser] = {}
     
     @classmethod
-    async def create_parser(cls, url: str) -> BaseEcommerceParser:
+    def create_parser(cls, url: str) -> BaseEcommerceParser:
         """
         Create and return the appropriate parser for the given URL.
         
@@ -44,16 +56,35 @@ class ParserFactory:
         Returns:
             Instance of an appropriate parser for the URL
         """
-        # Check each parser's domain pattern
-        for domain, parser_class in cls._parsers.items():
-            if domain in url.lower():
-                logger.info(f"Using {parser_class.__name__} for {url}")
-                return parser_class()
+        # URLs without a scheme have no netloc, match against the whole URL then
+        host = urlparse(url).netloc.lower() or url.lower()
+        parser_class = cls._resolve_parser_class(host)
+        
+        parser = cls._instances.get(parser_class)
+        if parser is None:
+            parser = cls._instances[parser_class] = parser_class()
+        
+        logger.info(f"Using {parser_class.__name__} for {url}")
+        return parser
+    
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _resolve_parser_class(cls, host: str) -> Type[BaseEcommerceParser]:
+        """
+        Find the parser class registered for a host, memoized per host.
+        
+        Args:
+            host: Lowercased host name (or URL when it has no host part)
+            
+        Returns:
+            Registered parser class, or GenericEcommerceParser if none matches
+        """
+        for pattern, parser_class in cls._parsers:
+            if pattern.search(host):
+                return parser_class
         
         # If no specific parser found, use a generic one
-        from .generic_parser import GenericEcommerceParser
-        logger.info(f"Using GenericEcommerceParser for {url}")
-        return GenericEcommerceParser()
+        return GenericEcommerceParser
     
     @classmethod
     def register_parser(cls, domain: str, parser_class: Type[BaseEcommerceParser]) -> None:
@@ -61,8 +92,32 @@ class ParserFactory:
         Register a new parser for a specific domain.
         
         Args:
-            domain: Domain identifier (e.g., 'amazon')
+            domain: Domain identifier (e.g., 'amazon'), matched as a whole host label
             parser_class: Parser class to register
         """
-        cls._parsers[domain] = parser_class
+        cls._add_parser(_domain_pattern(domain), parser_class)
         logger.info(f"Registered {parser_class.__name__} for domain '{domain}'")
+    
+    @classmethod
+    def register_pattern(
+        cls, pattern: Union[str, Pattern], parser_class: Type[BaseEcommerceParser]
+    ) -> None:
+        """
+        Register a new parser for hosts matching a regular expression.
+        
+        Args:
+            pattern: Pattern searched in the lowercased host (e.g., r'(?:^|\.)magalu\.')
+            parser_class: Parser class to register
+        """
+        compiled = re.compile(pattern)
+        cls._add_parser(compiled, parser_class)
+        logger.info(f"Registered {parser_class.__name__} for host pattern '{compiled.pattern}'")
+    
+    @classmethod
+    def _add_parser(cls, pattern: Pattern, parser_class: Type[BaseEcommerceParser]) -> None:
+        """Put a registration ahead of the existing ones, replacing any for the same pattern."""
+        cls._parsers[:] = [(pattern, parser_class)] + [
+            entry for entry in cls._parsers if entry[0].pattern != pattern.pattern
+        ]
+        # Hosts resolved before this registration may now map to a different parser
+        cls._resolve_parser_class.cache_clear()
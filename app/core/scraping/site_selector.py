@@ -4,7 +4,88 @@ Site Selector module for determining optimal scraping targets.
 This module implements logic to select the most relevant websites to scrape
 based on device model, user region, past performance, and user preferences.
 """
-from typing import Any, Dict, List, Optional
+import re
+from functools import lru_cache
+from itertools import chain
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Brand-specific keywords found in model names
+_BRAND_KEYWORDS = {
+    "apple": ["iphone", "ipad", "macbook", "imac", "apple"],
+    "samsung": ["galaxy", "samsung", "note"],
+    "google": ["pixel", "google"],
+    "microsoft": ["surface", "microsoft"],
+    "xiaomi": ["xiaomi", "redmi", "mi"],
+    "lenovo": ["thinkpad", "ideapad", "lenovo"],
+    "dell": ["xps", "inspiron", "dell"],
+    "asus": ["zenbook", "vivobook", "asus", "rog"],
+    "hp": ["spectre", "pavilion", "envy", "hp"],
+}
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Build a regex matching any of the words, shaped as a prefix trie.
+
+    Shared prefixes are spelled out once (e.g. "mi(?:crosoft)?"), so at each position
+    the regex engine follows a single path instead of trying every word in turn, and
+    the longest word starting there wins.
+
+    Args:
+        words: Literal words to match
+
+    Returns:
+        Regex source matching any of the words
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of word marker
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+# Brand identified by each keyword
+_BRAND_BY_KEYWORD = {
+    keyword: brand for brand, keywords in _BRAND_KEYWORDS.items() for keyword in keywords
+}
+
+# All brand keywords compiled into one trie-shaped pattern, so a single scan finds the brand
+_BRAND_RE = re.compile(_trie_pattern(list(_BRAND_BY_KEYWORD)))
+
+# Historical scraping performance per website; this would normally come from a database
+_SITE_PERFORMANCE_METRICS: Mapping[str, Mapping[str, float]] = MappingProxyType({
+    "amazon.com": MappingProxyType({"success_rate": 0.92, "data_quality": 0.95}),
+    "bestbuy.com": MappingProxyType({"success_rate": 0.88, "data_quality": 0.90}),
+    "walmart.com": MappingProxyType({"success_rate": 0.85, "data_quality": 0.82}),
+    "apple.com": MappingProxyType({"success_rate": 0.95, "data_quality": 0.98}),
+    "target.com": MappingProxyType({"success_rate": 0.80, "data_quality": 0.75}),
+    "bhphotovideo.com": MappingProxyType({"success_rate": 0.90, "data_quality": 0.92}),
+    "samsung.com": MappingProxyType({"success_rate": 0.93, "data_quality": 0.94}),
+    "google.com/store": MappingProxyType({"success_rate": 0.91, "data_quality": 0.93}),
+})
+
+
+def _composite_scores(metrics: Mapping[str, Mapping[str, float]]) -> Dict[str, float]:
+    """Combine each site's metrics into a single 0.0-1.0 score (success_rate * data_quality)."""
+    return {
+        site: site_metrics["success_rate"] * site_metrics["data_quality"]
+        for site, site_metrics in metrics.items()
+    }
+
+
+# Composite scores for the static metrics, computed once at import
+_SITE_SCORES = _composite_scores(_SITE_PERFORMANCE_METRICS)
 
 
 class SiteSelector:
@@ -15,99 +96,103 @@ class SiteSelector:
     performance data to determine the most relevant websites to search for price information.
     """
 
-    def __init__(self):
-        """Initialize the site selector with website knowledge base"""
-        # Country-specific website mappings
-        self._country_websites = {
-            "US": [
-                "amazon.com",
-                "bestbuy.com",
-                "walmart.com",
-                "apple.com",
-                "target.com",
-                "bhphotovideo.com",
-                "samsung.com",
-                "google.com/store",
-            ],
-            "UK": [
-                "amazon.co.uk",
-                "currys.co.uk",
-                "johnlewis.com",
-                "argos.co.uk",
-                "apple.com/uk",
-                "samsung.com/uk",
-            ],
-            "CA": [
-                "amazon.ca",
-                "bestbuy.ca",
-                "walmart.ca",
-                "thesource.ca",
-                "apple.com/ca",
-                "samsung.com/ca",
-            ],
-            "AU": [
-                "amazon.com.au",
-                "jbhifi.com.au",
-                "harveynorman.com.au",
-                "apple.com/au",
-                "samsung.com/au",
-            ],
-            "IN": [
-                "amazon.in",
-                "flipkart.com",
-                "croma.com",
-                "reliance.in",
-                "apple.com/in",
-                "samsung.com/in",
-            ],
-        }
-
-        # Default international websites for countries not explicitly supported
-        self._international_websites = [
+    # Country-specific website mappings, shared by all selectors
+    _country_websites: Dict[str, Tuple[str, ...]] = {
+        "US": (
             "amazon.com",
+            "bestbuy.com",
+            "walmart.com",
             "apple.com",
-            "ebay.com",
+            "target.com",
+            "bhphotovideo.com",
             "samsung.com",
-        ]
-
-        # Brand-specific websites
-        self._brand_websites = {
-            "apple": ["apple.com", "store.apple.com"],
-            "samsung": ["samsung.com", "shop.samsung.com"],
-            "google": ["google.com/store", "store.google.com"],
-            "microsoft": ["microsoft.com", "surface.com"],
-            "dell": ["dell.com"],
-            "lenovo": ["lenovo.com"],
-            "asus": ["asus.com"],
-            "hp": ["hp.com"],
-            "xiaomi": ["mi.com", "xiaomi.com"],
+            "google.com/store",
+        ),
+        "UK": (
+            "amazon.co.uk",
+            "currys.co.uk",
+            "johnlewis.com",
+            "argos.co.uk",
+            "apple.com/uk",
+            "samsung.com/uk",
+        ),
+        "CA": (
+            "amazon.ca",
+            "bestbuy.ca",
+            "walmart.ca",
+            "thesource.ca",
+            "apple.com/ca",
+            "samsung.com/ca",
+        ),
+        "AU": (
+            "amazon.com.au",
+            "jbhifi.com.au",
+            "harveynorman.com.au",
+            "apple.com/au",
+            "samsung.com/au",
+        ),
+        "IN": (
+            "amazon.in",
+            "flipkart.com",
+            "croma.com",
+            "reliance.in",
+            "apple.com/in",
+            "samsung.com/in",
+        ),
+    }
+
+    # Default international websites for countries not explicitly supported
+    _international_websites: Tuple[str, ...] = (
+        "amazon.com",
+        "apple.com",
+        "ebay.com",
+        "samsung.com",
+    )
+
+    # Brand-specific websites
+    _brand_websites: Dict[str, Tuple[str, ...]] = {
+        "apple": ("apple.com", "store.apple.com"),
+        "samsung": ("samsung.com", "shop.samsung.com"),
+        "google": ("google.com/store", "store.google.com"),
+        "microsoft": ("microsoft.com", "surface.com"),
+        "dell": ("dell.com",),
+        "lenovo": ("lenovo.com",),
+        "asus": ("asus.com",),
+        "hp": ("hp.com",),
+        "xiaomi": ("mi.com", "xiaomi.com"),
+    }
+
+    # Regional store preferences (for US, can be expanded for other countries)
+    _region_stores: Dict[str, Dict[str, Tuple[str, ...]]] = {
+        "US": {
+            "West Coast": (
+                "frys.com",
+                "microcenter.com",
+                "costco.com",
+            ),
+            "East Coast": (
+                "microcenter.com",
+                "costco.com",
+                "adorama.com",
+            ),
+            "Midwest": (
+                "microcenter.com",
+                "costco.com",
+                "cdw.com",
+            ),
+            "South": (
+                "costco.com",
+                "officedepot.com",
+                "samsclub.com",
+            ),
         }
+    }
 
-        # Regional store preferences (for US, can be expanded for other countries)
-        self._region_stores = {
-            "US": {
-                "West Coast": [
-                    "frys.com",
-                    "microcenter.com",
-                    "costco.com",
-                ],
-                "East Coast": [
-                    "microcenter.com",
-                    "costco.com",
-                    "adorama.com",
-                ],
-                "Midwest": [
-                    "microcenter.com",
-                    "costco.com",
-                    "cdw.com",
-                ],
-                "South": [
-                    "costco.com",
-                    "officedepot.com",
-                    "samsclub.com",
-                ],
-            }
-        }
+    def __init__(self):
+        """Initialize the site selector"""
+        # Candidate sites depend only on model, country and region, so they are memoized
+        # per selector; ranking reads the performance metrics on every call
+        self._candidate_sites_cached = lru_cache(maxsize=1024)(self._candidate_sites)
 
     def _validate_input(self, input_data: Dict[str, Any]) -> None:
         """
@@ -134,29 +219,11 @@ class SiteSelector:
         Returns:
             Brand name if identified, None otherwise
         """
-        model_lower = model.lower()
-
-        # Define brand-specific keywords mapping for cleaner detection
-        brand_keywords = {
-            "apple": ["iphone", "ipad", "macbook", "imac", "apple"],
-            "samsung": ["galaxy", "samsung", "note"],
-            "google": ["pixel", "google"],
-            "microsoft": ["surface", "microsoft"],
-            "xiaomi": ["xiaomi", "redmi", "mi"],
-            "lenovo": ["thinkpad", "ideapad", "lenovo"],
-            "dell": ["xps", "inspiron", "dell"],
-            "asus": ["zenbook", "vivobook", "asus", "rog"],
-            "hp": ["spectre", "pavilion", "envy", "hp"],
-        }
+        # The leftmost keyword in the model name decides the brand
+        match = _BRAND_RE.search(model.lower())
+        return _BRAND_BY_KEYWORD[match.group()] if match else None
 
-        # Check if any brand keywords are in the model name
-        for brand, keywords in brand_keywords.items():
-            if any(keyword in model_lower for keyword in keywords):
-                return brand
-
-        return None
-
-    def _retrieve_site_performance_metrics(self) -> Dict[str, Dict[str, float]]:
+    def _retrieve_site_performance_metrics(self) -> Mapping[str, Mapping[str, float]]:
         """
         Retrieve historical performance metrics for websites.
 
@@ -164,7 +231,7 @@ class SiteSelector:
         tracking success rates and data quality for various sites.
 
         Returns:
-            Dictionary mapping website domains to their performance metrics:
+            Read-only mapping of website domains to their performance metrics:
             {
                 "domain.com": {
                     "success_rate": float, # 0.0-1.0 success rate of scraping
@@ -173,90 +240,26 @@ class SiteSelector:
             }
         """
         # This would normally come from a database, but for now we'll use static data
-        return {
-            "amazon.com": {"success_rate": 0.92, "data_quality": 0.95},
-            "bestbuy.com": {"success_rate": 0.88, "data_quality": 0.90},
-            "walmart.com": {"success_rate": 0.85, "data_quality": 0.82},
-            "apple.com": {"success_rate": 0.95, "data_quality": 0.98},
-            "target.com": {"success_rate": 0.80, "data_quality": 0.75},
-            "bhphotovideo.com": {"success_rate": 0.90, "data_quality": 0.92},
-            "samsung.com": {"success_rate": 0.93, "data_quality": 0.94},
-            "google.com/store": {"success_rate": 0.91, "data_quality": 0.93},
-        }
+        return _SITE_PERFORMANCE_METRICS
 
-    def _prioritize_sites_by_performance(self, sites: List[str]) -> List[str]:
+    def _site_performance_scores(self) -> Mapping[str, float]:
         """
-        Prioritize websites based on their historical performance metrics.
-
-        Args:
-            sites: List of website domains to prioritize
+        Score websites by their historical performance metrics.
 
         Returns:
-            Reordered list of websites with highest-performing sites first
+            Mapping of website domains to a composite 0.0-1.0 score
+            (success_rate * data_quality); higher is better
         """
         performance_metrics = self._retrieve_site_performance_metrics()
 
-        # Calculate a composite score for each site (success_rate * data_quality)
-        # Higher scores indicate better overall performance
-        site_performance_scores: Dict[str, float] = {}
-
-        for site in sites:
-            if site in performance_metrics:
-                metrics = performance_metrics[site]
-                # Combine metrics into a single score between 0.0-1.0
-                site_performance_scores[site] = (
-                    metrics["success_rate"] * metrics["data_quality"]
-                )
-            else:
-                # Default middle score for sites with no performance data
-                site_performance_scores[site] = 0.5
-
-        # Sort sites by their performance score (descending order)
-        return sorted(
-            sites, key=lambda site: site_performance_scores.get(site, 0), reverse=True
-        )
-
-    def _prioritize_user_preferred_retailers(
-        self, sites: List[str], user_preferences: Dict[str, Any]
-    ) -> List[str]:
-        """
-        Reorder sites to prioritize user's preferred retailers at the top of the list.
-
-        Args:
-            sites: List of website domains to prioritize
-            user_preferences: Dictionary containing user preferences including:
-                - preferred_retailers: Optional list of preferred retailer domains
-
-        Returns:
-            Reordered list with user's preferred retailers at the beginning
-        """
-        if not user_preferences:
-            return sites
-
-        preferred_retailers = user_preferences.get("preferred_retailers", [])
-        if not preferred_retailers:
-            return sites
-
-        # Extract user's preferred retailers that exist in our site list
-        prioritized_sites = []
-        remaining_sites = []
-
-        # First add all preferred retailers that are in the site list, maintaining their order
-        for retailer in preferred_retailers:
-            if retailer in sites:
-                prioritized_sites.append(retailer)
-
-        # Then add all the other sites that weren't in the preferred list
-        for site in sites:
-            if site not in prioritized_sites:
-                remaining_sites.append(site)
-
-        # Return combined list: preferred sites first, then remaining sites
-        return prioritized_sites + remaining_sites
+        # The static metrics have their scores precomputed
+        if performance_metrics is _SITE_PERFORMANCE_METRICS:
+            return _SITE_SCORES
+        return _composite_scores(performance_metrics)
 
     def _find_region_specific_retailers(
         self, country: str, region: Optional[str]
-    ) -> List[str]:
+    ) -> Tuple[str, ...]:
         """
         Find retailers specific to a geographical region within a country.
 
@@ -265,18 +268,18 @@ class SiteSelector:
             region: Geographical region within the country (e.g. 'West Coast', 'East Coast')
 
         Returns:
-            List of region-specific retailer domains, or empty list if none available
+            Tuple of region-specific retailer domains, empty if none available
         """
-        # Return empty list if no region specified or country not in our region database
+        # Return nothing if no region specified or country not in our region database
         if not region or country not in self._region_stores:
-            return []
+            return ()
 
         # Get all regions for this country
         country_region_mapping = self._region_stores[country]
 
-        # Return empty list if the specified region isn't in our database for this country
+        # Return nothing if the specified region isn't in our database for this country
         if region not in country_region_mapping:
-            return []
+            return ()
 
         # Return the list of region-specific retailer domains
         return country_region_mapping[region]
@@ -305,42 +308,78 @@ class SiteSelector:
         self._validate_input(input_data)
 
         # Extract parameters from input data
-        model = input_data["model"]
-        country = input_data["country"]
-        region = input_data.get("region")
-        user_preferences = input_data.get("user_preferences", {})
-        max_sites = input_data.get("max_sites")
-
-        # Build initial candidate site list
-        # 1. Start with country-specific websites or fall back to international websites
-        candidate_sites = self._country_websites.get(
-            country, self._international_websites
-        ).copy()
-
-        # 2. Add brand-specific websites based on device model
-        brand = self._extract_brand_from_model(model)
-        if brand and brand in self._brand_websites:
-            brand_sites = self._brand_websites[brand]
-            # Add brand sites that aren't already in the candidate list
-            for site in brand_sites:
-                if site not in candidate_sites:
-                    candidate_sites.append(site)
-
-        # 3. Add region-specific retailers if available
-        region_retailers = self._find_region_specific_retailers(country, region)
-        for site in region_retailers:
-            if site not in candidate_sites:
-                candidate_sites.append(site)
-
-        # Prioritize sites based on multiple factors
-        # 1. First by historical performance data
-        prioritized_sites = self._prioritize_sites_by_performance(candidate_sites)
-
-        # 2. Then by user's preferred retailers
-        prioritized_sites = self._prioritize_user_preferred_retailers(
-            prioritized_sites, user_preferences
+        user_preferences = input_data.get("user_preferences") or {}
+        preferred_retailers = tuple(user_preferences.get("preferred_retailers") or ())
+
+        return self._rank_sites(
+            self._candidate_sites_cached(
+                input_data["model"], input_data["country"], input_data.get("region")
+            ),
+            preferred_retailers,
+            input_data.get("max_sites"),
         )
 
+    def _candidate_sites(
+        self, model: str, country: str, region: Optional[str]
+    ) -> Tuple[str, ...]:
+        """
+        Collect the candidate sites for a model, country and region, in discovery order.
+
+        Sites are taken from, keeping the first occurrence of each:
+        1. Country-specific websites or the international websites as fallback
+        2. Brand-specific websites based on device model
+        3. Region-specific retailers if available
+
+        Args:
+            model: Device model name
+            country: Country code
+            region: Optional geographical region within country
+
+        Returns:
+            Tuple of unique website domains
+        """
+        brand = self._extract_brand_from_model(model)
+        return tuple(dict.fromkeys(chain(
+            self._country_websites.get(country, self._international_websites),
+            self._brand_websites.get(brand, ()),
+            self._find_region_specific_retailers(country, region),
+        )))
+
+    def _rank_sites(
+        self,
+        candidates: Tuple[str, ...],
+        preferred_retailers: Tuple[str, ...],
+        max_sites: Optional[int],
+    ) -> List[str]:
+        """
+        Order candidate sites by user preference and current performance scores.
+
+        Args:
+            candidates: Unique candidate website domains, in discovery order
+            preferred_retailers: User's preferred retailer domains, in order
+            max_sites: Optional limit on number of sites to return
+
+        Returns:
+            List of website domains ordered by relevance for scraping
+        """
+        # Sites are keyed by performance score, with a default middle score for sites
+        # with no performance data
+        scores = self._site_performance_scores()
+        keys = {site: scores.get(site, 0.5) for site in candidates}
+
+        # User's preferred retailers go first, in their order: their keys rank above
+        # any performance score (0.0-1.0)
+        preferred = [
+            retailer
+            for retailer in dict.fromkeys(preferred_retailers)
+            if retailer in keys
+        ]
+        for position, retailer in enumerate(preferred):
+            keys[retailer] = 2.0 + len(preferred) - position
+
+        # One stable sort, so equally scored sites keep their discovery order
+        prioritized_sites = sorted(keys, key=keys.__getitem__, reverse=True)
+
         # Apply site limit if specified
         if max_sites and max_sites > 0:
             prioritized_sites = prioritized_sites[:max_sites]
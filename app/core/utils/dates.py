@@ -0,0 +1,37 @@
+"""
+Date and time utilities.
+
+This module provides fast parsing of the ISO 8601 timestamps exchanged by the
+services, using the ciso8601 C parser when it is installed.
+"""
+
+import sys
+from datetime import datetime
+from typing import Callable
+
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    _parse_datetime: Callable[[str], datetime]
+    if sys.version_info >= (3, 11):
+        # Since 3.11 fromisoformat is implemented in C and accepts a "Z" suffix
+        _parse_datetime = datetime.fromisoformat
+    else:
+        def _parse_datetime(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def parse_iso_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, including a trailing "Z" for UTC.
+
+    Args:
+        value: ISO formatted date or timestamp
+
+    Returns:
+        Parsed datetime, timezone-aware when the value carries an offset
+
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 timestamp
+    """
+    return _parse_datetime(value)
@@ -8,12 +8,31 @@ due to transient errors such as network issues or rate limiting.
 import asyncio
 import logging
 import random
-from functools import wraps
-from typing import Any, Callable, Optional, Type, Union
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional, Tuple, Type, Union
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Jitter source of our own, unaffected by code seeding the global random state
+_random = random.Random().random
+
+
+@lru_cache(maxsize=128)
+def _backoff_delays(max_retries: int, base_delay: float, max_delay: float) -> Tuple[float, ...]:
+    """
+    Compute the exponential backoff schedule for a retry configuration.
+    
+    Args:
+        max_retries: Maximum number of retry attempts
+        base_delay: Initial delay between retries in seconds
+        max_delay: Maximum delay between retries in seconds
+        
+    Returns:
+        Delay before each retry attempt, without jitter
+    """
+    return tuple(min(base_delay * (1 << i), max_delay) for i in range(max_retries))
+
 
 async def retry_with_backoff(
     coroutine: Callable,
@@ -50,6 +69,7 @@ async def retry_with_backoff(
         
     attempt = 0
     last_exception = None
+    delays: Tuple[float, ...] = ()
     
     while attempt <= max_retries:
         try:
@@ -59,23 +79,23 @@ async def retry_with_backoff(
             last_exception = e
             
             if attempt > max_retries:
-                logger.error(
-                    f"Operation failed after {max_retries} retries: {str(e)}"
-                )
+                logger.error("Operation failed after %d retries: %s", max_retries, e)
                 raise
                 
-            # Calculate exponential backoff with optional jitter
-            delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
+            # Look up the exponential backoff delay, with optional jitter
+            if not delays:
+                delays = _backoff_delays(max_retries, base_delay, max_delay)
+            delay = delays[attempt - 1]
             
             if jitter:
                 # Add up to 25% random jitter
-                jitter_amount = random.uniform(0, 0.25) * delay
-                delay += jitter_amount
+                delay += _random() * delay * 0.25
                 
-            logger.info(
-                f"Retry attempt {attempt}/{max_retries} after error: {str(e)}. "
-                f"Retrying in {delay:.2f} seconds."
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Retry attempt %d/%d after error: %s. Retrying in %.2f seconds.",
+                    attempt, max_retries, e, delay
+                )
             
             await asyncio.sleep(delay)
     
@@ -106,6 +126,9 @@ def with_retry(
     Returns:
         Decorated async function that will retry on failure
     """
+    # Compute the backoff schedule once, when the function is decorated
+    _backoff_delays(max_retries, base_delay, max_delay)
+    
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
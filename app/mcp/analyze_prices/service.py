@@ -4,19 +4,133 @@ Analyze Prices MCP Service.
 This module provides asynchronous price analysis capabilities using AI with
 dependency injection and clean architecture principles.
 """
+import asyncio
+import hashlib
 import logging
+import os
+import sqlite3
+import threading
 import time
-from typing import Any, Dict, List, Tuple
+import weakref
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+from openai import OpenAIError
 
 from app.core.analyzer.clients.openai_client import OpenAIClient
 from app.core.analyzer.formatting.price_formatter import PriceFormatter
 from app.core.analyzer.prompts.analysis_prompt import PriceAnalysisPromptGenerator
 from app.core.analyzer.rule_based.fallback_analyzer import FallbackAnalyzer
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; handlers and levels are left to the application entry point
 logger = logging.getLogger(__name__)
 
+# Monotonic nanosecond clock used for processing times
+_now = time.perf_counter_ns
+
+# How long an LLM analysis is reused for an identical prompt
+_ANALYSIS_TTL_SECONDS = 3600
+
+# LLM analyses keyed by a hash of model and prompt, reused since the same price
+# payload is often analyzed repeatedly (polling, repeated views)
+_ANALYSIS_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=_ANALYSIS_TTL_SECONDS)
+
+# TTLCache isn't thread-safe and every AsyncBridge thread uses the same cache
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+
+# Optional SQLite file keeping analyses across restarts, disabled when unset
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH")
+
+# Failures that switch an analysis to the rule-based fallback: LLM API errors and
+# timeouts, and malformed price data in formatting or prompt generation. Anything
+# else is a bug and propagates to the service's error response.
+_ANALYSIS_ERRORS = (OpenAIError, asyncio.TimeoutError, ValueError, TypeError, KeyError)
+
+# Analyses currently running, keyed by event loop and payload digest, so concurrent
+# identical requests await the same task instead of each calling the LLM. Tasks belong
+# to one loop, so requests on other loops never join them
+_inflight: Dict[Tuple[asyncio.AbstractEventLoop, bytes], "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+class AnalysisDiskCache:
+    """SQLite-backed store of LLM analyses that survives process restarts."""
+
+    def __init__(self, db_path: str, ttl: float = _ANALYSIS_TTL_SECONDS):
+        """
+        Open the store, creating the database file and table if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl: Seconds an analysis stays valid
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses "
+                "(key BLOB PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            # Entries that expired while the process was down are never read again
+            self._conn.execute(
+                "DELETE FROM analyses WHERE created_at < ?", (time.time() - ttl,)
+            )
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the stored analysis for a key, or None if missing or expired."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT analysis, created_at FROM analyses WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Analysis disk cache read failed: %s", e)
+            return None
+
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def set(self, key: bytes, analysis: str) -> None:
+        """Store an analysis under a key."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, analysis, created_at) VALUES (?, ?, ?)",
+                    (key, analysis, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Analysis disk cache write failed: %s", e)
+
+
+# Disk cache opened on first use when ANALYSIS_CACHE_PATH is configured
+_disk_cache: Optional[AnalysisDiskCache] = None
+
+
+def _get_disk_cache() -> Optional[AnalysisDiskCache]:
+    """Return the analysis disk cache, or None when persistence is not configured."""
+    global _disk_cache
+    if _disk_cache is None and ANALYSIS_CACHE_PATH:
+        _disk_cache = AnalysisDiskCache(ANALYSIS_CACHE_PATH)
+    return _disk_cache
+
+
+# Stateless analyzer components shared by every event loop, created on first use
+_shared_components: Optional[
+    Tuple[PriceFormatter, PriceAnalysisPromptGenerator, FallbackAnalyzer]
+] = None
+
+# Analyzer components keyed by event loop. The LLM client's HTTP connections are bound
+# to the loop that opened them, so each loop (e.g. each AsyncBridge worker thread) gets
+# its own client; entries are dropped with their loop
+_components: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_COMPONENTS_LOCK = threading.Lock()
+
 
 async def create_analyzer_components() -> Tuple[
     PriceFormatter, PriceAnalysisPromptGenerator, OpenAIClient, FallbackAnalyzer
@@ -24,15 +138,154 @@ async def create_analyzer_components() -> Tuple[
     """
     Create analyzer components with proper dependency injection asynchronously.
 
+    The components hold no per-request state, so they are built on first use and
+    shared afterwards. The LLM client is shared per running event loop, which lets
+    it keep its connections alive without using them from another loop.
+
     Returns:
         Tuple of (formatter, prompt_generator, llm_client, fallback_analyzer)
     """
-    formatter = PriceFormatter()
-    prompt_generator = PriceAnalysisPromptGenerator()
-    llm_client = OpenAIClient()
-    fallback_analyzer = FallbackAnalyzer()
+    global _shared_components
+    loop = asyncio.get_running_loop()
+    with _COMPONENTS_LOCK:
+        components = _components.get(loop)
+        if components is None:
+            if _shared_components is None:
+                _shared_components = (
+                    PriceFormatter(),
+                    PriceAnalysisPromptGenerator(),
+                    FallbackAnalyzer(),
+                )
+            formatter, prompt_generator, fallback_analyzer = _shared_components
+            components = _components[loop] = (
+                formatter,
+                prompt_generator,
+                OpenAIClient(),
+                fallback_analyzer,
+            )
+
+    return components
+
+
+async def _generate_cached_analysis(llm_client: OpenAIClient, prompt: str) -> str:
+    """
+    Generate an analysis for a prompt, reusing a recent result for the same prompt.
+
+    Args:
+        llm_client: Component for generating text from LLM
+        prompt: Analysis prompt
+
+    Returns:
+        Analysis text
+    """
+    model = getattr(llm_client, "model", "")
+    key = hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).digest()
+
+    with _ANALYSIS_CACHE_LOCK:
+        analysis = _ANALYSIS_CACHE.get(key)
+    if analysis is not None:
+        return analysis
+
+    # Fall back to the on-disk copy, e.g. right after a restart
+    disk_cache = _get_disk_cache()
+    if disk_cache is not None:
+        analysis = await asyncio.to_thread(disk_cache.get, key)
+        if analysis is not None:
+            with _ANALYSIS_CACHE_LOCK:
+                _ANALYSIS_CACHE[key] = analysis
+            return analysis
+
+    analysis = await llm_client.generate_text(prompt)
+    # Empty responses signal a failed request and are not worth keeping, nor is the
+    # placeholder returned while no API key is configured
+    if analysis and llm_client.client_available:
+        with _ANALYSIS_CACHE_LOCK:
+            _ANALYSIS_CACHE[key] = analysis
+        if disk_cache is not None:
+            await asyncio.to_thread(disk_cache.set, key, analysis)
+    return analysis
+
+
+def _elapsed_ms(start: int) -> int:
+    """Milliseconds elapsed since a _now() reading."""
+    return (_now() - start) // 1_000_000
+
+
+def _error_response(message: str, start: int) -> Dict:
+    """Build the standardized error response for a request started at a _now() reading."""
+    return {
+        "status": "error",
+        "message": message,
+        "data": [],
+        "processing_time_ms": _elapsed_ms(start),
+    }
+
+
+def _payload_key(prices: List[Dict[str, Any]], include_justification: bool) -> Optional[bytes]:
+    """
+    Digest identifying an analysis request by its price data and detail level.
+
+    Returns None for price data that cannot be serialized, e.g. integers beyond
+    64 bits, so such requests are analyzed without de-duplication.
+    """
+    try:
+        payload = orjson.dumps(
+            prices, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+        )
+    except orjson.JSONEncodeError:
+        return None
+    digest = hashlib.blake2b(payload, digest_size=16)
+    digest.update(b"\x01" if include_justification else b"\x00")
+    return digest.digest()
+
+
+@lru_cache(maxsize=1)
+def _bind_analyzers(
+    components: Tuple[PriceFormatter, PriceAnalysisPromptGenerator, OpenAIClient, FallbackAnalyzer]
+) -> Tuple[
+    Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+    Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+]:
+    """Bind both analysis levels to a set of components, once per component set."""
+    formatter, prompt_generator, llm_client, fallback_analyzer = components
+    bound = dict(
+        formatter=formatter,
+        prompt_generator=prompt_generator,
+        llm_client=llm_client,
+        fallback_analyzer=fallback_analyzer,
+    )
+    return partial(analyze_prices, **bound), partial(analyze_prices_with_justification, **bound)
+
+
+async def _run_analysis(
+    prices: List[Dict[str, Any]], include_justification: bool
+) -> Dict[str, Any]:
+    """Run the analysis at the requested detail level with the shared components."""
+    # Create components with proper dependency injection
+    analyze_fast, analyze_full = _bind_analyzers(await create_analyzer_components())
+
+    # Generate analysis based on requested detail level
+    return await (analyze_full if include_justification else analyze_fast)(prices)
+
+
+async def _run_analysis_once(
+    prices: List[Dict[str, Any]], include_justification: bool
+) -> Dict[str, Any]:
+    """Run the analysis, joining an identical one already in progress on this loop if there is one."""
+    payload_key = _payload_key(prices, include_justification)
+    if payload_key is None:
+        return await _run_analysis(prices, include_justification)
+    key = (asyncio.get_running_loop(), payload_key)
 
-    return formatter, prompt_generator, llm_client, fallback_analyzer
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_analysis(prices, include_justification))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # Shielded so a cancelled caller doesn't cancel the analysis for the others,
+    # and copied so callers don't share one result dict
+    return dict(await asyncio.shield(task))
 
 
 async def analyze_prices_service(params: Dict) -> Dict:
@@ -47,71 +300,48 @@ async def analyze_prices_service(params: Dict) -> Dict:
         Dictionary containing standardized response with status, message, data, and processing time
     """
     # Start timing for performance monitoring
-    start_time = time.time()
-
-    # Initialize empty response with error defaults
-    response = {
-        "status": "error",
-        "message": "",
-        "data": [],
-        "processing_time_ms": 0
-    }
+    start = _now()
 
     # Validate parameters
     if not params or "prices" not in params:
         logger.warning("Missing 'prices' parameter in request")
-        response["message"] = "Missing 'prices' parameter"
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
-        return response
+        return _error_response("Missing 'prices' parameter", start)
 
     prices = params["prices"]
     if not isinstance(prices, list):
         logger.warning("Invalid 'prices' parameter, must be a list")
-        response["message"] = "'prices' parameter must be a list"
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
-        return response
+        return _error_response("'prices' parameter must be a list", start)
 
     if not prices:
         logger.warning("Empty 'prices' list provided")
-        response["message"] = "Empty 'prices' list"
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
-        return response
+        return _error_response("Empty 'prices' list", start)
 
     # Check if justification is requested
     include_justification = params.get("include_justification", False)
 
     # Generate analysis using AI with dependency injection
     try:
-        logger.info("Analyzing %d price data points", len(prices))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Analyzing %d price data points", len(prices))
 
-        # Create components with proper dependency injection
-        formatter, prompt_generator, llm_client, fallback_analyzer = await create_analyzer_components()
-
-        # Generate analysis based on requested detail level
-        if include_justification:
-            result = await analyze_prices_with_justification(
-                prices, formatter, prompt_generator, llm_client, fallback_analyzer
-            )
-        else:
-            result = await analyze_prices(
-                prices, formatter, prompt_generator, llm_client, fallback_analyzer
-            )
+        result = await _run_analysis_once(prices, include_justification)
 
         # Build successful response
-        response["status"] = "success"
-        response["message"] = "Analysis completed successfully"
-        response["data"] = result
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
-        logger.info("Analysis completed in %d ms", response["processing_time_ms"])
+        response = {
+            "status": "success",
+            "message": "Analysis completed successfully",
+            "data": result,
+            "processing_time_ms": _elapsed_ms(start),
+        }
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Analysis completed in %d ms", response["processing_time_ms"])
         return response
 
     except Exception as e:
         # Handle any errors during analysis
         error_message = f"Error during price analysis: {str(e)}"
         logger.error(error_message)
-        response["message"] = error_message
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
-        return response
+        return _error_response(error_message, start)
 
 
 async def analyze_prices_with_justification(
@@ -143,8 +373,8 @@ async def analyze_prices_with_justification(
             formatted_data, include_justification=True
         )
         
-        # Get analysis from LLM asynchronously
-        analysis = await llm_client.generate_text(prompt)
+        # Get analysis from LLM asynchronously, or from a recent identical request
+        analysis = await _generate_cached_analysis(llm_client, prompt)
         
         # Return the analysis as a dictionary
         return {
@@ -152,8 +382,8 @@ async def analyze_prices_with_justification(
             "data_points": len(prices),
             "has_justification": True
         }
-    except Exception as e:
-        logger.warning("AI analysis failed, using fallback: %s", str(e))
+    except _ANALYSIS_ERRORS as e:
+        logger.warning("AI analysis failed, using fallback: %s", e)
         # Use rule-based fallback if AI analysis fails
         fallback_result = fallback_analyzer.analyze(prices)
         return {
@@ -191,16 +421,16 @@ async def analyze_prices(
         # Generate the analysis prompt
         prompt = prompt_generator.generate_prompt(formatted_data)
         
-        # Get analysis from LLM asynchronously
-        analysis = await llm_client.generate_text(prompt)
+        # Get analysis from LLM asynchronously, or from a recent identical request
+        analysis = await _generate_cached_analysis(llm_client, prompt)
         
         # Return the analysis as a dictionary
         return {
             "analysis": analysis,
             "data_points": len(prices)
         }
-    except Exception as e:
-        logger.warning("AI analysis failed, using fallback: %s", str(e))
+    except _ANALYSIS_ERRORS as e:
+        logger.warning("AI analysis failed, using fallback: %s", e)
         # Use rule-based fallback if AI analysis fails
         fallback_result = fallback_analyzer.analyze(prices)
         return {
@@ -4,11 +4,14 @@ Smartphone Price Scraping Service.
 This module provides asynchronous smartphone price scraping capabilities
 using dependency injection and clean architecture principles.
 """
+import asyncio
 import logging
 import os
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 from app.core.scraping.bright_data_scraper import BrightDataPriceScraper
@@ -20,25 +23,69 @@ from app.core.scraping.interfaces import (
 )
 from app.core.scraping.normalizer import PriceResultNormalizer
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging; handlers and levels are left to the application entry point
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
 
+# Monotonic nanosecond clock used for processing times
+_now = time.perf_counter_ns
+
+
+def _elapsed_ms(start: int) -> int:
+    """Milliseconds elapsed since a _now() reading."""
+    return (_now() - start) // 1_000_000
+
+
+# Scraping components shared across requests, created by create_scraping_components
+_components: Optional[Tuple[PriceScraper, ResultNormalizer, ScrapingErrorHandler]] = None
+
+# Scrapes currently running, keyed by event loop, scraper, model, country and timeout,
+# so concurrent identical requests await the same scrape instead of each going through
+# the proxy. Tasks belong to one loop, so requests on other loops never join them
+_inflight: Dict[
+    Tuple[asyncio.AbstractEventLoop, PriceScraper, str, str, int],
+    "asyncio.Task[List[Dict[str, Any]]]",
+] = {}
+
+# Seconds scraped results are reused; short, since prices and stock change
+_SCRAPE_TTL_SECONDS = 60
+
+# Raw scrape results keyed by scraper, model and country, bounding proxy usage for
+# requests repeated within seconds of each other
+_SCRAPE_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=_SCRAPE_TTL_SECONDS)
+
+# TTLCache isn't thread-safe and every AsyncBridge thread uses the same cache
+_SCRAPE_CACHE_LOCK = threading.Lock()
+
+# Error response returned unless a request succeeds; copied per request and given
+# a fresh data container, so the shared dict is never mutated
+_ERROR_RESPONSE: Dict[str, Any] = {
+    "status": "error",
+    "message": "",
+    "data": None,
+    "processing_time_ms": 0,
+}
+
+
 async def create_scraping_components() -> Tuple[PriceScraper, ResultNormalizer, ScrapingErrorHandler]:
     """
     Create and configure the components for asynchronous price scraping with dependency injection.
 
+    The components are built on the first successful call and shared afterwards.
+    Creation never awaits, so concurrent first requests cannot build them twice.
+
     Returns:
         Tuple containing PriceScraper, ResultNormalizer, and ScrapingErrorHandler instances
     """
+    global _components
+    if _components is not None:
+        return _components
+
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     # Create components
     try:
@@ -55,15 +102,31 @@ async def create_scraping_components() -> Tuple[PriceScraper, ResultNormalizer,
         error_handler = DefaultScrapingErrorHandler()
 
         # Log the component creation time for monitoring
-        elapsed = time.time() - start_time
-        logger.debug("Created scraping components in %.3f seconds", elapsed)
+        logger.debug("Created scraping components in %d ms", _elapsed_ms(start))
 
-        return price_scraper, result_normalizer, error_handler
+        _components = (price_scraper, result_normalizer, error_handler)
+        return _components
     except Exception as e:
-        logger.error("Error creating scraping components: %s", str(e))
+        logger.error("Error creating scraping components: %s", e)
         raise
 
 
+async def _scrape_once(
+    price_scraper: PriceScraper, model: str, country: str, timeout: int
+) -> List[Dict[str, Any]]:
+    """Scrape prices, joining an identical scrape already in progress on this loop if there is one."""
+    key = (asyncio.get_running_loop(), price_scraper, model, country, timeout)
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(price_scraper.scrape(model, country, timeout))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # Shielded so a cancelled caller doesn't cancel the scrape for the others
+    return await asyncio.shield(task)
+
+
 async def scrape_prices_service(params: Dict) -> Dict:
     """
     Handle price scraping requests asynchronously.
@@ -78,7 +141,7 @@ async def scrape_prices_service(params: Dict) -> Dict:
         Dict containing scraped price data or error information
     """
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     # Validate required parameters
     if not params or "model" not in params:
@@ -87,7 +150,7 @@ async def scrape_prices_service(params: Dict) -> Dict:
             "status": "error",
             "message": "Missing required parameter: 'model'",
             "data": [],
-            "processing_time_ms": int((time.time() - start_time) * 1000)
+            "processing_time_ms": _elapsed_ms(start)
         }
 
     # Get parameters with defaults
@@ -102,30 +165,37 @@ async def scrape_prices_service(params: Dict) -> Dict:
             "status": "error",
             "message": "Invalid 'model' parameter. Must be a non-empty string.",
             "data": [],
-            "processing_time_ms": int((time.time() - start_time) * 1000)
+            "processing_time_ms": _elapsed_ms(start)
         }
 
     # Create response template
-    response = {
-        "status": "error",
-        "message": "",
-        "data": [],
-        "processing_time_ms": 0,
-        "request": {
-            "model": model,
-            "country": country,
-            "timeout": timeout
-        }
+    response = _ERROR_RESPONSE.copy()
+    response["data"] = []
+    response["request"] = {
+        "model": model,
+        "country": country,
+        "timeout": timeout
     }
 
     # Start scraping
     logger.info("Starting price scraping for model '%s' in country '%s'", model, country)
+    error_handler: Optional[ScrapingErrorHandler] = None
     try:
         # Create components with proper dependency injection
         price_scraper, result_normalizer, error_handler = await create_scraping_components()
         
-        # Perform the actual scraping
-        raw_results = await price_scraper.scrape(model, country, timeout)
+        # Perform the actual scraping, unless the same search ran moments ago
+        cache_key = (price_scraper, model, country)
+        with _SCRAPE_CACHE_LOCK:
+            raw_results = _SCRAPE_CACHE.get(cache_key)
+        if raw_results is not None:
+            response["cached"] = True
+        else:
+            raw_results = await _scrape_once(price_scraper, model, country, timeout)
+            # Empty results may be a transient failure and are not kept
+            if raw_results:
+                with _SCRAPE_CACHE_LOCK:
+                    _SCRAPE_CACHE[cache_key] = raw_results
         
         # Process and normalize results
         if raw_results:
@@ -145,15 +215,15 @@ async def scrape_prices_service(params: Dict) -> Dict:
         logger.error(error_message)
         response["message"] = error_message
         
-        # Try to use error handler component if available
-        try:
-            _, _, error_handler = await create_scraping_components()
-            # Pass all required parameters (model and country) to the error handler
-            await error_handler.handle_error(e, model, country)
-        except Exception as handler_error:
-            logger.error("Error in error handler: %s", str(handler_error))
+        # Use the error handler component if the components were created
+        if error_handler is not None:
+            try:
+                # Pass all required parameters (model and country) to the error handler
+                await error_handler.handle_error(e, model, country)
+            except Exception as handler_error:
+                logger.error("Error in error handler: %s", handler_error)
     
     # Calculate and add processing time
-    response["processing_time_ms"] = int((time.time() - start_time) * 1000)
+    response["processing_time_ms"] = _elapsed_ms(start)
     
     return response
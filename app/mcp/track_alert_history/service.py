@@ -10,15 +10,37 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+from app.core.utils.dates import parse_iso_datetime
+
+# Configure logging; handlers and levels are left to the application entry point
 logger = logging.getLogger(__name__)
 
 
+# Monotonic nanosecond clock used for processing times
+_now = time.perf_counter_ns
+
+
+def _elapsed_ms(start: int) -> int:
+    """Milliseconds elapsed since a _now() reading."""
+    return (_now() - start) // 1_000_000
+
+
+# Recognized alert condition types and notification channels
+_VALID_CONDITIONS = frozenset({"price_drop", "price_increase", "availability", "price_target"})
+_VALID_CHANNELS = frozenset({"email", "sms", "push", "telegram", "webhook"})
+
+# Error response returned unless a request succeeds; copied per request and given
+# a fresh data container, so the shared dict is never mutated
+_ERROR_RESPONSE: Dict[str, Any] = {
+    "status": "error",
+    "message": "",
+    "data": None,
+    "processing_time_ms": 0,
+}
+
+
 class AlertHistoryRequest(BaseModel):
     """Request model for alert history tracking.
 
@@ -28,97 +50,112 @@ class AlertHistoryRequest(BaseModel):
 
     # Required fields with appropriate descriptions and examples
     event_type: str = Field(
-        ..., description="Type of event, should be 'price_alert'", example="price_alert"
+        ...,
+        description="Type of event, should be 'price_alert'",
+        json_schema_extra={"example": "price_alert"},
     )
     alert_id: str = Field(
-        ..., description="Unique identifier for the alert", example="alert-123"
+        ...,
+        description="Unique identifier for the alert",
+        json_schema_extra={"example": "alert-123"},
     )
     rule_id: str = Field(
         ...,
         description="ID of the alert rule that triggered this alert",
-        example="rule-456",
+        json_schema_extra={"example": "rule-456"},
     )
     user_id: str = Field(
-        ..., description="ID of the user who received this alert", example="user-789"
+        ...,
+        description="ID of the user who received this alert",
+        json_schema_extra={"example": "user-789"},
     )
     product_model: str = Field(
-        ..., description="Product model this alert was for", example="iPhone 15"
+        ...,
+        description="Product model this alert was for",
+        json_schema_extra={"example": "iPhone 15"},
     )
     condition_type: str = Field(
         ...,
         description="Type of condition that triggered the alert",
-        example="price_drop",
+        json_schema_extra={"example": "price_drop"},
     )
     threshold: float = Field(
-        ..., description="Rule threshold value", example=15.0, gt=0
+        ...,
+        description="Rule threshold value",
+        gt=0,
+        json_schema_extra={"example": 15.0},
     )
     triggered_value: float = Field(
-        ..., description="Actual value that triggered the alert", example=20.0
+        ...,
+        description="Actual value that triggered the alert",
+        json_schema_extra={"example": 20.0},
     )
     notification_channels: List[str] = Field(
         ...,
         description="List of notification channels used",
-        example=["email", "telegram"],
+        json_schema_extra={"example": ["email", "telegram"]},
     )
     notification_status: Dict[str, bool] = Field(
         ...,
         description="Success/failure status by channel",
-        example={"email": True, "telegram": True},
+        json_schema_extra={"example": {"email": True, "telegram": True}},
     )
     timestamp: str = Field(
         ...,
         description="ISO formatted timestamp when the alert was triggered",
-        example="2025-05-19T12:00:00Z",
+        json_schema_extra={"example": "2025-05-19T12:00:00Z"},
     )
 
     # Add validators
-    @validator("event_type")
+    @field_validator("event_type")
+    @classmethod
     def validate_event_type(cls, value: str) -> str:
         """Validate that event_type is 'price_alert'."""
         if value != "price_alert":
             raise ValueError("event_type must be 'price_alert'")
         return value
 
-    @validator("condition_type")
+    @field_validator("condition_type")
+    @classmethod
     def validate_condition_type(cls, value: str) -> str:
         """Validate condition_type is a recognized value."""
-        valid_types = ["price_drop", "price_increase", "availability", "price_target"]
-        if value not in valid_types:
+        if value not in _VALID_CONDITIONS:
             raise ValueError(
-                f"condition_type must be one of {', '.join(valid_types)}"
+                f"condition_type must be one of {', '.join(sorted(_VALID_CONDITIONS))}"
             )
         return value
 
-    @validator("notification_channels")
+    @field_validator("notification_channels")
+    @classmethod
     def validate_notification_channels(cls, value: List[str]) -> List[str]:
         """Validate notification channels are recognized values."""
-        valid_channels = ["email", "sms", "push", "telegram", "webhook"]
-        for channel in value:
-            if channel not in valid_channels:
-                raise ValueError(
-                    f"notification_channels must contain only valid channels: {', '.join(valid_channels)}"
-                )
+        if not _VALID_CHANNELS.issuperset(value):
+            raise ValueError(
+                f"notification_channels must contain only valid channels: {', '.join(sorted(_VALID_CHANNELS))}"
+            )
         return value
 
-    @validator("timestamp")
+    @field_validator("timestamp")
+    @classmethod
     def validate_timestamp(cls, value: str) -> str:
         """Validate timestamp is in ISO format."""
         try:
-            datetime.fromisoformat(value.replace("Z", "+00:00"))
+            parse_iso_datetime(value)
             return value
         except ValueError:
             raise ValueError("timestamp must be in ISO format (YYYY-MM-DDTHH:MM:SSZ)")
 
-    @validator("notification_status")
+    @field_validator("notification_status")
+    @classmethod
     def validate_notification_status(
-        cls, value: Dict[str, bool], values: Dict[str, Any]
+        cls, value: Dict[str, bool], info: ValidationInfo
     ) -> Dict[str, bool]:
         """Validate that notification_status contains only channels from notification_channels."""
-        if "notification_channels" not in values:
+        if "notification_channels" not in info.data:
             return value
 
-        channels = values["notification_channels"]
-        extra_keys = set(value.keys()) - set(channels)
+        channels = info.data["notification_channels"]
+        extra_keys = value.keys() - set(channels)
         if extra_keys:
             raise ValueError(
                 f"notification_status contains channels not in notification_channels: {', '.join(extra_keys)}"
@@ -162,10 +199,8 @@ async def save_alert_history(alert_data: Dict[str, Any]) -> Dict[str, Any]:
     )
     
     # Log detailed information at debug level
-    logger.debug("Alert data: %s", alert_data)
-    
-    # Simulate database latency for realistic testing
-    await asyncio.sleep(0.1)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Alert data: %s", alert_data)
     
     # Return success response
     return {
@@ -190,15 +225,11 @@ async def track_alert_history_service(request_data: Dict[str, Any]) -> Dict[str,
         Standardized response with status, message, data, and processing_time_ms
     """
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     # Initialize empty response with error defaults
-    response = {
-        "status": "error",
-        "message": "",
-        "data": {},
-        "processing_time_ms": 0
-    }
+    response = _ERROR_RESPONSE.copy()
+    response["data"] = {}
 
     # Validate the request data
     try:
@@ -214,7 +245,7 @@ async def track_alert_history_service(request_data: Dict[str, Any]) -> Dict[str,
         )
 
         # Save the alert history
-        result = await save_alert_history(request.dict())
+        result = await save_alert_history(request.model_dump())
 
         # Build successful response
         response["status"] = "success"
@@ -228,7 +259,7 @@ async def track_alert_history_service(request_data: Dict[str, Any]) -> Dict[str,
         response["message"] = error_message
 
     # Calculate processing time
-    response["processing_time_ms"] = int((time.time() - start_time) * 1000)
+    response["processing_time_ms"] = _elapsed_ms(start)
     logger.info("Alert history request processed in %d ms", response["processing_time_ms"])
 
     return response
@@ -245,15 +276,11 @@ async def handle_alert_history_request(params: Dict[str, Any]) -> Dict[str, Any]
         Standardized response with status, message, data, and processing_time_ms
     """
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     # Initialize empty response with error defaults
-    response = {
-        "status": "error",
-        "message": "",
-        "data": {},
-        "processing_time_ms": 0
-    }
+    response = _ERROR_RESPONSE.copy()
+    response["data"] = {}
 
     try:
         # Process the request asynchronously
@@ -265,5 +292,5 @@ async def handle_alert_history_request(params: Dict[str, Any]) -> Dict[str, Any]
         error_message = f"Unexpected error processing alert history: {str(e)}"
         logger.error(error_message)
         response["message"] = error_message
-        response["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        response["processing_time_ms"] = _elapsed_ms(start)
         return response
@@ -4,12 +4,17 @@ Price History Tracking Service.
 This module implements asynchronous price history tracking functionality,
 stores price data, computes historical trends and optionally triggers alerts.
 """
+import asyncio
 import logging
 import os
+import threading
 import time
+import weakref
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 from app.core.history import (
@@ -21,16 +26,301 @@ from app.core.history import (
     SQLitePriceHistoryRepository,
     WebhookAlertNotifier,
 )
+from app.core.utils.dates import parse_iso_datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging; handlers and levels are left to the application entry point
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Storage and alerting configuration, read once at import
+_PRICE_HISTORY_DB_PATH = os.getenv("PRICE_HISTORY_DB_PATH", "price_history.db")
+_ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+
+
+# Monotonic nanosecond clock used for processing times
+_now = time.perf_counter_ns
+
+
+def _elapsed_ms(start: int) -> int:
+    """Milliseconds elapsed since a _now() reading."""
+    return (_now() - start) // 1_000_000
+
+
+# History components shared across requests, keyed by database path and webhook URL
+_components: Dict[
+    Tuple[str, Optional[str]],
+    Tuple[PriceHistoryRepository, PriceHistoryAnalyzer, AlertNotifier],
+] = {}
+
+# Seconds a retrieved history is reused for an identical query
+_HISTORY_TTL_SECONDS = 60
+
+# Histories and metrics keyed by repository and query parameters; entries for a
+# model are dropped when a new price for it is stored
+_HISTORY_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=_HISTORY_TTL_SECONDS)
+
+# TTLCache isn't thread-safe and every AsyncBridge thread uses the same cache
+_HISTORY_CACHE_LOCK = threading.Lock()
+
+
+# Error response returned unless a request succeeds; copied per request and given
+# a fresh data container, so the shared dict is never mutated
+_ERROR_RESPONSE: Dict[str, Any] = {
+    "status": "error",
+    "message": "An error occurred while processing the request",
+    "data": None,
+    "processing_time_ms": 0,
+}
+
+# Fields a price entry must have to be stored
+_REQUIRED_PRICE_FIELDS = frozenset({"model", "price", "currency", "source", "country"})
+
+# Window of history the store action computes metrics over, matching the
+# repository's default get_history_for_model query
+_METRICS_WINDOW_DAYS = 30
+_METRICS_WINDOW_SIZE = 100
+
+
+def _invalidate_history(repository: PriceHistoryRepository, model: str) -> None:
+    """Drop cached histories of a model read from a repository."""
+    with _HISTORY_CACHE_LOCK:
+        for key in [key for key in _HISTORY_CACHE.keys() if key[0] is repository and key[1] == model]:
+            _HISTORY_CACHE.pop(key, None)
+
+
+def _entry_moment(entry: Dict[str, Any]) -> datetime:
+    """
+    Return a price entry's timestamp as a timezone-aware datetime for ordering.
+
+    Naive timestamps are taken as local time, so entries mixing naive values,
+    offsets and a "Z" suffix still compare correctly.
+    """
+    timestamp = entry["timestamp"]
+    if not isinstance(timestamp, datetime):
+        timestamp = parse_iso_datetime(timestamp)
+    return timestamp.astimezone()
+
+
+class MetricsState:
+    """Recent price entries of a model in a country, kept up to date as prices are stored."""
+
+    def __init__(self, history: List[Dict[str, Any]]):
+        """
+        Initialize the state from history read from the repository.
+
+        Args:
+            history: Price entries sorted by timestamp (newest first)
+        """
+        # Entries paired with their parsed timestamps, newest first
+        self.recent: Deque[Tuple[datetime, Dict[str, Any]]] = deque(maxlen=_METRICS_WINDOW_SIZE)
+        for entry in history:
+            try:
+                self.recent.append((_entry_moment(entry), entry))
+            except (KeyError, TypeError, ValueError):
+                # Rows written before timestamps were validated are left out of the window
+                logger.warning("Skipping price entry %s with invalid timestamp", entry.get("id"))
+
+    def update(self, entry: Dict[str, Any]) -> None:
+        """
+        Add a newly stored price entry.
+
+        Args:
+            entry: Stored price entry with an ISO format timestamp
+        """
+        moment = _entry_moment(entry)
+        if not self.recent or moment >= self.recent[0][0]:
+            self.recent.appendleft((moment, entry))
+            return
+
+        # Backdated entries are rare; re-sort rather than keep the deque ordered by hand
+        entries = sorted([(moment, entry), *self.recent], key=lambda item: item[0], reverse=True)
+        self.recent = deque(entries, maxlen=_METRICS_WINDOW_SIZE)
+
+    def history(self) -> List[Dict[str, Any]]:
+        """
+        Return the entries still inside the metrics window.
+
+        Returns:
+            Price entries sorted by timestamp (newest first)
+        """
+        cutoff = datetime.now().astimezone() - timedelta(days=_METRICS_WINDOW_DAYS)
+        while self.recent and self.recent[-1][0] < cutoff:
+            self.recent.pop()
+        return [entry for _, entry in self.recent]
+
+
+# Seconds a metrics window is trusted before it is read from the repository again,
+# picking up entries stored by other processes or directly through the repository
+_METRICS_STATE_TTL_SECONDS = 60
+
+# Metrics windows keyed by repository, model and country, read from the
+# repository and then updated in memory by the store action until they expire
+_METRICS_STATES: TTLCache = TTLCache(maxsize=1024, ttl=_METRICS_STATE_TTL_SECONDS)
+
+# Guards the cache and the windows in it, which stores on any thread update
+_METRICS_STATES_LOCK = threading.Lock()
+
+
+async def _record_price(
+    repository: PriceHistoryRepository, entry_id: str, price_entry: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Add a stored price entry to its metrics window, loading the window on first use.
+
+    Args:
+        repository: Repository the entry was stored in
+        entry_id: Identifier the repository assigned to the entry
+        price_entry: The stored price entry
+
+    Returns:
+        History to compute metrics from, newest first
+    """
+    model = price_entry["model"]
+    country = price_entry["country"]
+    key = (repository, model, country)
+
+    with _METRICS_STATES_LOCK:
+        state = _METRICS_STATES.get(key)
+
+    if state is None:
+        # The repository already holds the new entry, so the window starts complete
+        history = await repository.get_history_for_model(
+            model, country, days=_METRICS_WINDOW_DAYS, limit=_METRICS_WINDOW_SIZE
+        )
+        state = MetricsState(history)
+        with _METRICS_STATES_LOCK:
+            _METRICS_STATES[key] = state
+            return state.history()
+
+    timestamp = price_entry["timestamp"]
+    entry = {
+        "id": entry_id,
+        "model": model,
+        "price": price_entry["price"],
+        "currency": price_entry.get("currency", "USD"),
+        "source": price_entry.get("source", "unknown"),
+        "country": country,
+        "url": price_entry.get("url", ""),
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+    }
+    with _METRICS_STATES_LOCK:
+        state.update(entry)
+        return state.history()
+
+
+class PriceWriteBatcher:
+    """
+    Coalesces concurrent price writes to a repository into bulk inserts.
+
+    A write is started as soon as the event loop is free. Entries submitted while
+    a write is in progress are queued and stored together by the next one, so
+    busy periods share transactions without delaying writes when idle.
+    """
+
+    def __init__(self, repository: PriceHistoryRepository, max_batch_size: int = 50):
+        """
+        Initialize the batcher.
+
+        Args:
+            repository: Repository to store price entries in
+            max_batch_size: Maximum number of entries stored by one bulk insert
+        """
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[Dict[str, Any], "asyncio.Future[str]"]] = []
+        self._write_task: Optional["asyncio.Task[None]"] = None
+        self._scheduled = False
+
+    async def store(self, price_entry: Dict[str, Any]) -> str:
+        """
+        Store a price entry as part of the next bulk insert.
+
+        Args:
+            price_entry: Price entry to store
+
+        Returns:
+            Unique identifier for the stored entry
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((price_entry, future))
+        self._schedule_write(loop)
+        return await future
+
+    def _schedule_write(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start a write on the next loop iteration unless one is running or scheduled."""
+        if self._write_task is None and not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._start_write)
+
+    def _start_write(self) -> None:
+        """Take the next batch of pending entries and start writing it."""
+        self._scheduled = False
+        if self._write_task is not None or not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        self._write_task = asyncio.ensure_future(self._write(batch))
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], "asyncio.Future[str]"]]) -> None:
+        """Store a batch and resolve each submitter's future."""
+        try:
+            try:
+                entry_ids = await self.repository.store_price_entries([entry for entry, _ in batch])
+                results = list(zip(batch, entry_ids, [None] * len(batch)))
+            except Exception as batch_error:
+                if len(batch) == 1:
+                    results = [(batch[0], None, batch_error)]
+                else:
+                    # Retry one by one so a bad entry fails only its own request
+                    logger.warning("Bulk price write failed, storing entries individually: %s", batch_error)
+                    results = []
+                    for item in batch:
+                        try:
+                            results.append((item, await self.repository.store_price_entry(item[0]), None))
+                        except Exception as entry_error:
+                            results.append((item, None, entry_error))
+
+            for (_, future), entry_id, error in results:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(entry_id)
+        finally:
+            # Never leave a submitter waiting, e.g. if the repository returned too few IDs
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Price entry write did not complete"))
+
+            self._write_task = None
+            if self._pending:
+                self._schedule_write(asyncio.get_running_loop())
+
+
+# Write batchers keyed by event loop, then repository. A batcher's futures and write
+# task belong to one loop, so each loop (e.g. each AsyncBridge worker thread) gets its
+# own; they are dropped with their loop
+_BATCHERS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_BATCHERS_LOCK = threading.Lock()
+
+
+def _get_batcher(repository: PriceHistoryRepository) -> PriceWriteBatcher:
+    """Return the running loop's write batcher for a repository, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _BATCHERS_LOCK:
+        batchers = _BATCHERS.get(loop)
+        if batchers is None:
+            batchers = _BATCHERS[loop] = {}
+        batcher = batchers.get(repository)
+        if batcher is None:
+            batcher = batchers[repository] = PriceWriteBatcher(repository)
+    return batcher
+
 
 async def create_history_components() -> Tuple[
     PriceHistoryRepository, PriceHistoryAnalyzer, AlertNotifier
@@ -38,22 +328,28 @@ async def create_history_components() -> Tuple[
     """
     Create and configure the components for price history tracking with dependency injection.
 
+    Components are built once per database path and webhook URL and shared afterwards.
+
     Returns:
         Tuple containing PriceHistoryRepository, PriceHistoryAnalyzer, and AlertNotifier instances
     """
+    db_path = _PRICE_HISTORY_DB_PATH
+    webhook_url = _ALERT_WEBHOOK_URL
+    components = _components.get((db_path, webhook_url))
+    if components is not None:
+        return components
+
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     try:
         # Create the repository
-        db_path = os.getenv("PRICE_HISTORY_DB_PATH", "price_history.db")
         repository = SQLitePriceHistoryRepository(db_path)
 
         # Create the analyzer
         analyzer = PriceHistoryAnalyzer()
 
         # Create the notifier with appropriate configuration
-        webhook_url = os.getenv("ALERT_WEBHOOK_URL")
         if webhook_url:
             notifier = WebhookAlertNotifier(webhook_url)
             logger.info("Using WebhookAlertNotifier with URL: %s", webhook_url)
@@ -62,13 +358,13 @@ async def create_history_components() -> Tuple[
             logger.info("Using ConsoleAlertNotifier (fallback)")
 
         # Measure and log initialization time
-        init_time = time.time() - start_time
-        logger.info("History components initialized in %.2f seconds", init_time)
+        logger.info("History components initialized in %d ms", _elapsed_ms(start))
 
-        return repository, analyzer, notifier
+        components = _components[(db_path, webhook_url)] = (repository, analyzer, notifier)
+        return components
 
     except Exception as error:
-        logger.error("Failed to initialize history components: %s", str(error))
+        logger.error("Failed to initialize history components: %s", error)
         raise
 
 
@@ -85,35 +381,30 @@ async def track_price_history_service(params: Dict[str, Any]) -> Dict[str, Any]:
         Dict containing standardized response with status, message, data and processing time
     """
     # Start timing for performance monitoring
-    start_time = time.time()
+    start = _now()
 
     # Initialize default error response
-    response = {
-        "status": "error",
-        "message": "An error occurred while processing the request",
-        "data": [],
-        "processing_time_ms": 0
-    }
+    response = _ERROR_RESPONSE.copy()
+    response["data"] = []
 
     try:
         # Check for required action parameter
         if not params or "action" not in params:
             response["message"] = "Missing required parameter: 'action'"
-            response["processing_time_ms"] = int((time.time() - start_time) * 1000)
+            response["processing_time_ms"] = _elapsed_ms(start)
             return response
 
         # Get action parameter
         action = params["action"].lower()
         logger.info("Processing price history request with action: %s", action)
 
-        # Create components with dependency injection
-        repository, analyzer, notifier = await create_history_components()
-
-        # Process based on action
+        # Process based on action, creating components only for supported actions
         if action == "store":
+            repository, analyzer, notifier = await create_history_components()
             result = await handle_store_action(params, repository, analyzer, notifier)
             response.update(result)
         elif action == "get_history":
+            repository, analyzer, _ = await create_history_components()
             result = await handle_get_history_action(params, repository, analyzer)
             response.update(result)
         else:
@@ -127,7 +418,7 @@ async def track_price_history_service(params: Dict[str, Any]) -> Dict[str, Any]:
         response["message"] = error_message
     
     # Calculate processing time
-    response["processing_time_ms"] = int((time.time() - start_time) * 1000)
+    response["processing_time_ms"] = _elapsed_ms(start)
     logger.info("Request processed in %d ms", response["processing_time_ms"])
     
     return response
@@ -170,16 +461,20 @@ async def handle_store_action(
         response["message"] = "Invalid price_entry: must be a dictionary"
         return response
 
-    required_fields = ["model", "price", "currency", "source", "country"]
-    missing_fields = [field for field in required_fields if field not in price_entry]
-    
+    missing_fields = _REQUIRED_PRICE_FIELDS - price_entry.keys()
     if missing_fields:
-        response["message"] = f"Invalid price_entry: missing required fields: {', '.join(missing_fields)}"
+        response["message"] = f"Invalid price_entry: missing required fields: {', '.join(sorted(missing_fields))}"
         return response
 
     # Add timestamp if not provided
     if "timestamp" not in price_entry:
         price_entry["timestamp"] = datetime.now().isoformat()
+    elif not isinstance(price_entry["timestamp"], datetime):
+        try:
+            parse_iso_datetime(price_entry["timestamp"])
+        except (TypeError, ValueError):
+            response["message"] = "Invalid price_entry: timestamp must be an ISO 8601 date or time"
+            return response
 
     # Check for alert rules
     alert_rules = params.get("alert_rules", [])
@@ -189,36 +484,33 @@ async def handle_store_action(
 
     # Store the price entry
     try:
-        # Store price entry
-        entry_id = await repository.store_price(price_entry)
+        # Store price entry, sharing a transaction with concurrent writes
+        entry_id = await _get_batcher(repository).store(price_entry)
         
-        # Get history for the model to compute metrics
+        # Update the model's recent history in memory rather than reading it back
         model = price_entry["model"]
-        history = await repository.get_price_history(model)
+        _invalidate_history(repository, model)
+        history = await _record_price(repository, entry_id, price_entry)
         
         # Compute metrics
         metrics = await analyzer.compute_metrics(history)
         
-        # Check for alerts if rules provided
+        # Check enabled alert rules against the computed metrics in one pass
         alerts_triggered = []
-        if alert_rules:
-            for rule_dict in alert_rules:
-                try:
-                    # Create rule object
-                    rule = AlertRule(
-                        type=rule_dict.get("type", "price_drop"),
-                        threshold=rule_dict.get("threshold", 5.0),
-                        model=model,
-                        min_price_count=rule_dict.get("min_price_count", 2)
-                    )
-                    
-                    # Check if rule matches
-                    if analyzer.check_alert_rule(history, rule):
-                        # Trigger alert
-                        await notifier.send_alert(rule, price_entry, metrics)
-                        alerts_triggered.append(rule_dict)
-                except Exception as rule_error:
-                    logger.error("Error processing alert rule: %s", str(rule_error))
+        rules = [
+            AlertRule.from_dict(rule_dict)
+            for rule_dict in alert_rules
+            if isinstance(rule_dict, dict) and rule_dict.get("enabled", False)
+        ]
+        if rules:
+            try:
+                alerts_triggered = await notifier.check_alert_rules(
+                    model, price_entry["country"], price_entry, metrics, rules
+                )
+                if alerts_triggered:
+                    await notifier.send_alerts(alerts_triggered)
+            except Exception as rule_error:
+                logger.error("Error processing alert rules: %s", rule_error)
         
         # Build successful response
         response["status"] = "success"
@@ -232,7 +524,7 @@ async def handle_store_action(
         return response
         
     except Exception as store_error:
-        logger.error("Error storing price entry: %s", str(store_error))
+        logger.error("Error storing price entry: %s", store_error)
         response["message"] = f"Failed to store price entry: {str(store_error)}"
         return response
 
@@ -276,16 +568,32 @@ async def handle_get_history_action(
     days = params.get("days", 30)
     start_date = params.get("start_date")
     end_date = params.get("end_date")
-    
+
     try:
+        # Reuse a recent identical query; entries are copied so callers never share them
+        cache_key = (repository, model, country, days, start_date, end_date)
+        with _HISTORY_CACHE_LOCK:
+            cached = _HISTORY_CACHE.get(cache_key)
+        if cached is not None:
+            history, metrics, filters = cached
+            response["status"] = "success"
+            response["message"] = f"Retrieved {len(history)} price points for {model}"
+            response["data"] = {
+                "history": [dict(entry) for entry in history],
+                "metrics": dict(metrics),
+                "filters": dict(filters),
+            }
+            response["cached"] = True
+            return response
+
         # Convert dates if provided
         start_datetime = None
         if start_date:
-            start_datetime = datetime.fromisoformat(start_date)
+            start_datetime = parse_iso_datetime(start_date)
         
         end_datetime = None
         if end_date:
-            end_datetime = datetime.fromisoformat(end_date)
+            end_datetime = parse_iso_datetime(end_date)
         
         # If no dates provided, use days parameter
         if not start_datetime and not end_datetime:
@@ -304,23 +612,28 @@ async def handle_get_history_action(
         # Compute metrics
         metrics = await analyzer.compute_metrics(history)
         
+        filters = {
+            "model": model,
+            "country": country,
+            "start_date": start_datetime.isoformat() if start_datetime else None,
+            "end_date": end_datetime.isoformat() if end_datetime else None
+        }
+        cached = ([dict(entry) for entry in history], dict(metrics), dict(filters))
+        with _HISTORY_CACHE_LOCK:
+            _HISTORY_CACHE[cache_key] = cached
+        
         # Build successful response
         response["status"] = "success"
         response["message"] = f"Retrieved {len(history)} price points for {model}"
         response["data"] = {
             "history": history,
             "metrics": metrics,
-            "filters": {
-                "model": model,
-                "country": country,
-                "start_date": start_datetime.isoformat() if start_datetime else None,
-                "end_date": end_datetime.isoformat() if end_datetime else None
-            }
+            "filters": filters
         }
         
         return response
         
     except Exception as fetch_error:
-        logger.error("Error retrieving price history: %s", str(fetch_error))
+        logger.error("Error retrieving price history: %s", fetch_error)
         response["message"] = f"Failed to retrieve price history: {str(fetch_error)}"
         return response
@@ -0,0 +1,42 @@
+"""
+Helpers shared by the MCP service tests.
+
+Provides lightweight alternatives to unittest.mock patching for tests that
+only need to replace a module attribute, and assertions on the response
+format shared by the services.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Keys every MCP service response carries
+RESPONSE_KEYS = frozenset({"status", "message", "data", "processing_time_ms"})
+
+
+@contextmanager
+def swap_attr(target: Any, name: str, value: Any) -> Iterator[Any]:
+    """
+    Temporarily replace an attribute, restoring the original on exit.
+
+    Args:
+        target: Object or module holding the attribute
+        name: Name of the attribute to replace
+        value: Replacement value
+
+    Yields:
+        The replacement value
+    """
+    original = getattr(target, name)
+    setattr(target, name, value)
+    try:
+        yield value
+    finally:
+        setattr(target, name, original)
+
+
+class ResponseAssertionsMixin:
+    """Assertions for unittest test cases on the standard service response format."""
+
+    def assert_response_envelope(self, response: Dict[str, Any]) -> None:
+        """Assert that a response is a dict carrying every standard response key."""
+        self.assertIsInstance(response, dict)
+        self.assertGreaterEqual(response.keys(), RESPONSE_KEYS)
@@ -5,63 +5,133 @@ This module tests the functionality of the MCP service that provides price analy
 using async/await patterns for non-blocking operations.
 """
 import asyncio
+import os
+import tempfile
 import time
 import unittest
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import patch
 
 from app.core.analyzer.clients.openai_client import OpenAIClient
-from app.core.analyzer.formatting.price_formatter import PriceFormatter
-from app.core.analyzer.prompts.analysis_prompt import PriceAnalysisPromptGenerator
-from app.core.analyzer.rule_based.fallback_analyzer import FallbackAnalyzer
-from app.mcp.analyze_prices.service import create_analyzer_components, analyze_prices_service
+from app.mcp.analyze_prices.service import (
+    _ANALYSIS_CACHE,
+    AnalysisDiskCache,
+    analyze_prices_service,
+    create_analyzer_components,
+)
+from app.tests.mcp.helpers import ResponseAssertionsMixin
 
 
-class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
+class _StubFormatter:
+    """Price formatter stub returning fixed formatted data."""
+
+    def __init__(self, formatted):
+        self.formatted = formatted
+
+    def format_for_analysis(self, prices):
+        return self.formatted
+
+
+class _StubPromptGenerator:
+    """Prompt generator stub returning a fixed prompt."""
+
+    def __init__(self, prompt):
+        self.prompt = prompt
+
+    def generate_prompt(self, formatted_data):
+        return self.prompt
+
+
+class _StubLLMClient:
+    """LLM client stub returning a fixed analysis and recording its prompts."""
+
+    def __init__(self, analysis, delay=0.0, client_available=True):
+        self.analysis = analysis
+        self.delay = delay
+        self.client_available = client_available
+        self.prompts = []
+
+    async def generate_text(self, prompt):
+        self.prompts.append(prompt)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.analysis
+
+
+class _LoopBoundLLMClient:
+    """LLM client stub that, like an httpx-backed client, only works on its first event loop."""
+
+    model = "loop-bound"
+    client_available = True
+
+    def __init__(self):
+        self.loop = None
+
+    async def generate_text(self, prompt):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        # The real client swallows "Event loop is closed" and returns an empty analysis
+        return "Prices are holding steady." if loop is self.loop else ""
+
+
+class _StubFallbackAnalyzer:
+    """Rule-based analyzer stub returning a fixed fallback analysis."""
+
+    def analyze(self, prices):
+        return "[FALLBACK ANALYSIS] Price trends are unavailable."
+
+
+def _stub_components(prompt, analysis, delay=0.0):
+    """Build a formatter, prompt generator, LLM client and fallback analyzer of stubs."""
+    return (
+        _StubFormatter("Formatted price data"),
+        _StubPromptGenerator(prompt),
+        _StubLLMClient(analysis, delay),
+        _StubFallbackAnalyzer(),
+    )
+
+
+class TestAnalyzePricesMCPService(ResponseAssertionsMixin, unittest.IsolatedAsyncioTestCase):
     """Test suite for the analyze_prices MCP service with async implementation."""
 
-    def setUp(self):
-        """Set up test data"""
-        self.sample_prices = [
-            {
-                "model": "iPhone 15 Pro",
-                "region": "US",
-                "price": 999.99,
-                "currency": "USD",
-                "timestamp": "2025-05-01T12:00:00Z",
-                "source": "Amazon",
-            },
-            {
-                "model": "iPhone 15 Pro",
-                "region": "US",
-                "price": 949.99,
-                "currency": "USD",
-                "timestamp": "2025-05-08T12:00:00Z",
-                "source": "BestBuy",
-            },
-            {
-                "model": "iPhone 15 Pro",
-                "region": "US",
-                "price": 899.99,
-                "currency": "USD",
-                "timestamp": "2025-05-15T12:00:00Z",
-                "source": "Walmart",
-            },
-        ]
+    # Price history shared by the tests; treated as read-only
+    SAMPLE_PRICES = [
+        {
+            "model": "iPhone 15 Pro",
+            "region": "US",
+            "price": 999.99,
+            "currency": "USD",
+            "timestamp": "2025-05-01T12:00:00Z",
+            "source": "Amazon",
+        },
+        {
+            "model": "iPhone 15 Pro",
+            "region": "US",
+            "price": 949.99,
+            "currency": "USD",
+            "timestamp": "2025-05-08T12:00:00Z",
+            "source": "BestBuy",
+        },
+        {
+            "model": "iPhone 15 Pro",
+            "region": "US",
+            "price": 899.99,
+            "currency": "USD",
+            "timestamp": "2025-05-15T12:00:00Z",
+            "source": "Walmart",
+        },
+    ]
 
     async def test_analyze_prices_service_with_valid_data(self):
         """Test handling a valid request with price data"""
         # Arrange
-        params = {"prices": self.sample_prices}
+        params = {"prices": self.SAMPLE_PRICES}
 
         # Act
         response = await analyze_prices_service(params)
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
+        self.assert_response_envelope(response)
         
         self.assertEqual(response["status"], "success")
         self.assertIn("analysis", response["data"])
@@ -69,13 +139,10 @@ class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(len(response["data"]["analysis"]) > 0)
         
         # Verificar que a análise tem pelo menos 2 sentenças (critério de aceitação)
-        sentences = response["data"]["analysis"].split(". ")
-        self.assertTrue(
-            len([sentence for sentence in sentences if sentence]) >= 2,
-            (
-                f"A análise deve ter pelo menos 2 sentenças, "
-                f"mas tem {len([sentence for sentence in sentences if sentence])}"
-            ),
+        analysis = response["data"]["analysis"]
+        n_sentences = sum(1 for sentence in analysis.split(". ") if sentence)
+        self.assertGreaterEqual(
+            n_sentences, 2, f"A análise deve ter pelo menos 2 sentenças, mas tem {n_sentences}"
         )
 
     async def test_analyze_prices_service_with_missing_parameters(self):
@@ -87,11 +154,7 @@ class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
         response = await analyze_prices_service(params)
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
+        self.assert_response_envelope(response)
         
         self.assertEqual(response["status"], "error")
         self.assertIn("Missing", response["message"])
@@ -106,11 +169,7 @@ class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
         response = await analyze_prices_service(params)
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
+        self.assert_response_envelope(response)
         
         self.assertEqual(response["status"], "error")
         self.assertIn("list", response["message"].lower())
@@ -125,51 +184,76 @@ class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
         response = await analyze_prices_service(params)
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
+        self.assert_response_envelope(response)
         
         self.assertEqual(response["status"], "error")
         self.assertIn("Empty", response["message"])
         self.assertEqual(response["data"], [])
 
-    @patch("app.mcp.analyze_prices.service.create_analyzer_components")
-    async def test_with_component_integration(self, mock_create_components):
-        """Test integration with the AI agent for price analysis"""
-        # Arrange - Setup mocked components
-        mock_formatter = Mock(spec=PriceFormatter)
-        mock_prompt_generator = Mock(spec=PriceAnalysisPromptGenerator)
-        mock_llm_client = AsyncMock(spec=OpenAIClient)
-        mock_fallback_analyzer = Mock(spec=FallbackAnalyzer)
-
-        # Configure component behavior
-        mock_formatter.format_for_analysis.return_value = "Formatted price data"
-        mock_prompt_generator.generate_prompt.return_value = "Analysis prompt"
-        
-        # Configure async mock with direct result (no Future needed)
-        mock_llm_client.generate_text.return_value = "The prices are decreasing. Now is a good time to buy."
-
-        # Set up the mock to return our mocked components directly (no Future needed)
-        mock_create_components.return_value = (
-            mock_formatter,
-            mock_prompt_generator,
-            mock_llm_client,
-            mock_fallback_analyzer,
+    async def test_analyzer_components_are_shared(self):
+        """Test that analyzer components are created once and reused"""
+        first = await create_analyzer_components()
+        second = await create_analyzer_components()
+
+        self.assertIs(first, second)
+        self.assertIsInstance(first[2], OpenAIClient)
+
+
+    def test_llm_client_is_created_per_event_loop(self):
+        """Test that requests on separate event loops each get a working LLM client"""
+        # Arrange - different prices per request, so the second one is not served from the cache
+        _ANALYSIS_CACHE.clear()
+        requests = [
+            {"prices": [dict(price, price=price["price"] + offset) for price in self.SAMPLE_PRICES]}
+            for offset in (0, 10)
+        ]
+
+        # Act - the UI runs each request on a new event loop
+        with patch("app.mcp.analyze_prices.service.OpenAIClient", _LoopBoundLLMClient):
+            responses = [asyncio.run(analyze_prices_service(params)) for params in requests]
+
+        # Assert
+
+        for response in responses:
+            self.assertEqual(response["status"], "success")
+            self.assertEqual(response["data"]["analysis"], "Prices are holding steady.")
+
+
+class TestAnalyzePricesComponentIntegration(ResponseAssertionsMixin, unittest.IsolatedAsyncioTestCase):
+    """Test suite for the analyze_prices MCP service with injected analyzer components."""
+
+    SAMPLE_PRICES = TestAnalyzePricesMCPService.SAMPLE_PRICES
+
+    @classmethod
+    def setUpClass(cls):
+        """Patch the component factory once and wire the shared stub components."""
+        cls._patcher = patch("app.mcp.analyze_prices.service.create_analyzer_components")
+        cls._mock_factory = cls._patcher.start()
+        cls._wired_components = _stub_components(
+            "Analysis prompt", "The prices are decreasing. Now is a good time to buy."
         )
 
-        params = {"prices": self.sample_prices}
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the component factory."""
+        cls._patcher.stop()
+
+    def setUp(self):
+        """Start each test with a fresh factory mock."""
+        self._mock_factory.reset_mock(return_value=True, side_effect=True)
+
+    async def test_with_component_integration(self):
+        """Test integration with the AI agent for price analysis"""
+        # Arrange - Return the shared stub components
+        self._mock_factory.return_value = self._wired_components
+
+        params = {"prices": self.SAMPLE_PRICES}
 
         # Act
         response = await analyze_prices_service(params)
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
+        self.assert_response_envelope(response)
         
         self.assertEqual(response["status"], "success")
         self.assertIn("analysis", response["data"])
@@ -178,52 +262,125 @@ class TestAnalyzePricesMCPService(unittest.IsolatedAsyncioTestCase):
             "The prices are decreasing. Now is a good time to buy.",
         )
 
-    @unittest.skip("Temporariamente desabilitado durante a migração do FastAPI para módulos async puros")
-    @patch("app.mcp.analyze_prices.service.create_analyzer_components")
-    async def test_with_llm_error(self, mock_create_components):
-        """Test fallback behavior when AI analysis fails"""
-        # Arrange - Setup mocked components
-        mock_formatter = Mock(spec=PriceFormatter)
-        mock_prompt_generator = Mock(spec=PriceAnalysisPromptGenerator)
-        mock_llm_client = AsyncMock(spec=OpenAIClient)
-        mock_fallback_analyzer = Mock(spec=FallbackAnalyzer)
-
-        # Configure component behavior
-        mock_formatter.format_for_analysis.return_value = "Formatted price data"
-        mock_prompt_generator.generate_prompt.return_value = "Analysis prompt"
-        
-        # Configure async mock to raise exception
-        mock_llm_client.generate_text.side_effect = Exception("AI service unavailable")
-        
-        # Configure fallback analyzer
-        mock_fallback_analyzer.generate_analysis.return_value = (
-            "[FALLBACK ANALYSIS] Analysis with price trends for iPhone"
+    async def test_repeated_analysis_is_cached(self):
+        """Test that identical prompts reuse the previous LLM analysis"""
+        # Arrange - Setup stub components
+        _ANALYSIS_CACHE.clear()
+        components = _stub_components(
+            "Cached analysis prompt", "Prices are stable. Buy whenever convenient."
         )
+        self._mock_factory.return_value = components
+
+        params = {"prices": self.SAMPLE_PRICES}
+
+        # Act
+        first = await analyze_prices_service(params)
+        second = await analyze_prices_service(params)
 
-        # Set up the mock to return our mocked components directly (no Future needed)
-        mock_create_components.return_value = (
-            mock_formatter,
-            mock_prompt_generator,
-            mock_llm_client,
-            mock_fallback_analyzer,
+        # Assert
+        self.assertEqual(first["data"], second["data"])
+        self.assertEqual(components[2].prompts, ["Cached analysis prompt"])
+
+    async def test_analysis_survives_memory_cache_loss(self):
+        """Test that analyses persisted on disk are reused after the memory cache is lost"""
+        # Arrange - Setup stub components and an on-disk cache
+        _ANALYSIS_CACHE.clear()
+        components = _stub_components(
+            "Persisted analysis prompt", "Prices peaked last week. Expect a drop soon."
         )
+        self._mock_factory.return_value = components
+
+        params = {"prices": self.SAMPLE_PRICES}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            disk_cache = AnalysisDiskCache(os.path.join(tmp_dir, "analysis_cache.db"))
+            with patch("app.mcp.analyze_prices.service._disk_cache", disk_cache):
+                # Act - analyze, then simulate a restart by dropping the memory cache
+                first = await analyze_prices_service(params)
+                _ANALYSIS_CACHE.clear()
+                second = await analyze_prices_service(params)
+
+        # Assert
+        self.assertEqual(first["data"], second["data"])
+        self.assertEqual(components[2].prompts, ["Persisted analysis prompt"])
+
+    async def test_unavailable_client_placeholder_is_not_cached(self):
+        """Test that the placeholder returned without an API key is never cached"""
+        # Arrange - Setup a stub LLM client without credentials and an on-disk cache
+        _ANALYSIS_CACHE.clear()
+        placeholder = "AI price analysis not available. Using basic price comparison instead."
+        components = _stub_components("Unavailable analysis prompt", placeholder)
+        components[2].client_available = False
+        self._mock_factory.return_value = components
+
+        params = {"prices": self.SAMPLE_PRICES}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            disk_cache = AnalysisDiskCache(os.path.join(tmp_dir, "analysis_cache.db"))
+            with patch("app.mcp.analyze_prices.service._disk_cache", disk_cache):
+                # Act
+                await analyze_prices_service(params)
+                await analyze_prices_service(params)
 
-        params = {"prices": self.sample_prices}
+        # Assert - both requests reached the client, so a configured key takes effect at once
+        self.assertEqual(len(components[2].prompts), 2)
+        self.assertEqual(len(_ANALYSIS_CACHE), 0)
+
+    async def test_concurrent_identical_requests_share_analysis(self):
+        """Test that concurrent requests for the same prices trigger a single LLM call"""
+        # Arrange - Setup stub components with a slow LLM
+        _ANALYSIS_CACHE.clear()
+        components = _stub_components(
+            "Concurrent analysis prompt", "Prices are dropping. Wait a week before buying.", delay=0.05
+        )
+        self._mock_factory.return_value = components
+
+        params = {"prices": self.SAMPLE_PRICES}
 
         # Act
-        response = await analyze_prices_service(params)
+        responses = await asyncio.gather(*(analyze_prices_service(params) for _ in range(3)))
 
         # Assert
-        self.assertIsInstance(response, dict)
-        self.assertIn("status", response)
-        self.assertIn("message", response)
-        self.assertIn("data", response)
-        self.assertIn("processing_time_ms", response)
-        
-        self.assertEqual(response["status"], "success")
-        self.assertIn("analysis", response["data"])
-        self.assertIn("fallback", response["data"]["analysis"].lower())
-        self.assertIn("Fallback", response["message"])
+        self.assertTrue(all(response["status"] == "success" for response in responses))
+        self.assertEqual(len(components[2].prompts), 1)
+
+    async def test_identical_request_on_another_loop_runs_own_analysis(self):
+        """Test that a request on another event loop does not join an analysis running on this one"""
+        # Arrange - Setup stub components with a slow LLM
+        _ANALYSIS_CACHE.clear()
+        components = _stub_components(
+            "Cross-loop analysis prompt", "Prices are flat. Buy when you need one.", delay=0.2
+        )
+        self._mock_factory.return_value = components
+
+        params = {"prices": self.SAMPLE_PRICES}
+
+        # Act - AsyncBridge runs each request on its own loop in a worker thread
+        first = asyncio.ensure_future(analyze_prices_service(params))
+        await asyncio.sleep(0)
+        second = await asyncio.to_thread(asyncio.run, analyze_prices_service(params))
+
+        # Assert
+        self.assertEqual((await first)["status"], "success")
+        self.assertEqual(second["status"], "success")
+        self.assertEqual(len(components[2].prompts), 2)
+
+    async def test_prices_with_unusual_values_are_analyzed(self):
+        """Test that price data the request digest can't encode as is still gets analyzed"""
+        # Arrange - Setup stub components
+        _ANALYSIS_CACHE.clear()
+        components = _stub_components("Unusual payload prompt", "Prices are stable.")
+        self._mock_factory.return_value = components
+
+        # Act - a non-string key and an integer beyond 64 bits
+        responses = [
+            await analyze_prices_service({"prices": [{"price": 10, 1: "x"}]}),
+            await analyze_prices_service({"prices": [{"price": 10, "units_sold": 2 ** 70}]}),
+        ]
+
+        # Assert
+        self.assertEqual([response["status"] for response in responses], ["success", "success"])
+        self.assertEqual(responses[0]["data"]["analysis"], "Prices are stable.")
 
 
 if __name__ == "__main__":
@@ -7,65 +7,72 @@ Supports testing the asynchronous implementation of direct async services.
 import asyncio
 import os
 import unittest
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
-import pytest
-
-from app.core.scraping.bright_data_scraper import BrightDataPriceScraper
-from app.core.scraping.error_handler import DefaultScrapingErrorHandler
-from app.core.scraping.interfaces import PriceScraper, ResultNormalizer, ScrapingErrorHandler
 from app.core.scraping.normalizer import PriceResultNormalizer
+from app.mcp.scrape_prices import service as scrape_service
 from app.mcp.scrape_prices.service import create_scraping_components, scrape_prices_service
+from app.tests.mcp.helpers import swap_attr
 
 
-class TestScrapePricesMCPService(unittest.TestCase):
-    """Test cases for the scrape_prices MCP server."""
+class _StubScraper:
+    """Scraper stub returning fixed results and recording the searches it runs."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Set up an event loop for async tests
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+    def __init__(self, results=None, error=None):
+        self.results = results
+        self.error = error
+        self.calls = []
 
-        self.sample_model = "iPhone 13"
-        self.sample_country = "us"
+    async def scrape(self, model, country, timeout=30):
+        self.calls.append((model, country, timeout))
+        if self.error is not None:
+            raise self.error
+        return self.results
 
-        # Sample scraper results
-        self.sample_results = [
-            {
-                "title": "iPhone 13 128GB",
-                "price": 799.99,
-                "currency": "USD",
-                "url": "https://example.com/iphone13",
-                "store": "Example Store",
-                "date": "2025-05-18",
-            },
-            {
-                "name": "iPhone 13 Pro",
-                "price": 999.99,
-                "currency": "USD",
-                "url": "https://example.com/iphone13pro",
-                "source": "Another Store",
-                "date": "2025-05-18",
-            },
-        ]
 
-    def tearDown(self):
-        """Clean up after each test."""
-        self.loop.close()
+class _StubNormalizer:
+    """Normalizer stub returning fixed results and recording its inputs."""
 
-    @pytest.mark.asyncio
-    @patch("app.mcp.scrape_prices.service.create_scraping_components")
-    async def test_scrape_prices_service_with_valid_data(self, mock_create_components):
+    def __init__(self, normalized):
+        self.normalized = normalized
+        self.calls = []
+
+    async def normalize(self, results, model, country):
+        self.calls.append((results, model, country))
+        return self.normalized
+
+
+class TestScrapePricesMCPService(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the scrape_prices MCP server."""
+
+    # Request and scraper results shared by the tests; treated as read-only
+    SAMPLE_MODEL = "iPhone 13"
+    SAMPLE_COUNTRY = "us"
+
+    # Sample scraper results
+    SAMPLE_RESULTS = [
+        {
+            "title": "iPhone 13 128GB",
+            "price": 799.99,
+            "currency": "USD",
+            "url": "https://example.com/iphone13",
+            "store": "Example Store",
+            "date": "2025-05-18",
+        },
+        {
+            "name": "iPhone 13 Pro",
+            "price": 999.99,
+            "currency": "USD",
+            "url": "https://example.com/iphone13pro",
+            "source": "Another Store",
+            "date": "2025-05-18",
+        },
+    ]
+
+    async def test_scrape_prices_service_with_valid_data(self):
         """Test handling a request with valid data using DI components asynchronously."""
-        # Arrange - Setup mocked components
-        mock_scraper = AsyncMock(spec=PriceScraper)
-        mock_normalizer = Mock(spec=ResultNormalizer)
-        mock_error_handler = Mock(spec=ScrapingErrorHandler)
-
-        # Configure component behavior
-        mock_scraper.scrape_prices.return_value = self.sample_results
-        mock_normalizer.normalize_results.return_value = [
+        # Arrange - Setup stub components
+        normalized_results = [
             {
                 "product": "iPhone 13 128GB",
                 "price": "$799.99",
@@ -85,77 +92,70 @@ class TestScrapePricesMCPService(unittest.TestCase):
                 "date": "2025-05-18",
             },
         ]
+        scraper = _StubScraper(self.SAMPLE_RESULTS)
+        normalizer = _StubNormalizer(normalized_results)
+        error_handler = AsyncMock()
 
-        # Set up the mock to return our mocked components
-        mock_create_components.return_value = (
-            mock_scraper,
-            mock_normalizer,
-            mock_error_handler,
-        )
+        # Set up the factory to return our stub components
+        async def create_components():
+            return scraper, normalizer, error_handler
 
-        params = {"model": self.sample_model, "country": self.sample_country}
+        params = {"model": self.SAMPLE_MODEL, "country": self.SAMPLE_COUNTRY}
 
         # Act
-        response = await scrape_prices_service(params)
+        with swap_attr(scrape_service, "create_scraping_components", create_components):
+            response = await scrape_prices_service(params)
 
         # Assert
         self.assertIsInstance(response, dict)
         self.assertEqual(response["status"], "success")
         self.assertEqual(len(response["data"]), 2)
-        mock_scraper.scrape_prices.assert_called_once_with(
-            self.sample_model, self.sample_country
-        )
-        mock_normalizer.normalize_results.assert_called_once_with(
-            self.sample_results, self.sample_model, self.sample_country
+        self.assertEqual(scraper.calls, [(self.SAMPLE_MODEL, self.SAMPLE_COUNTRY, 30)])
+        self.assertEqual(
+            normalizer.calls, [(self.SAMPLE_RESULTS, self.SAMPLE_MODEL, self.SAMPLE_COUNTRY)]
         )
 
-    @pytest.mark.asyncio
-    @patch("app.mcp.scrape_prices.service.create_scraping_components")
-    async def test_scrape_prices_service_with_scraping_error(self, mock_create_components):
+    async def test_scrape_prices_service_with_scraping_error(self):
         """Test handling when the scraper raises an exception asynchronously."""
-        # Arrange - Setup mocked components
-        mock_scraper = AsyncMock(spec=PriceScraper)
-        mock_normalizer = Mock(spec=ResultNormalizer)
-        mock_error_handler = Mock(spec=ScrapingErrorHandler)
-
-        # Configure component behavior - Scraper raises exception
-        mock_scraper.scrape_prices.side_effect = Exception("Scraping failed")
-        mock_error_handler.handle_error.return_value = {
+        # Arrange - Setup stub components, with a scraper that raises an exception
+        scraper = _StubScraper(error=Exception("Scraping failed"))
+        normalizer = _StubNormalizer([])
+        error_handler = AsyncMock()
+        error_handler.handle_error.return_value = {
             "status": "error",
             "message": "Failed to scrape prices: Scraping failed",
             "data": [],
         }
 
-        # Set up the mock to return our mocked components
-        mock_create_components.return_value = (
-            mock_scraper,
-            mock_normalizer,
-            mock_error_handler,
-        )
+        # Set up the factory to return our stub components
+        async def create_components():
+            return scraper, normalizer, error_handler
 
-        params = {"model": self.sample_model, "country": self.sample_country}
+        params = {"model": self.SAMPLE_MODEL, "country": self.SAMPLE_COUNTRY}
 
         # Act
-        response = await scrape_prices_service(params)
+        with swap_attr(scrape_service, "create_scraping_components", create_components):
+            response = await scrape_prices_service(params)
 
         # Assert
         self.assertIsInstance(response, dict)
         self.assertEqual(response["status"], "error")
-        self.assertIn("Failed to scrape prices", response["message"])
+        self.assertIn("Scraping failed", response["message"])
         self.assertEqual(response["data"], [])
-        mock_error_handler.handle_error.assert_called_once()
+        self.assertEqual(normalizer.calls, [])
+        self.assertEqual(error_handler.handle_error.await_count, 1)
 
-    @pytest.mark.asyncio
-    @patch("app.mcp.scrape_prices.service.BrightDataPriceScraper")
-    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer")
-    @patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler")
+    @patch("app.mcp.scrape_prices.service._components", None)
+    @patch("app.mcp.scrape_prices.service.BrightDataPriceScraper", new_callable=Mock)
+    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer", new_callable=Mock)
+    @patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler", new_callable=Mock)
     @patch.dict(os.environ, {"BRIGHT_DATA_USERNAME": "test_user", "BRIGHT_DATA_PASSWORD": "test_pass"})
     async def test_create_scraping_components_with_credentials(self, mock_error_handler, mock_normalizer, mock_scraper):
         """Test the creation of scraping components when credentials are available."""
         # Arrange
-        mock_scraper_instance = AsyncMock(spec=PriceScraper)
-        mock_normalizer_instance = Mock(spec=ResultNormalizer)
-        mock_error_handler_instance = Mock(spec=ScrapingErrorHandler)
+        mock_scraper_instance = Mock()
+        mock_normalizer_instance = Mock()
+        mock_error_handler_instance = Mock()
         
         mock_scraper.return_value = mock_scraper_instance
         mock_normalizer.return_value = mock_normalizer_instance
@@ -169,11 +169,10 @@ class TestScrapePricesMCPService(unittest.TestCase):
         self.assertEqual(result[0], mock_scraper_instance)
         self.assertEqual(result[1], mock_normalizer_instance)
         self.assertEqual(result[2], mock_error_handler_instance)
-        mock_scraper.assert_called_once()
-        mock_normalizer.assert_called_once()
-        mock_error_handler.assert_called_once()
+        self.assertEqual(mock_scraper.call_count, 1)
+        self.assertEqual(mock_normalizer.call_count, 1)
+        self.assertEqual(mock_error_handler.call_count, 1)
 
-    @pytest.mark.asyncio
     @patch("app.mcp.scrape_prices.service.create_scraping_components")
     async def test_scrape_prices_service_with_missing_parameters(self, mock_create_components):
         """Test handling a request with missing required parameters asynchronously."""
@@ -188,7 +187,7 @@ class TestScrapePricesMCPService(unittest.TestCase):
         self.assertIn("Missing required parameter", response["message"])
 
 
-    @pytest.mark.asyncio
+    @patch("app.mcp.scrape_prices.service._components", None)
     @patch("app.mcp.scrape_prices.service.os.getenv")
     async def test_create_scraping_components_without_credentials(self, mock_getenv):
         """Test that create_scraping_components raises ValueError when credentials are missing."""
@@ -207,15 +206,15 @@ class TestScrapePricesMCPService(unittest.TestCase):
         self.assertIn("Bright Data credentials are required", str(context.exception))
 
 
-    @pytest.mark.asyncio
-    @patch("app.mcp.scrape_prices.service.BrightDataPriceScraper")
-    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer")
-    @patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler")
+    @patch("app.mcp.scrape_prices.service._components", None)
+    @patch("app.mcp.scrape_prices.service.BrightDataPriceScraper", new_callable=Mock)
+    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer", new_callable=Mock)
+    @patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler", new_callable=Mock)
     @patch.dict(os.environ, {"BRIGHT_DATA_USERNAME": "test_user", "BRIGHT_DATA_PASSWORD": "test_pass"})
     async def test_lazy_loading_bright_data_scraper(self, mock_error_handler, mock_normalizer, mock_scraper):
         """Test that BrightDataPriceScraper is properly lazy-loaded in the create_scraping_components function."""
         # Arrange
-        mock_scraper_instance = AsyncMock(spec=PriceScraper)
+        mock_scraper_instance = Mock()
         mock_scraper.return_value = mock_scraper_instance
         
         # Act
@@ -224,16 +223,16 @@ class TestScrapePricesMCPService(unittest.TestCase):
         
         # Assert
         self.assertEqual(scraper, mock_scraper_instance)
-        mock_scraper.assert_called_once()
+        self.assertEqual(mock_scraper.call_count, 1)
 
 
-    @pytest.mark.asyncio
-    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer")
+    @patch("app.mcp.scrape_prices.service._components", None)
+    @patch("app.mcp.scrape_prices.service.PriceResultNormalizer", new_callable=Mock)
     @patch.dict(os.environ, {"BRIGHT_DATA_USERNAME": "test_user", "BRIGHT_DATA_PASSWORD": "test_pass"})
     async def test_normalizer_component(self, mock_normalizer):
         """Test that the normalizer component is properly initialized and used."""
         # Arrange
-        mock_normalizer_instance = Mock(spec=ResultNormalizer)
+        mock_normalizer_instance = Mock()
         test_results = [{"key": "value"}]
         normalized_results = [{"normalized": "data"}]
         
@@ -242,10 +241,10 @@ class TestScrapePricesMCPService(unittest.TestCase):
         mock_normalizer_instance.normalize_results.return_value = normalized_results
         
         # Use context to avoid actually creating real components for scraper and error_handler
-        with patch("app.mcp.scrape_prices.service.BrightDataPriceScraper") as mock_scraper, \
-             patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler"):
+        with patch("app.mcp.scrape_prices.service.BrightDataPriceScraper", new_callable=Mock) as mock_scraper, \
+             patch("app.mcp.scrape_prices.service.DefaultScrapingErrorHandler", new_callable=Mock):
             # Create a mock scraper that returns test results
-            mock_scraper_instance = AsyncMock(spec=PriceScraper)
+            mock_scraper_instance = Mock()
             mock_scraper_instance.scrape_prices.return_value = test_results
             mock_scraper.return_value = mock_scraper_instance
             
@@ -255,7 +254,108 @@ class TestScrapePricesMCPService(unittest.TestCase):
             
             # Assert
             self.assertEqual(normalizer, mock_normalizer_instance)
-            mock_normalizer.assert_called_once()
+            self.assertEqual(mock_normalizer.call_count, 1)
+
+
+class TestScrapePricesConcurrency(unittest.IsolatedAsyncioTestCase):
+    """Test cases for concurrent and repeated requests to the scrape_prices service."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Patch the component factory once for the whole test case."""
+        cls._patcher = patch("app.mcp.scrape_prices.service.create_scraping_components")
+        cls._mock_factory = cls._patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the component factory."""
+        cls._patcher.stop()
+
+    def setUp(self):
+        """Start each test with a fresh factory mock and without cached scrape results."""
+        self._mock_factory.reset_mock(return_value=True, side_effect=True)
+        patcher = patch.dict("app.mcp.scrape_prices.service._SCRAPE_CACHE", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_concurrent_identical_requests_share_scrape(self):
+        """Test that identical requests made concurrently run a single scrape."""
+        scrape_started = asyncio.Event()
+
+        async def slow_scrape(model, country, timeout):
+            scrape_started.set()
+            await asyncio.sleep(0.01)
+            return [{"title": model, "price": 799.99, "url": "https://example.com/p"}]
+
+        mock_scraper = Mock()
+        mock_scraper.scrape = AsyncMock(side_effect=slow_scrape)
+        self._mock_factory.return_value = (
+            mock_scraper,
+            PriceResultNormalizer(),
+            Mock(),
+        )
+
+        params = {"model": "iPhone 13", "country": "us"}
+        first = asyncio.ensure_future(scrape_prices_service(params))
+        await scrape_started.wait()
+        second = asyncio.ensure_future(scrape_prices_service(params))
+        responses = await asyncio.gather(first, second)
+
+        self.assertEqual(mock_scraper.scrape.await_count, 1)
+        self.assertEqual(mock_scraper.scrape.await_args.args, ("iPhone 13", "us", 30))
+        for response in responses:
+            self.assertEqual(response["status"], "success")
+            self.assertEqual(len(response["data"]), 1)
+        self.assertIsNot(responses[0]["data"], responses[1]["data"])
+
+    async def test_identical_request_on_another_loop_runs_own_scrape(self):
+        """Test that a request on another event loop does not join a scrape running on this one."""
+        scrape_started = asyncio.Event()
+
+        async def slow_scrape(model, country, timeout):
+            if not scrape_started.is_set():
+                scrape_started.set()
+                await asyncio.sleep(0.2)
+            return [{"title": model, "price": 799.99, "url": "https://example.com/p"}]
+
+        mock_scraper = Mock()
+        mock_scraper.scrape = AsyncMock(side_effect=slow_scrape)
+        self._mock_factory.return_value = (
+            mock_scraper,
+            PriceResultNormalizer(),
+            Mock(),
+        )
+
+        params = {"model": "iPhone 13", "country": "us"}
+        first = asyncio.ensure_future(scrape_prices_service(params))
+        await scrape_started.wait()
+        # AsyncBridge runs each request on its own loop in a worker thread
+        second = await asyncio.to_thread(asyncio.run, scrape_prices_service(params))
+
+        self.assertEqual((await first)["status"], "success")
+        self.assertEqual(second["status"], "success")
+        self.assertEqual(mock_scraper.scrape.await_count, 2)
+
+    async def test_repeated_request_uses_cached_results(self):
+        """Test that a repeated request within the TTL does not scrape again."""
+        mock_scraper = Mock()
+        mock_scraper.scrape = AsyncMock(
+            return_value=[{"title": "iPhone 13", "price": 799.99, "url": "https://example.com/p"}]
+        )
+        self._mock_factory.return_value = (
+            mock_scraper,
+            PriceResultNormalizer(),
+            Mock(),
+        )
+
+        params = {"model": "iPhone 13", "country": "us"}
+        first = await scrape_prices_service(params)
+        second = await scrape_prices_service(params)
+
+        self.assertEqual(mock_scraper.scrape.await_count, 1)
+        self.assertNotIn("cached", first)
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["data"], first["data"])
 
 
 if __name__ == "__main__":
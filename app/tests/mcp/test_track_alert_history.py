@@ -6,42 +6,49 @@ using async/await patterns for non-blocking operations.
 """
 import asyncio
 import unittest
-from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from unittest.mock import AsyncMock
 
 from pydantic import ValidationError
 
+from app.mcp.track_alert_history import service as alert_service
 from app.mcp.track_alert_history.service import (
     AlertHistoryRequest,
     save_alert_history,
     track_alert_history_service
 )
+from app.tests.mcp.helpers import ResponseAssertionsMixin, swap_attr
 
+# Fixed timestamp for alert payloads; no test depends on the current time
+_FIXED_TS = "2025-05-18T12:00:00"
 
-class TestTrackAlertHistoryMCPService(unittest.IsolatedAsyncioTestCase):
+
+class TestTrackAlertHistoryMCPService(ResponseAssertionsMixin, unittest.IsolatedAsyncioTestCase):
     """Test suite for the track_alert_history MCP service with async implementation."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Sample valid alert data
-        self.valid_alert_data = {
-            "event_type": "price_alert",
-            "alert_id": "alert-123",
-            "rule_id": "rule-456",
-            "user_id": "user-789",
-            "product_model": "iPhone 15",
-            "condition_type": "price_drop",
-            "threshold": 15.0,
-            "triggered_value": 20.0,
-            "notification_channels": ["email", "telegram"],
-            "notification_status": {"email": True, "telegram": True},
-            "timestamp": datetime.now().isoformat()
-        }
+    # Sample valid alert data shared by the tests; treated as read-only
+    VALID_ALERT_DATA = {
+        "event_type": "price_alert",
+        "alert_id": "alert-123",
+        "rule_id": "rule-456",
+        "user_id": "user-789",
+        "product_model": "iPhone 15",
+        "condition_type": "price_drop",
+        "threshold": 15.0,
+        "triggered_value": 20.0,
+        "notification_channels": ["email", "telegram"],
+        "notification_status": {"email": True, "telegram": True},
+        "timestamp": _FIXED_TS
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        """Validate the sample alert data once for the whole test case."""
+        cls._VALID_REQUEST = AlertHistoryRequest(**cls.VALID_ALERT_DATA)
 
     async def test_valid_alert_history_request(self):
         """Test validation of a valid alert history request."""
-        # Create request model from valid data
-        request = AlertHistoryRequest(**self.valid_alert_data)
+        # Request model validated from the valid data
+        request = self._VALID_REQUEST
         
         # Verify fields are correctly set
         self.assertEqual(request.event_type, "price_alert")
@@ -51,6 +58,14 @@ class TestTrackAlertHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(request.triggered_value, 20.0)
         self.assertEqual(request.notification_channels, ["email", "telegram"])
 
+    async def test_alert_history_request_timestamps(self):
+        """Test that UTC "Z" timestamps are accepted and malformed ones rejected."""
+        request = AlertHistoryRequest(**dict(self.VALID_ALERT_DATA, timestamp="2025-05-19T12:00:00Z"))
+        self.assertEqual(request.timestamp, "2025-05-19T12:00:00Z")
+
+        with self.assertRaises(ValidationError):
+            AlertHistoryRequest(**dict(self.VALID_ALERT_DATA, timestamp="19/05/2025 12:00"))
+
     async def test_invalid_alert_history_request(self):
         """Test validation fails for invalid alert history request."""
         # Create invalid data (missing required fields)
@@ -65,30 +80,24 @@ class TestTrackAlertHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(ValidationError):
             AlertHistoryRequest(**invalid_data)
 
-    @patch("app.mcp.track_alert_history.service.save_alert_history")
-    async def test_track_alert_history_success(self, mock_save_alert_history):
+    async def test_track_alert_history_success(self):
         """Test successful tracking of alert history."""
         # Configure mock
         mock_save_result = {
             "id": "history-123",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _FIXED_TS,
             "success": True,
             "alert_id": "alert-123",
             "product_model": "iPhone 15"
         }
-        mock_save_alert_history.return_value = mock_save_result
-        
-        # Create request
-        request = AlertHistoryRequest(**self.valid_alert_data)
+        mock_save_alert_history = AsyncMock(return_value=mock_save_result)
         
-        # Call the function being tested
-        result = await track_alert_history_service(request.dict())
+        # Call the function being tested with the raw request data, as callers send it
+        with swap_attr(alert_service, "save_alert_history", mock_save_alert_history):
+            result = await track_alert_history_service(self.VALID_ALERT_DATA)
         
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
         
         # Verify expected values
         self.assertEqual(result["status"], "success")
@@ -102,43 +111,13 @@ class TestTrackAlertHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(call_arg["alert_id"], "alert-123")
         self.assertEqual(call_arg["product_model"], "iPhone 15")
 
-    @unittest.skip("Temporariamente desabilitado durante a migração do FastAPI para módulos async puros")
-    @patch("app.mcp.track_alert_history.service.save_alert_history")
-    async def test_track_alert_history_failure(self, mock_save_alert_history):
-        """Test failure handling in track_alert_history."""
-        # Configure mock to raise exception
-        mock_save_alert_history.side_effect = Exception("Database error")
-        
-        # Create request
-        request = AlertHistoryRequest(**self.valid_alert_data)
-        
-        # Call the function being tested
-        result = await track_alert_history_service(request.dict())
-        
-        # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
-        
-        # Verify expected values
-        self.assertEqual(result["status"], "error")
-        self.assertIn("failed", result["message"].lower())
-        self.assertEqual(result["data"], [])
-        
-        # Verify save_alert_history was called
-        mock_save_alert_history.assert_called_once()
+    async def test_save_alert_history_returns_record(self):
+        """Test that saving alert history returns the new record without artificial delay."""
+        result = await asyncio.wait_for(save_alert_history(self.VALID_ALERT_DATA), timeout=0.05)
 
-    @unittest.skip("Temporariamente desabilitado durante a migração do FastAPI para módulos async puros")
-    async def test_save_alert_history(self):
-        """Test saving alert history data como função async pura."""
-        # Teste desabilitado temporariamente
-        # call the function being tested (apenas para referência)
-        # result = await save_alert_history(self.valid_alert_data)
-        
-        # Verificações removidas temporariamente até que o teste seja corrigido
-        # após a conclusão da migração para serviços async puros
-        pass
+        self.assertTrue(result["success"])
+        self.assertEqual(result["alert_id"], "alert-123")
+        self.assertEqual(result["product_model"], "iPhone 15")
 
 
 if __name__ == "__main__":
@@ -5,24 +5,30 @@ This module tests the functionality of the MCP service that stores and retrieves
 price history data using async/await patterns for non-blocking operations.
 """
 import asyncio
+import threading
+import time
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 from app.core.history import (
     AlertNotifier,
     PriceHistoryAnalyzer,
     PriceHistoryRepository,
+    WebhookAlertNotifier,
 )
+from app.mcp.track_price_history import service as history_service
 from app.mcp.track_price_history.service import (
+    MetricsState,
     create_history_components,
     track_price_history_service,
     handle_store_action,
     handle_get_history_action
 )
+from app.tests.mcp.helpers import ResponseAssertionsMixin
 
 
-class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
+class TestTrackPriceHistoryMCPService(ResponseAssertionsMixin, unittest.IsolatedAsyncioTestCase):
     """Test suite for the track_price_history MCP service with async implementation."""
 
     def setUp(self):
@@ -80,10 +86,7 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         result = await track_price_history_service(params)
 
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
 
         # Verify expected values
         self.assertEqual(result["status"], "success")
@@ -118,10 +121,7 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         result = await track_price_history_service(params)
 
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
 
         # Verify expected values
         self.assertEqual(result["status"], "success")
@@ -154,10 +154,7 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         result = await track_price_history_service(params)
 
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
 
         # Verify expected values
         self.assertEqual(result["status"], "error")
@@ -187,10 +184,7 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         result = await track_price_history_service(params)
 
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
 
         # Verify expected values
         self.assertEqual(result["status"], "error")
@@ -201,6 +195,25 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         self.mock_repository.store_price_entry.assert_not_called()
         self.mock_analyzer.calculate_metrics.assert_not_called()
 
+    @patch("app.mcp.track_price_history.service.create_history_components")
+    async def test_unsupported_action_skips_component_creation(self, mock_create_components):
+        """Test that an unsupported action is rejected without creating components."""
+        result = await track_price_history_service({"action": "delete"})
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["message"], "Unsupported action: delete")
+        mock_create_components.assert_not_called()
+
+    async def test_error_responses_do_not_share_data(self):
+        """Test that each error response gets its own data container."""
+        first = await track_price_history_service({"action": "delete"})
+        first["data"].append("mutated")
+
+        second = await track_price_history_service({"action": "delete"})
+
+        self.assertEqual(second["data"], [])
+        self.assertEqual(list(second), ["status", "message", "data", "processing_time_ms"])
+
     @unittest.skip("Temporariamente desabilitado durante a migração do FastAPI para módulos async puros")
     @patch("app.mcp.track_price_history.service.create_history_components")
     async def test_handle_repository_error(self, mock_create_components):
@@ -225,10 +238,7 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
         result = await track_price_history_service(params)
 
         # Verify response format
-        self.assertIn("status", result)
-        self.assertIn("message", result)
-        self.assertIn("data", result)
-        self.assertIn("processing_time_ms", result)
+        self.assert_response_envelope(result)
 
         # Verify expected values
         self.assertEqual(result["status"], "error")
@@ -241,8 +251,9 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
 
     async def test_create_history_components(self):
         """Test creation of history components."""
-        # Apply patch to SQLitePriceHistoryRepository
-        with patch("app.mcp.track_price_history.service.SQLitePriceHistoryRepository") as mock_repo_class:
+        # Apply patch to SQLitePriceHistoryRepository, starting without cached components
+        with patch.dict("app.mcp.track_price_history.service._components", clear=True), \
+             patch("app.mcp.track_price_history.service.SQLitePriceHistoryRepository") as mock_repo_class:
             # Configure mocks
             mock_repo = AsyncMock(spec=PriceHistoryRepository)
             mock_repo_class.return_value = mock_repo
@@ -255,6 +266,310 @@ class TestTrackPriceHistoryMCPService(unittest.IsolatedAsyncioTestCase):
             self.assertIsInstance(analyzer, PriceHistoryAnalyzer)
             self.assertIsInstance(notifier, AlertNotifier)
 
+    async def test_create_history_components_uses_configured_webhook(self):
+        """Test that a configured webhook URL selects the webhook notifier."""
+        with patch.dict("app.mcp.track_price_history.service._components", clear=True), \
+             patch("app.mcp.track_price_history.service._ALERT_WEBHOOK_URL", "https://example.com/hook"), \
+             patch("app.mcp.track_price_history.service.SQLitePriceHistoryRepository"):
+            _, _, notifier = await create_history_components()
+
+            self.assertIsInstance(notifier, WebhookAlertNotifier)
+
+    async def test_history_components_are_shared(self):
+        """Test that history components are created once and reused."""
+        with patch.dict("app.mcp.track_price_history.service._components", clear=True), \
+             patch("app.mcp.track_price_history.service.SQLitePriceHistoryRepository") as mock_repo_class:
+            first = await create_history_components()
+            second = await create_history_components()
+
+            self.assertIs(first, second)
+            mock_repo_class.assert_called_once()
+
+    async def test_repeated_get_history_is_cached_until_store(self):
+        """Test that identical history queries are served from cache until a new price is stored."""
+        self.mock_repository.store_price_entries.return_value = ["entry-1"]
+        self.mock_analyzer.compute_metrics.return_value = {"current_price": 999.99}
+        params = {"model": "iPhone 15 Pro", "country": "US", "days": 30}
+
+        first = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+        second = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+
+        self.assertEqual(first["status"], "success")
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["data"], first["data"])
+        self.mock_repository.get_history_for_model.assert_awaited_once()
+
+        await handle_store_action(
+            {"price_entry": dict(self.sample_price_entry)},
+            self.mock_repository,
+            self.mock_analyzer,
+            self.mock_notifier,
+        )
+        self.mock_repository.get_history_for_model.reset_mock()
+        third = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+
+        self.assertNotIn("cached", third)
+        self.mock_repository.get_history_for_model.assert_awaited_once()
+
+    async def test_cached_history_entries_are_not_shared(self):
+        """Test that changing a returned history entry does not alter later cached results."""
+        self.mock_analyzer.compute_metrics.return_value = {"current_price": 999.99}
+        params = {"model": "iPhone 15 Pro", "country": "US", "days": 7}
+
+        first = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+        first["data"]["history"][0]["price"] = 1.0
+        second = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+        second["data"]["history"][0]["price"] = 2.0
+        third = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+
+        self.assertTrue(third["cached"])
+        self.assertEqual(third["data"]["history"][0]["price"], 999.99)
+
+    async def test_get_history_with_unhashable_params_returns_error(self):
+        """Test that list-valued query parameters produce an error response rather than raising."""
+        params = {"model": "iPhone 15 Pro", "country": "US", "days": [30]}
+
+        result = await handle_get_history_action(params, self.mock_repository, self.mock_analyzer)
+
+        self.assertEqual(result["status"], "error")
+        self.assertTrue(result["message"].startswith("Failed to retrieve price history"))
+
+    async def test_store_action_reads_history_once_per_model(self):
+        """Test that repeated stores update the metrics window without re-reading history."""
+        older = dict(self.sample_price_entry, id="entry-0", price=1099.99,
+                     timestamp=(datetime.now() - timedelta(days=1)).isoformat())
+        self.mock_repository.store_price_entries.side_effect = [["entry-1"], ["entry-2"]]
+        self.mock_repository.get_history_for_model.return_value = [older]
+        analyzer = PriceHistoryAnalyzer()
+
+        first = await handle_store_action(
+            {"price_entry": dict(self.sample_price_entry, price=999.99)},
+            self.mock_repository, analyzer, self.mock_notifier,
+        )
+        second = await handle_store_action(
+            {"price_entry": dict(self.sample_price_entry, price=899.99, timestamp=datetime.now().isoformat())},
+            self.mock_repository, analyzer, self.mock_notifier,
+        )
+
+        self.assertEqual(first["status"], "success")
+        self.assertEqual(second["data"]["entry_id"], "entry-2")
+        self.assertEqual(second["data"]["metrics"]["count"], 2)
+        self.assertEqual(second["data"]["metrics"]["min_price"], 899.99)
+        self.mock_repository.get_history_for_model.assert_awaited_once()
+
+    async def test_store_action_rereads_history_after_metrics_expire(self):
+        """Test that an expired metrics window is read from the repository again."""
+        self.mock_repository.store_price_entries.side_effect = [["entry-1"], ["entry-2"]]
+        self.mock_repository.get_history_for_model.return_value = []
+        self.mock_analyzer.compute_metrics.return_value = {}
+
+        for _ in range(2):
+            await handle_store_action(
+                {"price_entry": dict(self.sample_price_entry)},
+                self.mock_repository, self.mock_analyzer, self.mock_notifier,
+            )
+            # Expire every metrics window as if their TTL had passed
+            history_service._METRICS_STATES.expire(
+                time.monotonic() + history_service._METRICS_STATE_TTL_SECONDS + 1
+            )
+
+        self.assertEqual(self.mock_repository.get_history_for_model.await_count, 2)
+
+    async def test_store_action_rejects_invalid_timestamp(self):
+        """Test that an entry with an unparseable timestamp is rejected before it is stored."""
+        for timestamp in ("yesterday", 1700000000):
+            result = await handle_store_action(
+                {"price_entry": dict(self.sample_price_entry, timestamp=timestamp)},
+                self.mock_repository, self.mock_analyzer, self.mock_notifier,
+            )
+
+            self.assertEqual(result["status"], "error")
+            self.assertIn("timestamp", result["message"])
+        self.mock_repository.store_price_entries.assert_not_called()
+
+    async def test_store_action_skips_stored_rows_with_invalid_timestamps(self):
+        """Test that history rows with unparseable timestamps are left out of the metrics window."""
+        broken = dict(self.sample_price_entry, id="entry-0", price=1.0, timestamp="not a date")
+        self.mock_repository.store_price_entries.return_value = ["entry-1"]
+        self.mock_repository.get_history_for_model.return_value = [self.sample_price_entry, broken]
+
+        result = await handle_store_action(
+            {"price_entry": dict(self.sample_price_entry)},
+            self.mock_repository, PriceHistoryAnalyzer(), self.mock_notifier,
+        )
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["data"]["metrics"]["count"], 1)
+        self.assertEqual(result["data"]["metrics"]["min_price"], 999.99)
+
+    def test_history_cache_is_safe_across_threads(self):
+        """Test that history queries and invalidations racing on several threads never fail."""
+        self.mock_analyzer.compute_metrics.return_value = {}
+        self.mock_repository.get_history_for_model.return_value = []
+        failures = []
+
+        def query(first_day):
+            async def run():
+                for days in range(first_day, first_day + 1000):
+                    result = await handle_get_history_action(
+                        {"model": "iPhone 15 Pro", "country": "US", "days": days},
+                        self.mock_repository, self.mock_analyzer,
+                    )
+                    if result["status"] != "success":
+                        failures.append(result["message"])
+
+            # Each AsyncBridge thread runs its own event loop
+            asyncio.run(run())
+
+        def invalidate():
+            try:
+                for _ in range(2000):
+                    history_service._invalidate_history(self.mock_repository, "iPhone 15 Pro")
+            except Exception as e:
+                failures.append(repr(e))
+
+        threads = [threading.Thread(target=query, args=(index * 1000,)) for index in range(3)]
+        threads += [threading.Thread(target=invalidate) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+
+    def test_metrics_state_orders_entries_by_instant(self):
+        """Test that entries with different UTC offsets are ordered by the moment they describe."""
+        now = datetime.now(timezone.utc)
+        newer = {"price": 999.99, "timestamp": (now - timedelta(hours=1)).isoformat().replace("+00:00", "Z")}
+        # Written with a later clock time, but two hours before now
+        older = {"price": 1099.99, "timestamp": (now - timedelta(hours=2)).astimezone(
+            timezone(timedelta(hours=5))).isoformat()}
+        naive = {"price": 1049.99, "timestamp": (datetime.now() - timedelta(minutes=90)).isoformat()}
+
+        state = MetricsState([newer])
+        state.update(older)
+        state.update(naive)
+
+        self.assertEqual(state.history(), [newer, naive, older])
+
+    async def test_concurrent_stores_share_one_write(self):
+        """Test that stores made concurrently are written by a single bulk insert."""
+        self.mock_repository.store_price_entries.side_effect = lambda entries: [
+            f"entry-{index}" for index in range(len(entries))
+        ]
+        self.mock_repository.get_history_for_model.return_value = []
+        self.mock_analyzer.compute_metrics.return_value = {}
+
+        results = await asyncio.gather(*(
+            handle_store_action(
+                {"price_entry": dict(self.sample_price_entry, price=price)},
+                self.mock_repository,
+                self.mock_analyzer,
+                self.mock_notifier,
+            )
+            for price in (999.99, 989.99, 979.99)
+        ))
+
+        self.mock_repository.store_price_entries.assert_awaited_once()
+        self.assertEqual(
+            [result["data"]["entry_id"] for result in results],
+            ["entry-0", "entry-1", "entry-2"],
+        )
+
+    async def test_store_on_another_loop_does_not_join_running_write(self):
+        """Test that a store on another event loop is written by that loop's own batcher."""
+        write_started = asyncio.Event()
+        write_threads = []
+
+        async def slow_write(entries):
+            write_threads.append(threading.get_ident())
+            if not write_started.is_set():
+                write_started.set()
+                await asyncio.sleep(0.1)
+            return [f"entry-{index}" for index in range(len(entries))]
+
+        self.mock_repository.store_price_entries.side_effect = slow_write
+        self.mock_repository.get_history_for_model.return_value = []
+        self.mock_analyzer.compute_metrics.return_value = {}
+
+        def store(price):
+            return handle_store_action(
+                {"price_entry": dict(self.sample_price_entry, price=price)},
+                self.mock_repository,
+                self.mock_analyzer,
+                self.mock_notifier,
+            )
+
+        first = asyncio.ensure_future(store(999.99))
+        await write_started.wait()
+        # AsyncBridge runs each request on its own loop in a worker thread
+        second = await asyncio.to_thread(asyncio.run, asyncio.wait_for(store(989.99), timeout=1))
+
+        self.assertEqual((await first)["status"], "success")
+        self.assertEqual(second["status"], "success")
+        self.assertEqual(len(set(write_threads)), 2)
+
+    async def test_failed_bulk_write_only_fails_bad_entry(self):
+        """Test that a bulk write failure falls back to storing entries one at a time."""
+        self.mock_repository.store_price_entries.side_effect = ValueError("bad entry")
+        self.mock_repository.store_price_entry.side_effect = ["entry-0", ValueError("bad entry")]
+        self.mock_repository.get_history_for_model.return_value = []
+        self.mock_analyzer.compute_metrics.return_value = {}
+
+        good, bad = await asyncio.gather(*(
+            handle_store_action(
+                {"price_entry": dict(self.sample_price_entry, price=price)},
+                self.mock_repository,
+                self.mock_analyzer,
+                self.mock_notifier,
+            )
+            for price in (999.99, 989.99)
+        ))
+
+        self.assertEqual(good["status"], "success")
+        self.assertEqual(good["data"]["entry_id"], "entry-0")
+        self.assertEqual(bad["status"], "error")
+        self.assertIn("bad entry", bad["message"])
+
+    async def test_store_action_checks_enabled_alert_rules(self):
+        """Test that enabled alert rules are checked once against the metrics and sent."""
+        self.mock_repository.store_price_entries.return_value = ["entry-1"]
+        self.mock_repository.get_history_for_model.return_value = []
+        self.mock_analyzer.compute_metrics.return_value = {"average_price": 1099.99}
+        alert = {"model": "iPhone 15 Pro", "compared_to": "average", "percent_diff": 9.1}
+        self.mock_notifier.check_alert_rules.return_value = [alert]
+
+        result = await handle_store_action(
+            {
+                "price_entry": dict(self.sample_price_entry),
+                "alert_rules": [
+                    {"enabled": True, "threshold_percent": 5.0, "compared_to": "average"},
+                    {"enabled": False, "threshold_percent": 1.0, "compared_to": "lowest"},
+                ],
+            },
+            self.mock_repository,
+            self.mock_analyzer,
+            self.mock_notifier,
+        )
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["data"]["alerts_triggered"], [alert])
+        rules = self.mock_notifier.check_alert_rules.await_args.args[4]
+        self.assertEqual([rule.compared_to for rule in rules], ["average"])
+        self.mock_notifier.send_alerts.assert_awaited_once_with([alert])
+
+    async def test_store_action_reports_missing_fields(self):
+        """Test that a price entry missing required fields is rejected with their names."""
+        price_entry = {"model": "iPhone 15 Pro", "price": 999.99}
+
+        result = await handle_store_action(
+            {"price_entry": price_entry}, self.mock_repository, self.mock_analyzer, self.mock_notifier
+        )
+
+        self.assertEqual(result["status"], "error")
+        self.assertTrue(result["message"].endswith("missing required fields: country, currency, source"))
+        self.mock_repository.store_price_entries.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,7 +5,7 @@ Tests the integration between the agent timeline and sequential agent pipeline.
 import os
 import sys
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
@@ -15,182 +15,162 @@ from app.core.agents.sequential_agent import SequentialAgent
 from app.ui.timeline_components import display_agent_timeline
 
 
+def _clone(timeline):
+    """Copy a timeline; its step entries only hold immutable values, so one level deep is enough"""
+    return {step: data.copy() for step, data in timeline.items()}
+
+
 class TestAgentTimelineIntegration(unittest.TestCase):
     """Test suite for agent timeline integration with sequential agent pipeline"""
 
+    # Pipeline steps in order: (step, agent attribute, key expected in its result, (start, end) times).
+    # The last step is left active, so it has no completion times.
+    STEPS = (
+        ("planning", "_planning_agent", "websites", ("10:00", "10:01")),
+        ("scraping", "_scraping_agent", "store", ("10:01", "10:02")),
+        ("analysis", "_analysis_agent", "average_price", ("10:02", "10:03")),
+        ("recommendation", "_recommendation_agent", "best_offer", ("10:03", "10:04")),
+        ("notification", "_notification_agent", "alerts_triggered", None),
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the mocked pipeline agents once for the test class"""
+        # Create mocks for each agent in the pipeline
+        cls._planning_agent = MagicMock()
+        cls._scraping_agent = MagicMock()
+        cls._analysis_agent = MagicMock()
+        cls._recommendation_agent = MagicMock()
+        cls._notification_agent = MagicMock()
+
+        # Setup return values for each agent's execute method
+        cls._planning_agent.execute.return_value = {
+            "websites": ["test-site1.com", "test-site2.com"]
+        }
+        cls._scraping_agent.execute.return_value = [
+            {"store": "Store 1", "price": "$999.99", "url": "http://test-site1.com"}
+        ]
+        cls._analysis_agent.execute.return_value = {
+            "average_price": 999.99,
+            "price_range": "$999.99-$999.99",
+            "price_trend": "Stable",
+        }
+        cls._recommendation_agent.execute.return_value = {
+            "best_offer": {"store": "Store 1", "price": "$999.99"}
+        }
+        cls._notification_agent.execute.return_value = {"alerts_triggered": []}
+
+        # Create the sequential agent with mocked components
+        cls._agent = SequentialAgent(
+            planning_agent=cls._planning_agent,
+            scraping_agent=cls._scraping_agent,
+            analysis_agent=cls._analysis_agent,
+            recommendation_agent=cls._recommendation_agent,
+            notification_agent=cls._notification_agent,
+        )
+
+    def setUp(self):
+        """Reset the agent mocks and patch the sidebar and timeline rendering for each test"""
+        # Clear calls recorded by earlier tests; configured return values are kept
+        for agent in (
+            self._planning_agent,
+            self._scraping_agent,
+            self._analysis_agent,
+            self._recommendation_agent,
+            self._notification_agent,
+        ):
+            agent.reset_mock()
+
+        # Patch both sidebar attributes in one pass over the sidebar object
+        sidebar_patcher = patch.multiple(
+            "app.ui.timeline_components.st.sidebar", subheader=DEFAULT, container=DEFAULT
+        )
+        sidebar_mocks = sidebar_patcher.start()
+        self.addCleanup(sidebar_patcher.stop)
+        self.mock_subheader = sidebar_mocks["subheader"]
+        self.mock_container = sidebar_mocks["container"]
+
+        render_patcher = patch("app.ui.timeline_components.render_agent_timeline")
+        self.mock_render = render_patcher.start()
+        self.addCleanup(render_patcher.stop)
+
+        # Setup container mock with proper context manager behavior
+        self.mock_container.return_value.__enter__.return_value = MagicMock()
+
     def test_timeline_integration_with_sequential_agent(self):
         """Test that the agent timeline properly integrates with the full sequential agent pipeline"""
-        # Use context managers for proper cleanup
-        with patch("app.ui.timeline_components.st.sidebar.subheader") as mock_subheader:
-            with patch("app.ui.timeline_components.st.sidebar.container") as mock_container:
-                with patch("app.ui.timeline_components.render_agent_timeline") as mock_render:
-                    # Setup container mock with proper context manager behavior
-                    container_instance = MagicMock()
-                    mock_container.return_value.__enter__ = MagicMock(return_value=container_instance)
-                    mock_container.return_value.__exit__ = MagicMock(return_value=None)
-
-                    # Create mocks for each agent in the pipeline
-                    planning_agent = MagicMock()
-                    scraping_agent = MagicMock()
-                    analysis_agent = MagicMock()
-                    recommendation_agent = MagicMock()
-                    notification_agent = MagicMock()
-
-                    # Setup return values for each agent's execute method
-                    planning_agent.execute.return_value = {
-                        "websites": ["test-site1.com", "test-site2.com"]
-                    }
-                    scraping_agent.execute.return_value = [
-                        {"store": "Store 1", "price": "$999.99", "url": "http://test-site1.com"}
-                    ]
-                    analysis_agent.execute.return_value = {
-                        "average_price": 999.99,
-                        "price_range": "$999.99-$999.99",
-                        "price_trend": "Stable",
-                    }
-                    recommendation_agent.execute.return_value = {
-                        "best_offer": {"store": "Store 1", "price": "$999.99"}
-                    }
-                    notification_agent.execute.return_value = {"alerts_triggered": []}
-
-                    # Create the sequential agent with mocked components
-                    agent = SequentialAgent(
-                        planning_agent=planning_agent,
-                        scraping_agent=scraping_agent,
-                        analysis_agent=analysis_agent,
-                        recommendation_agent=recommendation_agent,
-                        notification_agent=notification_agent,
-                    )
-
-                    # Create a clean timeline for tracking agent execution
-                    # Instead of using display_agent_timeline with reset=True which might interact with other tests,
-                    # create a fresh timeline explicitly
-                    from copy import deepcopy
-                    timeline = {
-                        "planning": {"status": "pending"},
-                        "scraping": {"status": "pending"},
-                        "analysis": {"status": "pending"},
-                        "recommendation": {"status": "pending"},
-                        "notification": {"status": "pending"}
-                    }
-
-                    # Execute the agent with timeline integration for each step
-                    input_data = {"model": "Test Phone", "country": "US"}
-
-                    # Step 1: Planning
-                    timeline_copy = deepcopy(timeline)
-                    timeline = display_agent_timeline(
-                        active_step="planning", existing_timeline=timeline_copy
-                    )
-                    # Use the mocked object directly, not the execute_step method
-                    planning_result = planning_agent.execute(input_data)
-                    self.assertIn("websites", planning_result)
-                    self.assertEqual(len(planning_result["websites"]), 2)
-
-                    # Manually update timeline to avoid test interdependencies
-                    timeline["planning"]["status"] = "completed"
-                    timeline["planning"]["start_time"] = "10:00"
-                    timeline["planning"]["end_time"] = "10:01"
-
-                    # Step 2: Scraping
-                    timeline_copy = deepcopy(timeline)
-                    timeline = display_agent_timeline(
-                        active_step="scraping", existing_timeline=timeline_copy
-                    )
-                    # Usar o objeto mocked diretamente
-                    scraping_result = scraping_agent.execute(planning_result)
-                    self.assertIsInstance(scraping_result, list)
-                    self.assertEqual(len(scraping_result), 1)
-
-                    # Manually update timeline
-                    timeline["scraping"]["status"] = "completed"
-                    timeline["scraping"]["start_time"] = "10:01"
-                    timeline["scraping"]["end_time"] = "10:02"
-
-                    # Step 3: Analysis
-                    timeline_copy = deepcopy(timeline)
-                    timeline = display_agent_timeline(
-                        active_step="analysis", existing_timeline=timeline_copy
-                    )
-                    # Usar o objeto mocked diretamente
-                    analysis_result = analysis_agent.execute(scraping_result)
-                    self.assertIn("average_price", analysis_result)
-                    self.assertIn("price_range", analysis_result)
-
-                    # Manually update timeline
-                    timeline["analysis"]["status"] = "completed"
-                    timeline["analysis"]["start_time"] = "10:02"
-                    timeline["analysis"]["end_time"] = "10:03"
-
-                    # Step 4: Recommendation
-                    timeline_copy = deepcopy(timeline)
-                    timeline = display_agent_timeline(
-                        active_step="recommendation", existing_timeline=timeline_copy
-                    )
-                    # Usar o objeto mocked diretamente
-                    recommendation_result = recommendation_agent.execute(analysis_result)
-                    self.assertIn("best_offer", recommendation_result)
-
-                    # Manually update timeline
-                    timeline["recommendation"]["status"] = "completed"
-                    timeline["recommendation"]["start_time"] = "10:03"
-                    timeline["recommendation"]["end_time"] = "10:04"
-
-                    # Step 5: Notification
-                    timeline_copy = deepcopy(timeline)
-                    timeline = display_agent_timeline(
-                        active_step="notification", existing_timeline=timeline_copy
-                    )
-                    # Usar o objeto mocked diretamente
-                    notification_result = notification_agent.execute(recommendation_result)
-                    self.assertIn("alerts_triggered", notification_result)
-
-                    # Verify timeline has the correct steps and states
-                    self.assertEqual(timeline["planning"]["status"], "completed")
-                    self.assertEqual(timeline["scraping"]["status"], "completed")
-                    self.assertEqual(timeline["analysis"]["status"], "completed")
-                    self.assertEqual(timeline["recommendation"]["status"], "completed")
-                    self.assertEqual(timeline["notification"]["status"], "active")  # Changed from "running" to "active"
+        # Create a clean timeline for tracking agent execution
+        # Instead of using display_agent_timeline with reset=True which might interact with other tests,
+        # create a fresh timeline explicitly
+        timeline = {
+            "planning": {"status": "pending"},
+            "scraping": {"status": "pending"},
+            "analysis": {"status": "pending"},
+            "recommendation": {"status": "pending"},
+            "notification": {"status": "pending"}
+        }
+
+        # Execute the agent with timeline integration for each step
+        # Each agent receives the result of the previous step
+        result = {"model": "Test Phone", "country": "US"}
+        results = {}
+        for step, agent_attr, expected_key, times in self.STEPS:
+            with self.subTest(step=step):
+                timeline = display_agent_timeline(
+                    active_step=step, existing_timeline=_clone(timeline)
+                )
+                # Use the mocked object directly, not the execute_step method
+                result = getattr(self, agent_attr).execute(result)
+                # Scraping returns a list of offers, the other steps a single dict
+                payload = result[0] if isinstance(result, list) else result
+                self.assertIn(expected_key, payload)
+                results[step] = result
+
+                # Manually update timeline to avoid test interdependencies
+                if times is not None:
+                    timeline[step]["status"] = "completed"
+                    timeline[step]["start_time"], timeline[step]["end_time"] = times
+
+        self.assertEqual(len(results["planning"]["websites"]), 2)
+        self.assertEqual(len(results["scraping"]), 1)
+        self.assertIn("price_range", results["analysis"])
+
+        # Verify timeline has the correct steps and states
+        self.assertEqual(timeline["planning"]["status"], "completed")
+        self.assertEqual(timeline["scraping"]["status"], "completed")
+        self.assertEqual(timeline["analysis"]["status"], "completed")
+        self.assertEqual(timeline["recommendation"]["status"], "completed")
+        self.assertEqual(timeline["notification"]["status"], "active")  # Changed from "running" to "active"
 
     def test_timeline_error_handling(self):
         """Test that the timeline correctly handles agent errors"""
-        # Use context managers for patching to ensure proper cleanup
-        with patch("app.ui.timeline_components.st.sidebar.subheader") as mock_subheader:
-            with patch("app.ui.timeline_components.st.sidebar.container") as mock_container:
-                with patch("app.ui.timeline_components.render_agent_timeline") as mock_render:
-                    # Setup container mock with proper context manager behavior
-                    container_instance = MagicMock()
-                    mock_container.return_value.__enter__ = MagicMock(return_value=container_instance)
-                    mock_container.return_value.__exit__ = MagicMock(return_value=None)
-
-                    # Create a clean initial timeline explicitly
-                    timeline = {
-                        "planning": {"status": "pending"},
-                        "scraping": {"status": "pending"},
-                        "analysis": {"status": "pending"},
-                        "recommendation": {"status": "pending"},
-                        "notification": {"status": "pending"}
-                    }
-
-                    # Update through successful steps (manually to avoid dependencies)
-                    timeline["planning"] = {"status": "completed", "start_time": "10:00", "end_time": "10:01"}
-                    timeline["scraping"] = {"status": "failed", "start_time": "10:01", "error": "Network connection failed"}
-
-                    # Make a deep copy to ensure no references are shared
-                    from copy import deepcopy
-                    timeline_copy = deepcopy(timeline)
-
-                    # Display the timeline with the error
-                    updated_timeline = display_agent_timeline(existing_timeline=timeline_copy)
-
-                    # Verify error was preserved
-                    self.assertEqual(updated_timeline["scraping"]["status"], "failed")
-                    self.assertIn("error", updated_timeline["scraping"])
-                    self.assertEqual(
-                        updated_timeline["scraping"]["error"], "Network connection failed"
-                    )
-
-                    # Verify subsequent steps remain pending
-                    self.assertEqual(updated_timeline["analysis"]["status"], "pending")
-                    self.assertEqual(updated_timeline["recommendation"]["status"], "pending")
-                    self.assertEqual(updated_timeline["notification"]["status"], "pending")
+        # Create a clean initial timeline explicitly
+        timeline = {
+            "planning": {"status": "pending"},
+            "scraping": {"status": "pending"},
+            "analysis": {"status": "pending"},
+            "recommendation": {"status": "pending"},
+            "notification": {"status": "pending"}
+        }
+
+        # Update through successful steps (manually to avoid dependencies)
+        timeline["planning"] = {"status": "completed", "start_time": "10:00", "end_time": "10:01"}
+        timeline["scraping"] = {"status": "failed", "start_time": "10:01", "error": "Network connection failed"}
+
+        # Copy the timeline to ensure no references are shared
+        timeline_copy = _clone(timeline)
+
+        # Display the timeline with the error
+        updated_timeline = display_agent_timeline(existing_timeline=timeline_copy)
+
+        # Verify error was preserved
+        self.assertEqual(updated_timeline["scraping"]["status"], "failed")
+        self.assertIn("error", updated_timeline["scraping"])
+        self.assertEqual(
+            updated_timeline["scraping"]["error"], "Network connection failed"
+        )
+
+        # Verify subsequent steps remain pending
+        self.assertEqual(updated_timeline["analysis"]["status"], "pending")
+        self.assertEqual(updated_timeline["recommendation"]["status"], "pending")
+        self.assertEqual(updated_timeline["notification"]["status"], "pending")
@@ -5,7 +5,7 @@ This module tests the simulation of agent execution flow with visual feedback,
 following the SmartNinja TDD approach.
 """
 import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock, Mock, call
 import time
 from typing import Dict, Any
 
@@ -19,6 +19,11 @@ from app.ui.agent_visual_feedback import (
 )
 
 
+def _raising_render(data):
+    """Render function that always fails."""
+    raise Exception("Test error")
+
+
 class TestAgentVisualFeedback(unittest.TestCase):
     """Test suite for agent visual feedback functionality."""
 
@@ -78,7 +83,7 @@ class TestAgentVisualFeedback(unittest.TestCase):
         # Setup
         mock_expander = MagicMock()
         mock_st.expander.return_value = mock_expander
-        mock_render_func = MagicMock(side_effect=Exception("Test error"))
+        mock_render_func = Mock(wraps=_raising_render)
         mock_data = {"test": "data"}
         
         # Execute
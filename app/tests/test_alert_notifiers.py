@@ -0,0 +1,88 @@
+"""
+Tests for the price alert notifiers.
+
+This module tests how triggered alerts are delivered by the webhook notifier.
+"""
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.history import WebhookAlertNotifier
+
+
+class _FakeResponse:
+    """Async context manager standing in for an aiohttp response."""
+
+    def __init__(self, status, delay=0.0):
+        self.status = status
+        self.delay = delay
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def text(self):
+        return "error"
+
+
+class TestWebhookAlertNotifier(unittest.IsolatedAsyncioTestCase):
+    """Test suite for WebhookAlertNotifier."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.notifier = WebhookAlertNotifier("https://example.com/hook")
+        session_patcher = patch("aiohttp.ClientSession", side_effect=lambda: MagicMock(close=AsyncMock()))
+        self.session_factory = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        self.alerts = [
+            {"model": "iPhone 15 Pro", "price": price, "compared_to": "average", "percent_diff": 10.0}
+            for price in (899.99, 879.99, 859.99)
+        ]
+
+    async def test_send_alerts_posts_concurrently(self):
+        """Test that alerts are posted concurrently rather than one after another."""
+        session = await self.notifier._get_session()
+        session.post.side_effect = lambda *args, **kwargs: _FakeResponse(200, delay=0.05)
+
+        # Three sequential posts would take at least 0.15 s
+        sent = await asyncio.wait_for(self.notifier.send_alerts(self.alerts), timeout=0.12)
+
+        self.assertTrue(sent)
+        self.assertEqual(session.post.call_count, 3)
+
+    async def test_send_alerts_reports_failure_without_skipping_alerts(self):
+        """Test that a failed post is reported while the remaining alerts are still sent."""
+        session = await self.notifier._get_session()
+        session.post.side_effect = [
+            _FakeResponse(500),
+            _FakeResponse(200),
+            ConnectionError("unreachable"),
+        ]
+
+        sent = await self.notifier.send_alerts(self.alerts)
+
+        self.assertFalse(sent)
+        self.assertEqual(session.post.call_count, 3)
+
+    def test_session_is_created_per_event_loop(self):
+        """Test that each event loop posts through its own session and finished loops drop theirs."""
+        async def post_alert():
+            session = await self.notifier._get_session()
+            session.post.side_effect = lambda *args, **kwargs: _FakeResponse(200)
+            self.assertTrue(await self.notifier.send_alerts(self.alerts[:1]))
+            return session
+
+        first_session = asyncio.run(post_alert())
+        second_session = asyncio.run(post_alert())
+
+        self.assertIsNot(first_session, second_session)
+        self.assertEqual(self.session_factory.call_count, 2)
+        first_session.close.assert_awaited_once()
+        self.assertEqual(len(self.notifier._sessions), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ Test the BrightDataPriceScraper functionality.
 This module tests the core functionality of the BrightDataPriceScraper,
 ensuring it correctly handles scraping operations, HTML parsing, and error conditions.
 """
+import asyncio
 import unittest
 from unittest.mock import patch, AsyncMock, MagicMock
 
@@ -48,7 +49,7 @@ class TestBrightDataScraperFunctionality(unittest.IsolatedAsyncioTestCase):
         # Set up mock response
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.text = AsyncMock(return_value=self.sample_html)
+        mock_response.read = AsyncMock(return_value=self.sample_html.encode("utf-8"))
         
         # Set up mock session
         mock_session = AsyncMock()
@@ -64,7 +65,7 @@ class TestBrightDataScraperFunctionality(unittest.IsolatedAsyncioTestCase):
         )
         
         # Verify results
-        self.assertEqual(result, self.sample_html)
+        self.assertEqual(result, self.sample_html.encode("utf-8"))
         mock_session.get.assert_called_once()
 
     @pytest.mark.asyncio
@@ -89,7 +90,7 @@ class TestBrightDataScraperFunctionality(unittest.IsolatedAsyncioTestCase):
         )
         
         # Verify results
-        self.assertEqual(result, "")  # Empty string on error
+        self.assertEqual(result, b"")  # Empty body on error
 
     @pytest.mark.asyncio
     @patch('app.core.scraping.bright_data_scraper.aiohttp.ClientSession')
@@ -109,7 +110,7 @@ class TestBrightDataScraperFunctionality(unittest.IsolatedAsyncioTestCase):
         )
         
         # Verify results
-        self.assertEqual(result, "")  # Empty string on error
+        self.assertEqual(result, b"")  # Empty body on error
 
     def test_parse_product_data_success(self):
         """Test successful product data parsing."""
@@ -225,6 +226,68 @@ class TestBrightDataScraperFunctionality(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["title"], "Product 1")
 
+    async def test_session_is_reused_until_closed(self):
+        """Test that the scraper keeps one HTTP session across scrapes until closed."""
+        session = await self.scraper._get_session()
+        try:
+            self.assertIs(await self.scraper._get_session(), session)
+        finally:
+            await self.scraper.close()
+
+        self.assertTrue(session.closed)
+        self.assertFalse(self.scraper._sessions)
+
+    async def test_session_from_closed_loop_is_closed(self):
+        """Test that a session opened on a loop that has been closed is closed when another loop scrapes."""
+        other_loop = asyncio.new_event_loop()
+        # Each AsyncBridge call runs the scraper on its own loop in a worker thread
+        first_session = await asyncio.to_thread(
+            other_loop.run_until_complete, self.scraper._get_session()
+        )
+        other_loop.close()
+        try:
+            session = await self.scraper._get_session()
+
+            self.assertIsNot(session, first_session)
+            self.assertTrue(first_session.closed)
+            self.assertEqual(list(self.scraper._sessions), [asyncio.get_running_loop()])
+        finally:
+            await self.scraper.close()
+
+    async def test_session_from_idle_loop_is_left_to_its_loop(self):
+        """Test that a session of an idle, still open loop is neither closed nor driven from elsewhere."""
+        other_loop = asyncio.new_event_loop()
+        try:
+            first_session = await asyncio.to_thread(
+                other_loop.run_until_complete, self.scraper._get_session()
+            )
+            await self.scraper._get_session()
+            await self.scraper.close()
+
+            self.assertFalse(first_session.closed)
+            self.assertEqual(list(self.scraper._sessions), [other_loop])
+
+            # The session is reused once its loop runs again
+            reused = await asyncio.to_thread(
+                other_loop.run_until_complete, self.scraper._get_session()
+            )
+            self.assertIs(reused, first_session)
+        finally:
+            await asyncio.to_thread(other_loop.run_until_complete, first_session.close())
+            other_loop.close()
+
+    async def test_injected_session_is_not_closed(self):
+        """Test that a session passed in by the caller is used but left open."""
+        session = aiohttp.ClientSession()
+        try:
+            scraper = BrightDataPriceScraper(session=session)
+            self.assertIs(await scraper._get_session(), session)
+
+            await scraper.close()
+            self.assertFalse(session.closed)
+        finally:
+            await session.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,347 @@
+"""
+Unit tests for the site-specific e-commerce parsers.
+Tests product extraction from listing and single product pages.
+"""
+import unittest
+from unittest.async_case import IsolatedAsyncioTestCase
+
+from app.core.scraping.parsers import ParserFactory
+from app.core.scraping.parsers.amazon_parser import AmazonParser
+from app.core.scraping.parsers.base_parser import _PROCESS_POOL_MIN_CHARS
+from app.core.scraping.parsers.generic_parser import GenericEcommerceParser
+from app.core.scraping.parsers.kabum_parser import KabumParser
+from app.core.scraping.parsers.magazineluiza_parser import MagazineLuizaParser
+
+AMAZON_LISTING_HTML = """
+<html>
+  <head><title>Amazon.com : iphone 15</title></head>
+  <body>
+    <div class="nav">Navigation</div>
+    <div data-component-type="s-search-result">
+      <h2><a href="/Apple-iPhone-15/dp/B0CHX1W1XY"><span>Apple iPhone 15 128GB</span></a></h2>
+      <span class="a-price"><span class="a-offscreen">$799.00</span></span>
+      <i class="a-icon-star"><span>4.5 out of 5 stars</span></i>
+    </div>
+    <div data-component-type="s-search-result">
+      <h2><a href="https://www.amazon.com/dp/B0CHX2"><span>Apple iPhone 15 Plus</span></a></h2>
+      <span class="a-price"><span class="a-offscreen">$1,099.99</span></span>
+      <span class="a-color-price">Currently unavailable.</span>
+    </div>
+  </body>
+</html>
+"""
+
+AMAZON_PRODUCT_HTML = """
+<html>
+  <head><title>Apple iPhone 15</title></head>
+  <body>
+    <span id="productTitle"> Apple iPhone 15 128GB </span>
+    <span id="priceblock_ourprice">$799.00</span>
+    <span id="acrPopover" title="4.6 out of 5 stars"></span>
+    <div id="availability">In Stock.</div>
+  </body>
+</html>
+"""
+
+KABUM_LISTING_HTML = """
+<html>
+  <body>
+    <div class="productCard">
+      <a href="/produto/123/smartphone-samsung-galaxy-s23">
+        <span class="nameCard">Smartphone Samsung Galaxy S23</span>
+      </a>
+      <span class="priceCard">R$ 3.999,90</span>
+      <div class="rating">4.8</div>
+    </div>
+    <div class="productCard">
+      <a href="https://www.kabum.com.br/produto/456">
+        <span class="nameCard">Smartphone Samsung Galaxy S23+</span>
+      </a>
+      <span class="priceCard">R$ 4.599,00</span>
+      <div class="unavailable">Esgotado</div>
+    </div>
+  </body>
+</html>
+"""
+
+MAGAZINELUIZA_LISTING_HTML = """
+<html>
+  <body>
+    <li data-testid="product-card">
+      <a href="/iphone-15-128gb/p/237184000/">
+        <h2 data-testid="product-title">iPhone 15 Apple 128GB Preto</h2>
+      </a>
+      <p data-testid="price-value">R$ 4.999,00</p>
+      <div data-testid="rating">4.9 (1021)</div>
+    </li>
+    <li data-testid="product-card">
+      <a href="https://www.magazineluiza.com.br/iphone-15-plus/p/237185000/">
+        <h2 class="productTitle">iPhone 15 Plus Apple 128GB</h2>
+      </a>
+      <p class="price">R$ 5.799,00</p>
+      <span class="unavailable">Produto indisponível</span>
+    </li>
+  </body>
+</html>
+"""
+
+AMAZON_BLOCKED_HTML = """
+<html><head><title>Robot Check</title></head><body><img src="/captcha/abc.jpg"></body></html>
+"""
+
+
+class TestAmazonParser(IsolatedAsyncioTestCase):
+    """Test suite for the Amazon parser"""
+
+    def setUp(self):
+        """Set up test dependencies"""
+        self.parser = AmazonParser()
+
+    async def test_parse_listing_page(self):
+        """Test extraction from search result containers"""
+        results = await self.parser.parse(AMAZON_LISTING_HTML, "https://www.amazon.com/s?k=iphone+15")
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["title"], "Apple iPhone 15 128GB")
+        self.assertEqual(results[0]["price"], 799.0)
+        self.assertEqual(results[0]["currency"], "USD")
+        self.assertEqual(results[0]["url"], "https://www.amazon.com/Apple-iPhone-15/dp/B0CHX1W1XY")
+        self.assertEqual(results[0]["rating"], 4.5)
+        self.assertTrue(results[0]["in_stock"])
+        self.assertEqual(results[1]["price"], 1099.99)
+        self.assertEqual(results[1]["url"], "https://www.amazon.com/dp/B0CHX2")
+        self.assertFalse(results[1]["in_stock"])
+
+    async def test_parse_single_product_page(self):
+        """Test fallback to single product extraction when no listing is found"""
+        results = await self.parser.parse(AMAZON_PRODUCT_HTML, "https://www.amazon.de/dp/B0CHX1W1XY")
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["title"], "Apple iPhone 15 128GB")
+        self.assertEqual(results[0]["price"], 799.0)
+        self.assertEqual(results[0]["currency"], "EUR")
+        self.assertEqual(results[0]["rating"], 4.6)
+        self.assertTrue(results[0]["in_stock"])
+
+    async def test_parse_blocked_page(self):
+        """Test that captcha pages yield no results"""
+        results = await self.parser.parse(AMAZON_BLOCKED_HTML, "https://www.amazon.com/s?k=iphone")
+
+        self.assertEqual(results, [])
+
+    async def test_parse_empty_content(self):
+        """Test that empty content yields no results"""
+        self.assertEqual(await self.parser.parse("", "https://www.amazon.com/s?k=iphone"), [])
+
+    def test_mentions(self):
+        """Test the raw HTML prefilter on text and bytes"""
+        self.assertTrue(self.parser._mentions(AMAZON_LISTING_HTML, ("s-search-result",)))
+        self.assertTrue(self.parser._mentions(AMAZON_LISTING_HTML.encode(), ("captcha", "s-search-result")))
+        self.assertFalse(self.parser._mentions(AMAZON_PRODUCT_HTML.encode(), ("s-search-result",)))
+
+    def test_can_parse(self):
+        """Test URL matching without awaiting"""
+        self.assertIs(self.parser.can_parse("https://www.Amazon.com.br/s?k=iphone"), True)
+        self.assertIs(self.parser.can_parse("https://www.kabum.com.br/busca/iphone"), False)
+
+
+class TestKabumParser(IsolatedAsyncioTestCase):
+    """Test suite for the Kabum parser"""
+
+    def setUp(self):
+        """Set up test dependencies"""
+        self.parser = KabumParser()
+
+    async def test_parse_listing_page(self):
+        """Test extraction from product cards"""
+        results = await self.parser.parse(KABUM_LISTING_HTML, "https://www.kabum.com.br/busca/galaxy-s23")
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["title"], "Smartphone Samsung Galaxy S23")
+        self.assertEqual(results[0]["price"], 3999.9)
+        self.assertEqual(results[0]["currency"], "BRL")
+        self.assertEqual(
+            results[0]["url"], "https://www.kabum.com.br/produto/123/smartphone-samsung-galaxy-s23"
+        )
+        self.assertEqual(results[0]["rating"], 4.8)
+        self.assertTrue(results[0]["in_stock"])
+        self.assertEqual(results[1]["url"], "https://www.kabum.com.br/produto/456")
+        self.assertFalse(results[1]["in_stock"])
+
+    async def test_parse_large_page(self):
+        """Test that pages above the process pool threshold yield the same products"""
+        card = KABUM_LISTING_HTML.split("<body>")[1].split("</body>")[0]
+        html = f"<html><body>{card * 600}</body></html>"
+        self.assertGreaterEqual(len(html), _PROCESS_POOL_MIN_CHARS)
+
+        results = await self.parser.parse(html, "https://www.kabum.com.br/busca/galaxy-s23")
+
+        self.assertEqual(len(results), 1200)
+        self.assertEqual(results[-2]["title"], "Smartphone Samsung Galaxy S23")
+        self.assertEqual(results[-1]["price"], 4599.0)
+        self.assertFalse(results[-1]["in_stock"])
+
+    async def test_parse_raw_bytes(self):
+        """Test that undecoded response bodies are parsed directly"""
+        html_bytes = KABUM_LISTING_HTML.replace("Esgotado", "Indisponível").encode("utf-8")
+
+        results = await self.parser.parse(html_bytes, "https://www.kabum.com.br/busca/galaxy-s23")
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["title"], "Smartphone Samsung Galaxy S23")
+        self.assertEqual(results[1]["price"], 4599.0)
+
+
+class TestMagazineLuizaParser(IsolatedAsyncioTestCase):
+    """Test suite for the Magazine Luiza parser"""
+
+    def setUp(self):
+        """Set up test dependencies"""
+        self.parser = MagazineLuizaParser()
+
+    async def test_parse_listing_page(self):
+        """Test extraction from fields identified by testid or by class"""
+        results = await self.parser.parse(
+            MAGAZINELUIZA_LISTING_HTML, "https://www.magazineluiza.com.br/busca/iphone+15/"
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["title"], "iPhone 15 Apple 128GB Preto")
+        self.assertEqual(results[0]["price"], 4999.0)
+        self.assertEqual(
+            results[0]["url"], "https://www.magazineluiza.com.br/iphone-15-128gb/p/237184000/"
+        )
+        self.assertEqual(results[0]["rating"], 4.9)
+        self.assertTrue(results[0]["in_stock"])
+        self.assertEqual(results[1]["title"], "iPhone 15 Plus Apple 128GB")
+        self.assertEqual(results[1]["price"], 5799.0)
+        self.assertIsNone(results[1]["rating"])
+        self.assertFalse(results[1]["in_stock"])
+
+    async def test_parse_listing_page_without_testids(self):
+        """Test that pages without product-card testids fall back to a full parse"""
+        html = MAGAZINELUIZA_LISTING_HTML.replace('li data-testid="product-card"', 'li class="productCard"')
+
+        results = await self.parser.parse(html, "https://www.magazineluiza.com.br/busca/iphone+15/")
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["title"], "iPhone 15 Apple 128GB Preto")
+        self.assertEqual(results[1]["price"], 5799.0)
+
+
+class TestGenericEcommerceParser(IsolatedAsyncioTestCase):
+    """Test suite for the generic fallback parser"""
+
+    def setUp(self):
+        """Set up test dependencies"""
+        self.parser = GenericEcommerceParser()
+
+    async def test_parse_single_product_page(self):
+        """Test extraction from a page without product containers"""
+        html = """
+        <html><body>
+          <div class="title">Site header</div>
+          <h1 class="headline">Google Pixel 8 Pro</h1>
+          <span class="price">€ 1.099,00</span>
+          <div class="rating">4.4</div>
+        </body></html>
+        """
+
+        results = await self.parser.parse(html, "https://www.shop.example.de/p/pixel-8-pro")
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["title"], "Google Pixel 8 Pro")
+        self.assertEqual(results[0]["price"], 1099.0)
+        self.assertEqual(results[0]["currency"], "EUR")
+        self.assertEqual(results[0]["store"], "Example")
+        self.assertEqual(results[0]["rating"], 4.4)
+
+    def test_extract_currency(self):
+        """Test currency detection from symbols and codes"""
+        self.assertEqual(self.parser._extract_currency("R$ 1.299,00"), "BRL")
+        self.assertEqual(self.parser._extract_currency("$999.99"), "USD")
+        self.assertEqual(self.parser._extract_currency("899,00 €"), "EUR")
+        self.assertEqual(self.parser._extract_currency("£749"), "GBP")
+        self.assertEqual(self.parser._extract_currency("EUR 799,00"), "EUR")
+        self.assertEqual(self.parser._extract_currency("Por R$ 1.299"), "BRL")
+        self.assertEqual(self.parser._extract_currency("1299"), "USD")
+        self.assertEqual(self.parser._extract_currency(""), "USD")
+
+
+class TestParserFactory(unittest.TestCase):
+    """Test suite for the parser factory"""
+
+    def setUp(self):
+        """Save the registry so tests can register parsers"""
+        self.original_parsers = list(ParserFactory._parsers)
+
+    def tearDown(self):
+        """Restore the registry and drop memoized lookups"""
+        ParserFactory._parsers[:] = self.original_parsers
+        ParserFactory._resolve_parser_class.cache_clear()
+
+    def test_create_parser_by_host(self):
+        """Test that the parser is selected from the URL host"""
+        self.assertIsInstance(ParserFactory.create_parser("https://www.amazon.com/s?k=iphone"), AmazonParser)
+        self.assertIsInstance(ParserFactory.create_parser("https://www.kabum.com.br/busca/s23"), KabumParser)
+        self.assertIsInstance(
+            ParserFactory.create_parser("https://www.example.com/search?q=kabum"), GenericEcommerceParser
+        )
+        self.assertIsInstance(ParserFactory.create_parser("https://smile.amazon.com/s?k=iphone"), AmazonParser)
+        self.assertIsInstance(ParserFactory.create_parser("https://notamazon.com/s?k=iphone"), GenericEcommerceParser)
+
+    def test_create_parser_reuses_instances(self):
+        """Test that parsers are shared across calls"""
+        first = ParserFactory.create_parser("https://www.amazon.com/s?k=iphone")
+        second = ParserFactory.create_parser("https://www.amazon.de/s?k=galaxy")
+
+        self.assertIs(first, second)
+
+    def test_register_parser_invalidates_lookups(self):
+        """Test that a new registration applies to hosts already resolved"""
+        url = "https://www.example.com/search?q=iphone"
+        self.assertIsInstance(ParserFactory.create_parser(url), GenericEcommerceParser)
+
+        ParserFactory.register_parser("example", KabumParser)
+
+        self.assertIsInstance(ParserFactory.create_parser(url), KabumParser)
+
+    def test_register_pattern(self):
+        """Test that parsers can be registered for a host pattern"""
+        ParserFactory.register_pattern(r"(?:^|\.)magalu\.", MagazineLuizaParser)
+
+        self.assertIsInstance(ParserFactory.create_parser("https://www.magalu.com/busca/tv"), MagazineLuizaParser)
+        self.assertIsInstance(ParserFactory.create_parser("https://www.amazon.com/s?k=tv"), AmazonParser)
+
+
+class TestPriceExtraction(unittest.TestCase):
+    """Test suite for the shared price extraction logic"""
+
+    def setUp(self):
+        """Set up test dependencies"""
+        self.parser = KabumParser()
+
+    def test_decimal_separators(self):
+        """Test that the rightmost separator is used as decimal separator"""
+        self.assertEqual(self.parser._extract_price("$1,234.56"), 1234.56)
+        self.assertEqual(self.parser._extract_price("R$ 1.234,56"), 1234.56)
+        self.assertEqual(self.parser._extract_price("799,90 €"), 799.9)
+        self.assertEqual(self.parser._extract_price("$19.9"), 19.9)
+
+    def test_non_ascii_symbols(self):
+        """Test that non-ASCII currency symbols and spaces are stripped"""
+        self.assertEqual(self.parser._extract_price("R$\xa01.234,56"), 1234.56)
+        self.assertEqual(self.parser._extract_price("£ 899.99"), 899.99)
+        self.assertEqual(self.parser._extract_price("1 099,00 €"), 1099.0)
+
+    def test_thousands_separators(self):
+        """Test that a lone separator followed by three digits is a thousands separator"""
+        self.assertEqual(self.parser._extract_price("$1,234"), 1234.0)
+        self.assertEqual(self.parser._extract_price("R$ 1.099"), 1099.0)
+        self.assertEqual(self.parser._extract_price("1.234.567"), 1234567.0)
+
+    def test_invalid_price(self):
+        """Test that missing or malformed prices yield None"""
+        self.assertIsNone(self.parser._extract_price(""))
+        self.assertIsNone(self.parser._extract_price("Indisponível"))
+        self.assertIsNone(self.parser._extract_price("1.2.3,4,5"))
@@ -4,7 +4,7 @@ Tests for the price formatter components.
 # pylint: disable=missing-function-docstring,missing-class-docstring,attribute-defined-outside-init
 import pytest
 
-from app.core.analyzer.formatting.price_formatter import BasicPriceFormatter
+from app.core.analyzer.formatting.price_formatter import BasicPriceFormatter, PriceFormatter
 
 
 class TestBasicPriceFormatter:
@@ -67,5 +67,30 @@ class TestBasicPriceFormatter:
         assert "Test Phone - Unknown: N/A USD" in formatted
 
 
+class TestPriceFormatter:
+    """Test suite for the PriceFormatter class."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.formatter = PriceFormatter()
+
+    def test_format_string_prices(self):
+        """Test that string prices are cleaned and entries without a usable price skipped."""
+        formatted = self.formatter.format_for_analysis(
+            [
+                {"price": "$1299.00", "store": "Best Buy", "date": "2023-01-01", "model": "iPhone 15"},
+                {"price": 999, "source": "Amazon"},
+                {"price": "call for price", "store": "Walmart"},
+                {"store": "Target"},
+            ]
+        )
+
+        assert formatted == (
+            "Price Data:\n"
+            "Best Buy: $1299.00 on 2023-01-01 for iPhone 15\n"
+            "Amazon: $999.00"
+        )
+
+
 if __name__ == "__main__":
     pytest.main(["-v", "test_price_formatter.py"])
@@ -0,0 +1,55 @@
+"""
+Tests for the price history analyzer.
+
+This module tests the metrics computed from price history entries.
+"""
+import unittest
+from datetime import datetime, timedelta
+
+from app.core.history import PriceHistoryAnalyzer
+
+
+class TestPriceHistoryAnalyzer(unittest.IsolatedAsyncioTestCase):
+    """Test suite for PriceHistoryAnalyzer metrics."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.analyzer = PriceHistoryAnalyzer()
+        now = datetime.now()
+        # Newest first, as returned by the repository
+        self.history = [
+            {"price": 800.0, "timestamp": (now - timedelta(days=1)).isoformat()},
+            {"price": 900.0, "timestamp": (now - timedelta(days=10)).isoformat()},
+            {"price": 1000.0, "timestamp": (now - timedelta(days=40)).isoformat()},
+        ]
+
+    async def test_calculate_metrics(self):
+        """Test basic statistics, rolling averages and trend over a price history."""
+        metrics = await self.analyzer.calculate_metrics(self.history)
+
+        self.assertEqual(metrics["count"], 3)
+        self.assertEqual(metrics["min_price"], 800.0)
+        self.assertEqual(metrics["max_price"], 1000.0)
+        self.assertAlmostEqual(metrics["average_price"], 900.0)
+        self.assertAlmostEqual(metrics["rolling_7d_average"], 800.0)
+        self.assertAlmostEqual(metrics["rolling_30d_average"], 850.0)
+        self.assertEqual(metrics["trend"], "decreasing")
+        self.assertEqual(metrics["price_range"], 200.0)
+
+    async def test_calculate_metrics_trend_ignores_entry_order(self):
+        """Test that the trend compares the newest and oldest entries regardless of order."""
+        metrics = await self.analyzer.calculate_metrics(list(reversed(self.history)))
+
+        self.assertEqual(metrics["trend"], "decreasing")
+
+    async def test_calculate_metrics_empty_history(self):
+        """Test metrics for an empty history."""
+        metrics = await self.analyzer.calculate_metrics([])
+
+        self.assertEqual(metrics["count"], 0)
+        self.assertIsNone(metrics["average_price"])
+        self.assertEqual(metrics["trend"], "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
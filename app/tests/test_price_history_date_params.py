@@ -5,6 +5,8 @@ This module contains tests for the date parameter functionality in the
 price history repository and service, following async patterns.
 """
 import asyncio
+import os
+import tempfile
 import unittest
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
@@ -72,6 +74,36 @@ class TestPriceHistoryDateParameters(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(args[0], model)  # Model parameter
         self.assertEqual(args[1], "US")   # Country parameter
 
+    async def test_store_price_entries_writes_all_entries(self):
+        """Test that a bulk store writes every entry and returns their IDs in order."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            repository = SQLitePriceHistoryRepository(os.path.join(tmp_dir, "history.db"))
+            entries = [
+                dict(self.sample_entries[0], price=price,
+                     timestamp=(datetime.now() - timedelta(hours=hours)).isoformat())
+                for hours, price in enumerate((999.99, 949.99, 899.99))
+            ]
+
+            entry_ids = await repository.store_price_entries(entries)
+            history = await repository.get_history_for_model("iPhone 15 Pro", "US")
+
+            self.assertEqual(len(set(entry_ids)), 3)
+            self.assertEqual([entry["id"] for entry in history], entry_ids)
+            self.assertEqual([entry["price"] for entry in history], [999.99, 949.99, 899.99])
+
+            with self.assertRaises(ValueError):
+                await repository.store_price_entries([{"model": "iPhone 15 Pro"}])
+
+    def test_connection_uses_write_ahead_log(self):
+        """Test that repository connections use WAL journaling with relaxed syncing."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            repository = SQLitePriceHistoryRepository(os.path.join(tmp_dir, "history.db"))
+
+            with repository._get_connection() as conn:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                # synchronous=NORMAL is reported as 1
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -87,6 +87,15 @@ class TestSiteSelector(unittest.TestCase):
         # Should include Samsung's store
         self.assertIn("samsung.com", samsung_sites)
 
+    def test_extract_brand_from_model(self):
+        """Test brand detection from model name keywords"""
+        self.assertEqual(self.selector._extract_brand_from_model("iPhone 15 Pro"), "apple")
+        self.assertEqual(self.selector._extract_brand_from_model("Galaxy S23 Ultra"), "samsung")
+        self.assertEqual(self.selector._extract_brand_from_model("Microsoft Surface Pro 9"), "microsoft")
+        self.assertEqual(self.selector._extract_brand_from_model("Redmi Note 12"), "xiaomi")
+        self.assertEqual(self.selector._extract_brand_from_model("Dell XPS 13 Premium"), "dell")
+        self.assertIsNone(self.selector._extract_brand_from_model("Nokia 3310"))
+
     def test_limit_sites_returned(self):
         """Test limiting the number of sites returned"""
         input_data = {"model": "iPhone 15", "country": "US", "max_sites": 3}
@@ -97,6 +106,32 @@ class TestSiteSelector(unittest.TestCase):
         # Verify we get exactly 3 sites
         self.assertEqual(len(sites), 3)
 
+    def test_repeated_selection_returns_independent_lists(self):
+        """Test that memoized selections are not shared between callers"""
+        input_data = {"model": "iPhone 15", "country": "US"}
+
+        first = self.selector.determine_optimal_scraping_targets(input_data)
+        first.append("example.com")
+        second = self.selector.determine_optimal_scraping_targets(dict(input_data))
+
+        self.assertNotIn("example.com", second)
+        self.assertEqual(first[:-1], second)
+
+    def test_repeated_selection_uses_current_performance_data(self):
+        """Test that memoized selections are re-ranked when performance data changes"""
+        input_data = {"model": "iPhone 15", "country": "US"}
+
+        with patch.object(SiteSelector, "_retrieve_site_performance_metrics") as mock_perf:
+            mock_perf.return_value = {"amazon.com": {"success_rate": 0.95, "data_quality": 0.9}}
+            first = self.selector.determine_optimal_scraping_targets(input_data)
+
+            mock_perf.return_value = {"walmart.com": {"success_rate": 0.99, "data_quality": 0.99}}
+            second = self.selector.determine_optimal_scraping_targets(input_data)
+
+        self.assertEqual(first[0], "amazon.com")
+        self.assertEqual(second[0], "walmart.com")
+        self.assertCountEqual(first, second)
+
     def test_handle_invalid_input(self):
         """Test handling of invalid input"""
         # Missing model